@@ -0,0 +1,366 @@
+"""
+框架开销基准 - 测量框架在原始HTTP请求之外增加的耗时，并与基线比较
+
+用法:
+    pytest benchmarks                               # 测量并与基线比较，超出容忍范围的基准失败
+    pytest benchmarks --bench-save-baseline         # 保存本次结果为基线（只更新本次执行的基准）
+    pytest benchmarks -k sanitize --bench-tolerance 0.5
+
+用例通过 benchmark fixture 测量，调用方式与 pytest-benchmark 一致::
+
+    def test_xxx(benchmark):
+        result = benchmark(func, *args, **kwargs)
+
+    @pytest.mark.benchmark(group="send_request")   # 同组基准在汇总表中与组内最快项对比
+
+每个基准先校准循环次数使单轮耗时不少于 --bench-min-time，再执行 --bench-rounds 轮，
+取单次调用耗时的最小值与基线比较（最小值受系统噪声影响最小）。
+
+基线包含两部分：
+- results: 单次耗时（微秒），只在运行环境与基线一致时比较，由各基准自身判定失败
+- ratios: 组内各基准相对组内最快项的倍数（按各轮中位数计算，如 send_request / 原始请求），与机器无关，
+  任何环境都比较；超出容忍范围时会话结束后判定失败；参照项单次耗时低于 RATIO_GATE_MIN_US（100us）的组
+  波动过大，只告警
+HTTP 基准使用本地桩服务，无需网络和测试环境。
+"""
+import gc
+import json
+import os
+import platform
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pytest
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "framework_overhead.json"
+RESULTS_KEY = pytest.StashKey[Dict[str, Dict[str, Any]]]()
+RATIO_REGRESSIONS_KEY = pytest.StashKey[Tuple[List[str], List[str]]]()
+# 组内倍数只在参照项单次耗时不低于该值（微秒）时判定失败，更短的参照项受计时噪声影响过大
+RATIO_GATE_MIN_US = 100.0
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("bench", "框架开销基准")
+    group.addoption("--bench-save-baseline", action="store_true", default=False,
+                    help="将本次结果保存为基线")
+    group.addoption("--bench-baseline", default=str(DEFAULT_BASELINE),
+                    help="基线文件（默认: benchmarks/baselines/framework_overhead.json）")
+    group.addoption("--bench-tolerance", type=float, default=0.3,
+                    help="相对基线允许的增长比例（默认: 0.3）")
+    group.addoption("--bench-ratio-tolerance", type=float, default=0.4,
+                    help="组内倍数相对基线允许的增长比例，倍数由两次测量相除，波动大于单次耗时（默认: 0.4）")
+    group.addoption("--bench-rounds", type=int, default=10, help="每个基准的测量轮数（默认: 10）")
+    group.addoption("--bench-min-time", type=float, default=0.05,
+                    help="每轮最短耗时（秒），据此校准每轮的循环次数（默认: 0.05）")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark(group): 框架开销基准分组")
+    config.stash[RESULTS_KEY] = {}
+
+
+def machine_info() -> Dict[str, Any]:
+    """基线对应的运行环境，不同环境的耗时不可比"""
+    return {
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def group_ratios(results: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """组内各基准相对组内最快项的倍数：{组: {"reference": 最快项, "values": {基准: 倍数}}}，只有一项的组不计算
+
+    倍数由两个不同时刻的测量相除，使用各轮的中位数：单轮偶然偏快的最小值会让整组倍数一起偏移。
+    """
+    groups: Dict[str, Dict[str, float]] = {}
+    for name, result in results.items():
+        if result["group"]:
+            groups.setdefault(result["group"], {})[name] = result["median_us"]
+    ratios = {}
+    for group, values in groups.items():
+        if len(values) < 2:
+            continue
+        reference = min(values, key=values.get)
+        ratios[group] = {"reference": reference,
+                         "values": {name: round(value / values[reference], 3)
+                                    for name, value in sorted(values.items()) if name != reference}}
+    return ratios
+
+
+def compare_ratios(results: Dict[str, Dict[str, Any]], baseline_ratios: Dict[str, Dict[str, Any]],
+                   tolerance: float) -> Tuple[List[str], List[str]]:
+    """与基线的组内倍数比较，返回 (超出容忍范围的说明, 仅告警的说明)
+
+    参照项单次耗时低于 RATIO_GATE_MIN_US 的组，计时的相对波动过大，超出容忍范围时只告警不判定失败；
+    本次未执行基线参照项的组不比较。
+    """
+    regressions, warnings = [], []
+    for group, base in baseline_ratios.items():
+        reference = results.get(base["reference"])
+        if not reference:
+            continue
+        for name, base_ratio in base["values"].items():
+            if name not in results:
+                continue
+            ratio = results[name]["median_us"] / reference["median_us"]
+            if ratio > base_ratio * (1 + tolerance):
+                message = (f"[{group}] {name}（相对 {base['reference']}）: {base_ratio:.2f}x -> {ratio:.2f}x "
+                           f"(+{(ratio / base_ratio - 1) * 100:.0f}%)")
+                if reference["median_us"] >= RATIO_GATE_MIN_US:
+                    regressions.append(message)
+                else:
+                    warnings.append(f"{message}，参照项 {reference['median_us']:.1f}us 过短，仅告警")
+    return regressions, warnings
+
+
+def save_baseline(path: str, results: Dict[str, Dict[str, Any]]) -> None:
+    """合并保存：本次未执行的基准保留原基线；组内倍数与机器无关，始终保留"""
+    baseline = load_baseline(path)
+    ratios = dict(baseline.get("ratios", {}))
+    ratios.update(group_ratios(results))
+    if baseline.get("machine") != machine_info():
+        baseline = {}
+    merged = dict(baseline.get("results", {}))
+    merged.update({name: round(result["min_us"], 1) for name, result in results.items()})
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"machine": machine_info(), "results": dict(sorted(merged.items())),
+                   "ratios": dict(sorted(ratios.items()))},
+                  f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+class Benchmark:
+    """benchmark fixture 的返回值，调用时测量 func 单次调用的耗时（微秒）"""
+
+    def __init__(self, name: str, group: Optional[str], rounds: int, min_time: float,
+                 baseline: Optional[float] = None, tolerance: float = 0.3):
+        """
+        Args:
+            baseline: 基线耗时（微秒），为空时不比较
+            tolerance: 相对基线允许的增长比例
+        """
+        self.name = name
+        self.group = group
+        self.rounds = max(1, rounds)
+        self.min_time = min_time
+        self.baseline = baseline
+        self.tolerance = tolerance
+        self.extra_info: Dict[str, Any] = {}
+        self.stats: Optional[Dict[str, Any]] = None
+
+    def __call__(self, func: Callable, *args, **kwargs):
+        if self.stats is not None:
+            raise RuntimeError("每个用例只能调用一次 benchmark")
+        result = func(*args, **kwargs)  # 预热：首次调用的导入、连接建立等不计入
+
+        iterations = 1
+        while True:
+            elapsed = self._run(func, args, kwargs, iterations)
+            if elapsed >= self.min_time or iterations >= 1_000_000:
+                break
+            iterations = min(1_000_000, max(iterations * 2, int(iterations * self.min_time / max(elapsed, 1e-9)) + 1))
+
+        timings = [self._run(func, args, kwargs, iterations) / iterations * 1e6 for _ in range(self.rounds)]
+        self.stats = {
+            "group": self.group,
+            "min_us": round(min(timings), 3),
+            "median_us": round(statistics.median(timings), 3),
+            "rounds": self.rounds,
+            "iterations": iterations,
+            **self.extra_info,
+        }
+        value = self.stats["min_us"]
+        assert not self.baseline or value <= self.baseline * (1 + self.tolerance), (
+            f"{self.name}: {self.baseline:.1f}us -> {value:.1f}us (+{(value / self.baseline - 1) * 100:.0f}%)，"
+            f"超出基线容忍范围{self.tolerance:.0%}")
+        return result
+
+    @staticmethod
+    def _run(func, args, kwargs, iterations: int) -> float:
+        # 与 timeit 一致，计时期间关闭垃圾回收以减少波动
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            for _ in range(iterations):
+                func(*args, **kwargs)
+            return time.perf_counter() - start
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+
+@pytest.fixture
+def benchmark(request):
+    """测量单个调用的耗时，超出基线容忍范围时用例失败；--bench-save-baseline 时只测量不比较"""
+    config = request.config
+    name = request.node.name
+    marker = request.node.get_closest_marker("benchmark")
+    baseline = None
+    if not config.getoption("--bench-save-baseline"):
+        stored = load_baseline(config.getoption("--bench-baseline"))
+        if stored.get("machine") == machine_info():
+            baseline = stored.get("results", {}).get(name)
+    bench = Benchmark(name, marker.kwargs.get("group") if marker else None,
+                      config.getoption("--bench-rounds"), config.getoption("--bench-min-time"),
+                      baseline, config.getoption("--bench-tolerance"))
+    yield bench
+    if bench.stats is not None:
+        config.stash[RESULTS_KEY][name] = bench.stats
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """按组内倍数比较（与运行环境无关），超出容忍范围时会话失败"""
+    config = session.config
+    results = config.stash.get(RESULTS_KEY, {})
+    if not results or config.getoption("--bench-save-baseline"):
+        return
+    baseline = load_baseline(config.getoption("--bench-baseline"))
+    regressions, warnings = compare_ratios(results, baseline.get("ratios", {}),
+                                           config.getoption("--bench-ratio-tolerance"))
+    config.stash[RATIO_REGRESSIONS_KEY] = (regressions, warnings)
+    if regressions and session.exitstatus == pytest.ExitCode.OK:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    results = config.stash.get(RESULTS_KEY, {})
+    if not results:
+        return
+    path = config.getoption("--bench-baseline")
+    baseline = load_baseline(path)
+    same_machine = baseline.get("machine") == machine_info()
+    base_results = baseline.get("results", {}) if same_machine else {}
+
+    terminalreporter.section("框架开销基准 (us/次)")
+    terminalreporter.write_line(f"{'基准':<48}{'最小':>10}{'中位数':>10}{'组内倍数':>10}{'基线':>10}{'变化':>9}")
+    groups: Dict[Optional[str], List[str]] = {}
+    for name, result in results.items():
+        groups.setdefault(result["group"], []).append(name)
+    for group, names in groups.items():
+        if group:
+            terminalreporter.write_line(f"[{group}]")
+        fastest = min(results[name]["min_us"] for name in names)
+        for name in names:
+            result = results[name]
+            base = base_results.get(name)
+            base_text = f"{base:.1f}" if base else "-"
+            change = f"{(result['min_us'] / base - 1) * 100:+.0f}%" if base else "-"
+            terminalreporter.write_line(
+                f"  {name:<46}{result['min_us']:>10.1f}{result['median_us']:>10.1f}"
+                f"{result['min_us'] / fastest:>10.2f}{base_text:>10}{change:>9}")
+
+    if config.getoption("--bench-save-baseline"):
+        save_baseline(path, results)
+        terminalreporter.write_line(f"已保存基线: {path}")
+        return
+    if not baseline:
+        terminalreporter.write_line(f"基线不存在: {path}，未做比较；执行 --bench-save-baseline 生成基线",
+                                    yellow=True, bold=True)
+        return
+    if not same_machine:
+        terminalreporter.write_line(
+            f"警告: 基线来自其他运行环境 {baseline.get('machine')}，当前为 {machine_info()}，"
+            f"单次耗时未做比较，只比较组内倍数；在当前环境执行 --bench-save-baseline 生成本机基线",
+            yellow=True, bold=True)
+    regressions, warnings = config.stash.get(RATIO_REGRESSIONS_KEY, ([], []))
+    for item in warnings:
+        terminalreporter.write_line(f"警告: 组内倍数超出基线 {item}", yellow=True)
+    if regressions:
+        terminalreporter.write_line(f"组内倍数超出基线容忍范围{config.getoption('--bench-ratio-tolerance'):.0%}:",
+                                    red=True, bold=True)
+        for item in regressions:
+            terminalreporter.write_line(f"  {item}", red=True)
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """固定返回JSON的桩服务，长连接，不输出访问日志"""
+
+    protocol_version = "HTTP/1.1"
+    # 响应头与响应体分两次写出，关闭Nagle算法避免与客户端延迟确认叠加产生40ms等待
+    disable_nagle_algorithm = True
+    body = b""
+
+    def _reply(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _reply
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _make_records(count: int) -> List[Dict[str, Any]]:
+    """生成与合同列表接口结构相似的记录，包含需要脱敏的字段"""
+    return [{
+        "id": index,
+        "contractName": f"基准合同{index}",
+        "amount": 1000.5 + index,
+        "status": "ACTIVE" if index % 2 else "DRAFT",
+        "owner": {"name": f"user{index}", "phone": "13800000000", "token": f"tok-{index:08d}"},
+        "remark": f"callback?token=abc{index}&page=1",
+        "tags": ["rpm", "benchmark"],
+    } for index in range(count)]
+
+
+@pytest.fixture(scope="session")
+def make_records():
+    """按数量生成测试记录的工厂函数"""
+    return _make_records
+
+
+@pytest.fixture(scope="session")
+def stub_payload() -> Dict[str, Any]:
+    """桩服务返回的响应体"""
+    return {"code": "200", "message": "success", "data": {"total": 20, "records": _make_records(20)}}
+
+
+@pytest.fixture(scope="session")
+def stub_server(stub_payload):
+    """本地桩服务，返回 base_url"""
+    handler = type("StubHandler", (_StubHandler,), {"body": json.dumps(stub_payload).encode("utf-8")})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="bench-stub", daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class JsonResponse:
+    """只包含断言与校验工具用到的属性的响应对象"""
+
+    def __init__(self, body: Any, status_code: int = 200):
+        self.status_code = status_code
+        self._body = body
+        self.text = json.dumps(body, ensure_ascii=False)
+
+    def json(self) -> Any:
+        return self._body
+
+
+@pytest.fixture(scope="session")
+def json_response(stub_payload) -> JsonResponse:
+    return JsonResponse(stub_payload)
@@ -0,0 +1,170 @@
+"""
+启动耗时基准 - 基于 python -X importtime 统计 common 模块的导入开销
+
+用法:
+    python -m benchmarks.import_time                  # 测量并与基线比较
+    python -m benchmarks.import_time --save-baseline  # 保存当前结果为基线
+    python -m benchmarks.import_time --tolerance 0.5  # 允许50%的波动
+
+导入耗时与机器相关，基线保存并比较的是各项相对参照导入（REFERENCE_MODULES，一组固定的标准库模块，
+每次测量前紧接着测量一次）的倍数，不同机器、CI 执行器之间可以直接比较。
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+BASELINE_FILE = Path(__file__).resolve().parent / "baselines" / "import_time.json"
+
+# 需要跟踪导入耗时的模块，ALL_KEY 表示在同一进程中导入全部模块
+MODULES = [
+    "common.logger",
+    "common.config_manager",
+    "common.request_util",
+    "common.assert_util",
+    "common.data_validator",
+    "common.contract_api",
+    "common.project_api",
+]
+ALL_KEY = "common (all)"
+# 参照导入：只依赖标准库、耗时与 common 相近的一组模块，用于消除机器性能差异
+REFERENCE_MODULES = ["json", "decimal", "email.message", "http.client", "xml.etree.ElementTree", "argparse", "logging"]
+REFERENCE_KEY = "reference (stdlib)"
+
+
+def _run_importtime(modules: List[str]) -> List[Tuple[int, int, str]]:
+    """在子进程中导入模块，解析 -X importtime 输出为 (self_us, cumulative_us, name) 列表"""
+    code = "; ".join(f"import {module}" for module in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR, capture_output=True, text=True, check=True
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # 表头
+        entries.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return entries
+
+
+def _startup_excluded(entries: List[Tuple[int, int, str]]) -> List[Tuple[int, int, str]]:
+    """去掉解释器启动阶段（以顶层 site 导入结束）的导入项"""
+    for index in range(len(entries) - 1, -1, -1):
+        if entries[index][2] == " site":
+            return entries[index + 1:]
+    return entries
+
+
+def _import_total(modules: List[str]) -> int:
+    """在新的子进程中导入模块，返回本次导入的总开销（微秒）"""
+    entries = _startup_excluded(_run_importtime(modules))
+    # 顶层导入（缩进为1个空格）的累计耗时之和即为本次导入的总开销
+    return sum(cumulative for _, cumulative, name in entries if not name.startswith("  "))
+
+
+def heaviest_imports(modules: List[str], top: int = 10) -> List[Tuple[int, str]]:
+    """返回自身耗时最高的导入项，用于定位启动开销来源"""
+    entries = _startup_excluded(_run_importtime(modules))
+    return sorted(((self_us, name.strip()) for self_us, _, name in entries), reverse=True)[:top]
+
+
+def run_all(repeat: int = 5) -> Tuple[Dict[str, int], Dict[str, float]]:
+    """测量每个模块单独导入、全部导入的耗时及相对参照导入的倍数
+
+    每次测量前紧接着测量一次参照导入，取两者之比；倍数取各次之比的中位数，
+    耗时取最小值（仅供参考）。参照导入与被测导入承受相同的机器负载，比值受噪声影响较小。
+    """
+    results: Dict[str, int] = {}
+    ratios: Dict[str, float] = {}
+    references: List[int] = []
+    for modules in [[module] for module in MODULES] + [MODULES]:
+        key = modules[0] if len(modules) == 1 else ALL_KEY
+        samples = []
+        for _ in range(repeat):
+            reference = _import_total(REFERENCE_MODULES)
+            value = _import_total(modules)
+            references.append(reference)
+            samples.append((value, value / reference))
+        results[key] = min(value for value, _ in samples)
+        ratios[key] = round(statistics.median(ratio for _, ratio in samples), 3)
+    results[REFERENCE_KEY] = min(references)
+    return results, ratios
+
+
+def load_baseline() -> Dict[str, Any]:
+    if BASELINE_FILE.exists():
+        return json.loads(BASELINE_FILE.read_text(encoding="utf-8"))
+    return {}
+
+
+def save_baseline(results: Dict[str, int], ratios: Dict[str, float]) -> None:
+    """保存相对参照导入的倍数，以及本机的原始耗时（微秒，仅供参考）"""
+    BASELINE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    data = {"ratios": ratios, "results_us": results}
+    BASELINE_FILE.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def compare(ratios: Dict[str, float], baseline_ratios: Dict[str, float], tolerance: float) -> List[str]:
+    """按相对参照导入的倍数比较，返回超出基线容忍范围的模块说明列表"""
+    regressions = []
+    for key, ratio in ratios.items():
+        base = baseline_ratios.get(key)
+        if base and ratio > base * (1 + tolerance):
+            regressions.append(f"{key}: {base:.2f}x -> {ratio:.2f}x 参照导入 (+{(ratio / base - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="统计common模块导入耗时")
+    parser.add_argument("--repeat", type=int, default=5, help="每项测量的重复次数，取最小值")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="相对基线允许的增长比例（按参照倍数）")
+    parser.add_argument("--save-baseline", action="store_true", help="将本次结果保存为基线")
+    parser.add_argument("--top", type=int, default=10, help="列出自身耗时最高的N个导入项")
+    args = parser.parse_args(argv)
+
+    results, current_ratios = run_all(args.repeat)
+    baseline_ratios = load_baseline().get("ratios", {})
+
+    print(f"{'模块':<28}{'导入耗时(ms)':>14}{'参照倍数':>10}{'基线倍数':>10}")
+    for key, value in results.items():
+        ratio = current_ratios.get(key)
+        base = baseline_ratios.get(key)
+        ratio_text = f"{ratio:.2f}" if ratio is not None else "1.00"
+        base_text = f"{base:.2f}" if base else "-"
+        print(f"{key:<30}{value / 1000:>12.1f}{ratio_text:>12}{base_text:>12}")
+
+    print(f"\n自身耗时最高的{args.top}个导入项:")
+    for self_us, name in heaviest_imports(MODULES, args.top):
+        print(f"  {self_us / 1000:>8.1f}ms  {name}")
+
+    if args.save_baseline:
+        save_baseline(results, current_ratios)
+        print(f"\n已保存基线: {BASELINE_FILE}")
+        return 0
+
+    if not baseline_ratios:
+        print(f"\n基线不存在或格式过旧: {BASELINE_FILE}，无法比较；先执行 --save-baseline 生成基线", file=sys.stderr)
+        return 2
+    missing = [key for key in current_ratios if not baseline_ratios.get(key)]
+    if missing:
+        print(f"\n警告: 以下模块没有基线，未做比较（执行 --save-baseline 更新基线）: {', '.join(missing)}",
+              file=sys.stderr)
+
+    regressions = compare(current_ratios, baseline_ratios, args.tolerance)
+    if regressions:
+        print("\n导入耗时超出基线:")
+        for item in regressions:
+            print(f"  {item}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+allure 附件：send_request 每次请求添加两个附件（请求信息、响应内容）
+
+- report: 注册写入临时目录的报告监听器，包含附件写文件的耗时（与 --alluredir 执行时一致）
+- no_report: 未生成报告时的调用开销
+"""
+import json
+import uuid
+
+import allure_commons
+import pytest
+from allure_commons import model2
+from allure_commons.logger import AllureFileLogger
+from allure_commons.reporter import AllureReporter
+
+from common.allure_util import attach
+
+SMALL = "Method: GET\nURL: http://127.0.0.1/rpm-api/contract/list\nResponse Time: 12.3ms\nStatus Code: 200"
+
+
+class _ReportWriter:
+    """与 allure_pytest 监听器相同的附件处理：附件挂到当前用例并写入报告目录"""
+
+    def __init__(self, directory):
+        self.file_logger = AllureFileLogger(str(directory))
+        self.reporter = AllureReporter()
+        test_uuid = str(uuid.uuid4())
+        self.reporter.schedule_test(test_uuid, model2.TestResult(uuid=test_uuid, name="benchmark"))
+
+    @allure_commons.hookimpl
+    def attach_data(self, body, name, attachment_type, extension):
+        self.reporter.attach_data(uuid.uuid4(), body, name=name, attachment_type=attachment_type, extension=extension)
+
+
+@pytest.fixture(params=["no_report", "report"])
+def report_mode(request, tmp_path):
+    if request.param == "no_report":
+        yield request.param
+        return
+    writer = _ReportWriter(tmp_path)
+    allure_commons.plugin_manager.register(writer.file_logger)
+    allure_commons.plugin_manager.register(writer)
+    yield request.param
+    allure_commons.plugin_manager.unregister(writer)
+    allure_commons.plugin_manager.unregister(writer.file_logger)
+
+
+@pytest.mark.benchmark(group="allure.attach")
+def test_attach_request_info(benchmark, report_mode):
+    benchmark(attach, SMALL, name="请求信息", attachment_type="TEXT")
+
+
+@pytest.mark.benchmark(group="allure.attach")
+def test_attach_response_body(benchmark, report_mode, stub_payload):
+    body = json.dumps(stub_payload, ensure_ascii=False)
+    benchmark(attach, body, name="响应内容", attachment_type="JSON")
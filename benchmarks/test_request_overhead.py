@@ -0,0 +1,64 @@
+"""
+请求开销：同一本地桩服务上，原始 requests 会话与 RequestUtil.send_request 的耗时对比
+"""
+import pytest
+import requests
+
+from common.freeze_util import freeze
+from common.request_util import RequestUtil
+
+LIST_URL = "/rpm-api/contract/list"
+CREATE_URL = "/rpm-api/contract/create"
+PARAMS = {"page": 1, "size": 20}
+PAYLOAD = {"contractName": "基准合同", "amount": 1000.5, "owner": {"name": "user", "password": "secret"}}
+HEADERS = freeze({"Authorization": "Bearer benchmark-token"})
+
+
+@pytest.fixture(scope="module")
+def raw_session():
+    session = requests.Session()
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope="module")
+def req(stub_server):
+    request_util = RequestUtil(stub_server, max_retries=1)
+    yield request_util
+    request_util.close()
+
+
+def _raw_get(session, base_url):
+    response = session.get(base_url + LIST_URL, params=PARAMS, headers=HEADERS, timeout=30)
+    response.text
+    return response
+
+
+def _raw_post(session, base_url):
+    response = session.post(base_url + CREATE_URL, json=PAYLOAD, headers=HEADERS, timeout=30)
+    response.text
+    return response
+
+
+@pytest.mark.benchmark(group="GET")
+def test_raw_session_get(benchmark, raw_session, stub_server):
+    response = benchmark(_raw_get, raw_session, stub_server)
+    assert response.status_code == 200
+
+
+@pytest.mark.benchmark(group="GET")
+def test_send_request_get(benchmark, req):
+    response = benchmark(req.send_request, "GET", LIST_URL, params=PARAMS, headers=HEADERS)
+    assert response.status_code == 200
+
+
+@pytest.mark.benchmark(group="POST")
+def test_raw_session_post(benchmark, raw_session, stub_server):
+    response = benchmark(_raw_post, raw_session, stub_server)
+    assert response.status_code == 200
+
+
+@pytest.mark.benchmark(group="POST")
+def test_send_request_post(benchmark, req):
+    response = benchmark(req.send_request, "POST", CREATE_URL, json=PAYLOAD, headers=HEADERS)
+    assert response.status_code == 200
@@ -0,0 +1,21 @@
+"""
+SecurityUtil.sanitize_data：不同大小的请求参数脱敏耗时（每条记录含嵌套敏感字段和带token的URL）
+"""
+import pytest
+
+from common.security_util import SecurityUtil
+
+
+@pytest.mark.benchmark(group="sanitize_data")
+@pytest.mark.parametrize("size", [1, 20, 200])
+def test_sanitize_records(benchmark, make_records, size):
+    payload = {"json": {"records": make_records(size)}, "params": {"page": 1, "token": "abc"}}
+    sanitized = benchmark(SecurityUtil.sanitize_data, payload)
+    assert sanitized["params"]["token"] != "abc"
+
+
+@pytest.mark.benchmark(group="sanitize_data")
+def test_sanitize_long_text(benchmark):
+    text = "callback?token=abc123&page=1 Authorization: Bearer xyz " * 200
+    sanitized = benchmark(SecurityUtil.sanitize_data, text)
+    assert "abc123" not in sanitized
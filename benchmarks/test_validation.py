@@ -0,0 +1,57 @@
+"""
+DataValidator 结构与业务规则校验、AssertUtil 嵌套字段断言的耗时
+"""
+import pytest
+
+from common.assert_util import AssertUtil
+from common.data_validator import DataValidator
+
+SCHEMA = {
+    "code": "str",
+    "data.total": "int",
+    "data.records[*].id": "int",
+    "data.records[*].amount": "number",
+    "data.records[*].owner.name": "str",
+    "data.records[*].remark?": ["str", "null"],
+}
+RULES = [
+    {"field": "code", "operator": "eq", "value": "200"},
+    {"field": "data.total", "operator": "gte", "value": 1},
+    {"field": "data.records[*].status", "operator": "in", "value": ["ACTIVE", "DRAFT"]},
+    {"field": "data.records[*].contractName", "operator": "regex", "value": "^基准合同"},
+]
+
+
+def _validate(response):
+    return DataValidator(response).validate_schema(SCHEMA).validate_business_rules(RULES)
+
+
+@pytest.mark.benchmark(group="DataValidator")
+def test_validate_schema(benchmark, json_response):
+    benchmark(DataValidator(json_response).validate_schema, SCHEMA)
+
+
+@pytest.mark.benchmark(group="DataValidator")
+def test_validate_business_rules(benchmark, json_response):
+    benchmark(DataValidator(json_response).validate_business_rules, RULES)
+
+
+@pytest.mark.benchmark(group="DataValidator")
+def test_validate_schema_and_rules(benchmark, json_response):
+    benchmark(_validate, json_response)
+
+
+@pytest.mark.benchmark(group="AssertUtil")
+def test_assert_nested_field_value(benchmark, json_response):
+    benchmark(AssertUtil.assert_nested_field_value, json_response, "data.records[19].owner.name", "user19")
+
+
+@pytest.mark.benchmark(group="AssertUtil")
+def test_assert_multiple_fields(benchmark, json_response):
+    expectations = {f"data.records[{index}].owner.name": f"user{index}" for index in range(0, 20, 4)}
+    benchmark(AssertUtil.assert_multiple_fields, json_response, expectations)
+
+
+@pytest.mark.benchmark(group="AssertUtil")
+def test_assert_column(benchmark, json_response):
+    benchmark(AssertUtil.assert_column, json_response, "data.records[*].id", min_value=0, unique=True, order="asc")
@@ -0,0 +1,40 @@
+"""
+Allure报告工具 - 延迟导入allure
+
+导入 common 下的模块时不再加载allure，首次真正写报告时才导入，
+减少 pytest -k 快速筛选和并行模式下每个worker的启动耗时。
+"""
+import functools
+
+_allure = None
+
+
+def get_allure():
+    """获取allure模块（首次调用时导入）"""
+    global _allure
+    if _allure is None:
+        import allure
+        _allure = allure
+    return _allure
+
+
+def step(title):
+    """延迟版 allure.step 装饰器，被装饰函数首次调用时才导入allure"""
+    def decorator(func):
+        wrapped = None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            nonlocal wrapped
+            if wrapped is None:
+                wrapped = get_allure().step(title)(func)
+            return wrapped(*args, **kwargs)
+
+        return wrapper
+    return decorator
+
+
+def attach(body, name=None, attachment_type="TEXT"):
+    """添加allure附件，attachment_type 为 allure.attachment_type 的成员名（如 TEXT、JSON）"""
+    allure = get_allure()
+    allure.attach(body, name=name, attachment_type=getattr(allure.attachment_type, attachment_type))
@@ -0,0 +1,220 @@
+"""
+声明式API客户端 - 按 config/endpoints.yaml 中的接口定义生成各模块的API类
+
+    ContractAPI = api_class("contract")
+    ContractAPI(req).create_contract(payload, headers)
+
+    client = ApiClient(req)
+    client.project.get_project_by_id(1, headers)
+    client.project.call_many("get_project_by_id", [(1,), (2,), (3,)], headers)
+
+接口定义只在首次使用时解析一次（文件修改后自动重新加载），每个模块的类只生成一次；
+所有模块共用同一条调用路径：URL拼装、请求日志、allure步骤、重试策略（非幂等接口不重试）、
+性能预算检查，连接池、响应缓存和请求指标由 RequestUtil 统一提供。
+"""
+import functools
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from common.allure_util import step
+from common.config_manager import ConfigManager
+from common.exceptions import ConfigurationError
+from common.logger import Logger
+
+logger = Logger().get_logger()
+
+DEFAULT_ENDPOINTS_FILE = Path(__file__).parent.parent / "config" / "endpoints.yaml"
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+PAYLOAD_KINDS = ("json", "params", "data")
+_PATH_PARAM = re.compile(r"{(\w+)}")
+
+
+class Endpoint:
+    """单个接口的定义"""
+
+    __slots__ = ("name", "summary", "method", "path", "path_params", "payload", "fields",
+                 "idempotent", "budget_ms", "timeout", "arity", "url_format", "defaults")
+
+    def __init__(self, name: str, spec: Dict[str, Any]):
+        self.name = name
+        self.summary = spec.get("summary") or name
+        self.method = str(spec.get("method", "GET")).upper()
+        self.path = spec.get("path")
+        if not self.path:
+            raise ConfigurationError(f"接口{name}缺少 path", config_key=name)
+        self.path_params: Tuple[str, ...] = tuple(_PATH_PARAM.findall(self.path))
+        self.fields: Tuple[str, ...] = tuple(spec.get("fields") or ())
+        self.payload: Optional[str] = spec.get("payload") or ("json" if self.fields else None)
+        if self.payload is not None and self.payload not in PAYLOAD_KINDS:
+            raise ConfigurationError(f"接口{name}的 payload 只能是 {'/'.join(PAYLOAD_KINDS)}", config_key=name)
+        self.idempotent = bool(spec.get("idempotent", self.method in IDEMPOTENT_METHODS))
+        self.budget_ms = spec.get("budget_ms")
+        self.timeout = spec.get("timeout")
+        # 不含 headers 的位置参数个数
+        self.arity = len(self.path_params) + (len(self.fields) if self.fields else int(self.payload is not None))
+        # 预先处理的调用模板：路径参数按位置填充的URL格式串、每次调用都要带上的请求参数
+        self.url_format = _PATH_PARAM.sub("{}", self.path)
+        self.defaults: Dict[str, Any] = {}
+        if not self.idempotent:
+            # 非幂等接口重试可能产生重复数据，失败时直接返回/抛出
+            self.defaults["max_retries"] = 1
+        if self.timeout is not None:
+            self.defaults["timeout"] = self.timeout
+
+    def signature(self) -> str:
+        body = list(self.fields) if self.fields else (["payload" if self.payload == "json" else self.payload]
+                                                      if self.payload else [])
+        return f"{self.name}({', '.join([*self.path_params, *body, 'headers'])})"
+
+    def build(self, args: Tuple[Any, ...]) -> Tuple[str, Optional[Any]]:
+        """由位置参数得到 (URL, 请求体或查询参数)"""
+        count = len(self.path_params)
+        url = self.url_format.format(*args[:count]) if count else self.path
+        rest = args[count:]
+        if self.fields:
+            return url, dict(zip(self.fields, rest))
+        return url, rest[0] if self.payload else None
+
+
+class ApiModule:
+    """生成的API类的基类，实例绑定一个 RequestUtil"""
+
+    module_name = ""
+    endpoints: Dict[str, Endpoint] = {}
+
+    def __init__(self, request_util):
+        self.req = request_util
+
+    def _call(self, endpoint: Endpoint, args: Tuple[Any, ...], headers: Optional[Dict[str, str]],
+              kwargs: Dict[str, Any]):
+        if len(args) == endpoint.arity + 1 and headers is None:
+            args, headers = args[:-1], args[-1]
+        if len(args) != endpoint.arity:
+            raise TypeError(f"{type(self).__name__}.{endpoint.signature()} 参数个数不匹配，实际传入{len(args)}个")
+
+        url, body = endpoint.build(args)
+        if body is not None:
+            kwargs[endpoint.payload] = body
+        if headers is not None:
+            kwargs["headers"] = headers
+        for key, value in endpoint.defaults.items():
+            kwargs.setdefault(key, value)
+
+        # 请求参数和响应内容由 RequestUtil 统一记录（已脱敏、限制长度），这里只记录调用的接口
+        logger.info(f"{endpoint.summary}: {endpoint.method} {url}")
+        response = self.req.send_request(endpoint.method, url, **kwargs)
+        if endpoint.budget_ms is not None:
+            _check_budget(endpoint, response)
+        return response
+
+    def call_many(self, name: str, calls: Iterable[Tuple[Any, ...]], headers: Optional[Dict[str, str]] = None,
+                  max_workers: int = 8, **kwargs) -> List[Any]:
+        """并发调用同一接口，返回与 calls 顺序一致的响应列表
+
+        Args:
+            name: 接口方法名，如 "get_project_by_id"
+            calls: 每次调用的位置参数（不含 headers），如 [(1,), (2,)]
+        """
+        method = getattr(self, name)
+        calls = [tuple(args) for args in calls]
+        if not calls:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(calls)),
+                                thread_name_prefix=f"api-{self.module_name}") as executor:
+            futures = [executor.submit(method, *args, headers=headers, **dict(kwargs)) for args in calls]
+            return [future.result() for future in futures]
+
+
+def _check_budget(endpoint: Endpoint, response) -> None:
+    elapsed = getattr(response, "elapsed", None)
+    if elapsed is None:
+        return
+    elapsed_ms = elapsed.total_seconds() * 1000
+    if elapsed_ms <= endpoint.budget_ms:
+        return
+    message = f"{endpoint.summary}响应时间{elapsed_ms:.0f}ms超过性能预算{endpoint.budget_ms}ms"
+    if ConfigManager().get("api_budget_strict", False):
+        raise AssertionError(message)
+    logger.warning(message)
+
+
+def _make_method(endpoint: Endpoint):
+    def call(self, *args, headers=None, **kwargs):
+        return self._call(endpoint, args, headers, kwargs)
+
+    call.__name__ = call.__qualname__ = endpoint.name
+    call.__doc__ = f"{endpoint.summary}: {endpoint.method} {endpoint.path}"
+    return step(endpoint.summary)(call)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_spec(path: str, mtime_ns: int) -> Dict[str, Any]:
+    import yaml
+
+    with open(path, "r", encoding="utf-8") as f:
+        spec = yaml.safe_load(f) or {}
+    logger.info(f"已加载接口定义: {path}, 模块: {list(spec)}")
+    return spec
+
+
+def _endpoints_file(path: Optional[str] = None) -> Path:
+    return Path(path or ConfigManager().get("endpoints_file") or DEFAULT_ENDPOINTS_FILE)
+
+
+def load_spec(path: Optional[str] = None) -> Dict[str, Any]:
+    """读取接口定义（按文件修改时间缓存）"""
+    spec_file = _endpoints_file(path)
+    try:
+        mtime_ns = spec_file.stat().st_mtime_ns
+    except OSError:
+        raise ConfigurationError(f"接口定义文件不存在: {spec_file}", config_key="endpoints_file")
+    return _load_spec(str(spec_file), mtime_ns)
+
+
+@functools.lru_cache(maxsize=None)
+def _build_class(module: str, class_name: str, spec_file: str, mtime_ns: int) -> type:
+    spec = _load_spec(spec_file, mtime_ns)
+    if module not in spec:
+        raise ConfigurationError(f"接口定义中没有模块: {module}，可选: {', '.join(spec)}", config_key=module)
+    endpoints = {name: Endpoint(name, item or {}) for name, item in (spec[module].get("endpoints") or {}).items()}
+    namespace: Dict[str, Any] = {name: _make_method(endpoint) for name, endpoint in endpoints.items()}
+    namespace.update(module_name=module, endpoints=endpoints,
+                     __doc__=f"{spec[module].get('description', module)}API（由接口定义生成）")
+    return type(class_name, (ApiModule,), namespace)
+
+
+def api_class(module: str, class_name: Optional[str] = None, path: Optional[str] = None) -> type:
+    """生成（或取缓存的）模块API类，如 api_class("contract") -> ContractAPI"""
+    spec_file = _endpoints_file(path)
+    load_spec(path)
+    class_name = class_name or f"{module.title().replace('_', '')}API"
+    return _build_class(module, class_name, str(spec_file), spec_file.stat().st_mtime_ns)
+
+
+class ApiClient:
+    """所有模块的统一入口：client.<模块>.<接口方法>(...)，模块实例首次访问时创建并缓存"""
+
+    def __init__(self, request_util, path: Optional[str] = None):
+        self.req = request_util
+        self.path = path
+        self._modules: Dict[str, ApiModule] = {}
+
+    @property
+    def modules(self) -> List[str]:
+        return list(load_spec(self.path))
+
+    def module(self, name: str) -> ApiModule:
+        instance = self._modules.get(name)
+        if instance is None:
+            instance = self._modules[name] = api_class(name, path=self.path)(self.req)
+        return instance
+
+    def __getattr__(self, name: str) -> ApiModule:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self.module(name)
+        except ConfigurationError as e:
+            raise AttributeError(str(e)) from None
@@ -1,71 +1,241 @@
 """
 响应断言工具类
+
+字段名均支持路径写法（data.user.name、data.list[0].id），列表字段用 data[*].amount 整列断言。
 """
-import allure
+import re
+from typing import Any, Iterable, List, Optional
+
 from common.logger import Logger
+from common.allure_util import step
+from common.path_util import PathNotFound, extract_column, get_value, has_path
 
 logger = Logger().get_logger()
 
+# 列数据达到该长度且为数值时使用NumPy（数据量小时转换数组的开销大于收益）
+NUMPY_MIN_SIZE = 256
+# 断言失败信息中最多列出的违规元素数
+MAX_REPORTED = 5
+_numpy = None
+
+
+def _get_numpy():
+    """NumPy为可选依赖，未安装时返回None"""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy or None
+
+
+def _field_value(response_json, field_name):
+    try:
+        return get_value(response_json, field_name)
+    except PathNotFound as e:
+        raise AssertionError(str(e)) from None
+
+
+def _describe(values: List[Any], indices: Iterable[int]) -> str:
+    indices = list(indices)
+    shown = ", ".join(f"[{i}]={values[i]!r}" for i in indices[:MAX_REPORTED])
+    more = f" 等{len(indices)}个" if len(indices) > MAX_REPORTED else ""
+    return f"{shown}{more}"
+
+
+def check_column(path: str, values: List[Any], min_value=None, max_value=None, unique: bool = False,
+                 order: Optional[str] = None, allowed: Optional[Iterable[Any]] = None,
+                 max_null_rate: Optional[float] = None) -> List[str]:
+    """对一列值做范围、唯一性、排序、枚举、空值率检查，返回失败信息列表（全部通过时为空）
+
+    None 计入空值率，不参与其他检查。数值列达到 NUMPY_MIN_SIZE 且已安装NumPy时向量化计算，
+    否则一次遍历完成所有检查。
+
+    Args:
+        order: "asc" 非降序 / "desc" 非升序
+        allowed: 允许的取值集合（与唯一性检查一样按类型区分，True 与 1 不等）
+        max_null_rate: 允许的最大空值比例（0 表示不允许空值）
+    """
+    if order not in (None, "asc", "desc"):
+        raise ValueError(f"不支持的排序方式: {order}，可选 asc / desc")
+    positions = [i for i, value in enumerate(values) if value is not None]
+    present = [values[i] for i in positions]
+    errors = []
+
+    null_count = len(values) - len(present)
+    if max_null_rate is not None and values and null_count / len(values) > max_null_rate:
+        errors.append(f"{path} 空值率 {null_count / len(values):.2%} 超过 {max_null_rate:.2%}"
+                      f"（{null_count}/{len(values)}）")
+
+    numpy = _get_numpy() if len(present) >= NUMPY_MIN_SIZE else None
+    column = numpy.asarray(present) if numpy is not None else None
+    if column is not None and column.dtype.kind in "iuf":
+        out_of_range, duplicates, unordered = _numeric_violations(numpy, column, min_value, max_value, unique, order)
+        not_allowed = []
+        if allowed is not None:
+            not_allowed = numpy.flatnonzero(~numpy.isin(column, list(allowed))).tolist()
+    else:
+        out_of_range, duplicates, unordered, not_allowed = _python_violations(
+            present, min_value, max_value, unique, order, allowed)
+
+    def original(indices):
+        return [positions[i] for i in indices]
+
+    if out_of_range:
+        errors.append(f"{path} 超出范围[{min_value}, {max_value}]: {_describe(values, original(out_of_range))}")
+    if duplicates:
+        errors.append(f"{path} 存在重复值: {_describe(values, original(duplicates))}")
+    if unordered is not None:
+        i = positions[unordered]
+        errors.append(f"{path} 未按{'升序' if order == 'asc' else '降序'}排列: "
+                      f"{_describe(values, [positions[unordered - 1], i])}")
+    if not_allowed:
+        errors.append(f"{path} 存在不允许的取值: {_describe(values, original(not_allowed))}")
+    return errors
+
+
+def _numeric_violations(numpy, column, min_value, max_value, unique, order):
+    out_of_range = []
+    if min_value is not None or max_value is not None:
+        mask = numpy.zeros(column.shape, dtype=bool)
+        if min_value is not None:
+            mask |= column < min_value
+        if max_value is not None:
+            mask |= column > max_value
+        out_of_range = numpy.flatnonzero(mask).tolist()
+    duplicates = []
+    if unique:
+        _, first_index = numpy.unique(column, return_index=True)
+        if first_index.size != column.size:
+            keep = numpy.zeros(column.shape, dtype=bool)
+            keep[first_index] = True
+            duplicates = numpy.flatnonzero(~keep).tolist()
+    unordered = None
+    if order and column.size > 1:
+        diffs = numpy.diff(column)
+        bad = numpy.flatnonzero(diffs < 0 if order == "asc" else diffs > 0)
+        if bad.size:
+            unordered = int(bad[0]) + 1
+    return out_of_range, duplicates, unordered
+
+
+def _value_key(value):
+    """唯一性和枚举检查按类型区分取值（与 SubtreeHasher 一致），1 / 1.0 / True 互不相等"""
+    if isinstance(value, (str, int, float, bool)):
+        return type(value).__name__, value
+    return type(value).__name__, repr(value)
+
+
+def _python_violations(present, min_value, max_value, unique, order, allowed):
+    out_of_range, duplicates, not_allowed = [], [], []
+    unordered = None
+    seen = set()
+    key_of = _value_key
+    allowed_set = None
+    if unique or allowed is not None:
+        types = set(map(type, present))
+        if len(types) == 1 and types <= {str, int, float, bool}:
+            # 常见的单一标量类型列：取值本身即可区分，不必逐个构造带类型的键
+            key_of = None
+            if allowed is not None:
+                value_type = types.pop()
+                allowed_set = {value for value in allowed if type(value) is value_type}
+        elif allowed is not None:
+            allowed_set = {_value_key(value) for value in allowed}
+    check_range = min_value is not None or max_value is not None
+    for i, value in enumerate(present):
+        # 类型不可比较（如数字与字符串混合）视为违规
+        if check_range:
+            try:
+                if (min_value is not None and value < min_value) or (max_value is not None and value > max_value):
+                    out_of_range.append(i)
+            except TypeError:
+                out_of_range.append(i)
+        if order and unordered is None and i:
+            try:
+                if value < present[i - 1] if order == "asc" else value > present[i - 1]:
+                    unordered = i
+            except TypeError:
+                unordered = i
+        if unique or allowed_set is not None:
+            key = value if key_of is None else key_of(value)
+            if unique:
+                if key in seen:
+                    duplicates.append(i)
+                else:
+                    seen.add(key)
+            if allowed_set is not None and key not in allowed_set:
+                not_allowed.append(i)
+    return out_of_range, duplicates, unordered, not_allowed
+
+
 class AssertUtil:
     """API响应断言工具类"""
     
     @staticmethod
-    @allure.step("断言响应状态码为200")
+    @step("断言响应状态码为200")
     def assert_status_code_200(response):
         """断言响应状态码为200"""
         assert response.status_code == 200, f"期望状态码200，实际状态码{response.status_code}"
         logger.info(f"状态码断言成功: {response.status_code}")
     
     @staticmethod
-    @allure.step("断言响应成功")
+    @step("断言响应成功")
     def assert_response_success(response):
         """断言响应成功（状态码200且code为200）"""
         AssertUtil.assert_status_code_200(response)
         response_json = response.json()
         assert response_json.get("code") == "200", f"期望code为200，实际为{response_json.get('code')}"
         logger.info(f"响应成功断言通过: code={response_json.get('code')}")
-    
+
+    @staticmethod
+    @step("断言响应失败")
+    def assert_response_error(response, expected_message=None):
+        """断言响应失败（HTTP状态码非2xx或code不为200），可选断言message包含指定内容"""
+        try:
+            response_json = response.json()
+        except ValueError:
+            response_json = {}
+        code = response_json.get("code") if isinstance(response_json, dict) else None
+        assert response.status_code >= 300 or code != "200", \
+            f"期望响应失败，实际状态码{response.status_code}，code为{code}"
+        if expected_message is not None:
+            message = str(response_json.get("message", "")) if isinstance(response_json, dict) else ""
+            assert expected_message in message, f"期望错误信息包含'{expected_message}'，实际为'{message}'"
+        logger.info(f"响应失败断言通过: status={response.status_code}, code={code}")
+
     @staticmethod
-    @allure.step("断言响应字段值")
+    @step("断言响应字段值")
     def assert_response_field_value(response, field_name, expected_value):
-        """断言响应字段值"""
-        response_json = response.json()
-        actual_value = response_json.get(field_name)
+        """断言响应字段值，字段名支持 data.user.name 路径"""
+        actual_value = _field_value(response.json(), field_name)
         assert actual_value == expected_value, f"字段{field_name}期望值为{expected_value}，实际值为{actual_value}"
         logger.info(f"字段值断言通过: {field_name}={actual_value}")
 
     @staticmethod
-    @allure.step("断言嵌套字段值")
+    @step("断言嵌套字段值")
     def assert_nested_field_value(response, field_path, expected_value):
-        """断言嵌套字段值，支持 data.user.name 格式"""
-        response_json = response.json()
-        actual_value = response_json
-
-        # 按路径逐层获取值
-        for field in field_path.split('.'):
-            if isinstance(actual_value, dict) and field in actual_value:
-                actual_value = actual_value[field]
-            else:
-                assert False, f"字段路径 {field_path} 不存在"
-
+        """断言嵌套字段值，支持 data.user.name、data.list[0].id 格式"""
+        actual_value = _field_value(response.json(), field_path)
         assert actual_value == expected_value, f"字段{field_path}期望值为{expected_value}，实际值为{actual_value}"
         logger.info(f"嵌套字段值断言通过: {field_path}={actual_value}")
 
     @staticmethod
-    @allure.step("断言字段值类型")
+    @step("断言字段值类型")
     def assert_field_type(response, field_name, expected_type):
         """断言字段值类型"""
-        response_json = response.json()
-        actual_value = response_json.get(field_name)
+        actual_value = _field_value(response.json(), field_name)
         assert isinstance(actual_value, expected_type), f"字段{field_name}期望类型{expected_type.__name__}，实际类型{type(actual_value).__name__}"
         logger.info(f"字段类型断言通过: {field_name} 类型为 {type(actual_value).__name__}")
 
     @staticmethod
-    @allure.step("断言字段值范围")
+    @step("断言字段值范围")
     def assert_field_value_range(response, field_name, min_value=None, max_value=None):
         """断言字段值在指定范围内"""
-        response_json = response.json()
-        actual_value = response_json.get(field_name)
+        actual_value = _field_value(response.json(), field_name)
+        assert actual_value is not None, f"字段{field_name}值为空"
 
         if min_value is not None:
             assert actual_value >= min_value, f"字段{field_name}值{actual_value}小于最小值{min_value}"
@@ -76,28 +246,35 @@ class AssertUtil:
         logger.info(f"字段范围断言通过: {field_name}={actual_value}")
 
     @staticmethod
-    @allure.step("断言字段值包含子串")
+    @step("断言字段值包含子串")
     def assert_field_contains(response, field_name, expected_substring):
         """断言字段值包含指定子串"""
-        response_json = response.json()
-        actual_value = str(response_json.get(field_name, ""))
+        actual_value = str(get_value(response.json(), field_name, ""))
         assert expected_substring in actual_value, f"字段{field_name}值'{actual_value}'不包含'{expected_substring}'"
         logger.info(f"字段包含断言通过: {field_name} 包含 '{expected_substring}'")
 
     @staticmethod
-    @allure.step("批量断言字段值")
+    @step("断言字段值匹配正则")
+    def assert_field_regex(response, field_name, pattern):
+        """断言字段值（从开头）匹配正则表达式"""
+        actual_value = _field_value(response.json(), field_name)
+        assert re.match(pattern, str(actual_value)), f"字段{field_name}值'{actual_value}'不匹配正则'{pattern}'"
+        logger.info(f"字段正则断言通过: {field_name}={actual_value}")
+
+    @staticmethod
+    @step("批量断言字段值")
     def assert_multiple_fields(response, field_expectations):
         """批量断言多个字段值
 
         Args:
             response: HTTP响应对象
-            field_expectations: 字段期望值字典，格式：{"field_name": expected_value}
+            field_expectations: 字段期望值字典，格式：{"field_name": expected_value}，字段名支持路径
         """
         response_json = response.json()
         failed_assertions = []
 
         for field_name, expected_value in field_expectations.items():
-            actual_value = response_json.get(field_name)
+            actual_value = get_value(response_json, field_name, None)
             if actual_value != expected_value:
                 failed_assertions.append(f"字段{field_name}期望值{expected_value}，实际值{actual_value}")
 
@@ -107,9 +284,36 @@ class AssertUtil:
         logger.info(f"批量字段断言通过: {list(field_expectations.keys())}")
 
     @staticmethod
-    @allure.step("断言响应包含字段")
+    @step("断言响应包含字段")
     def assert_response_contains_field(response, field_name):
         """断言响应包含指定字段"""
-        response_json = response.json()
-        assert field_name in response_json, f"响应中缺少字段: {field_name}"
-        logger.info(f"字段存在断言通过: {field_name}")
\ No newline at end of file
+        assert has_path(response.json(), field_name), f"响应中缺少字段: {field_name}"
+        logger.info(f"字段存在断言通过: {field_name}")
+
+    @staticmethod
+    @step("断言字典包含字段")
+    def assert_dict_contains_keys(data, field_paths):
+        """断言字典（或已解析的响应JSON）包含所有指定字段路径"""
+        missing = [path for path in field_paths if not has_path(data, path)]
+        assert not missing, f"缺少字段: {missing}"
+        logger.info(f"字段存在断言通过: {list(field_paths)}")
+
+    @staticmethod
+    @step("断言列表字段")
+    def assert_column(response, path, min_value=None, max_value=None, unique=False, order=None,
+                      allowed=None, max_null_rate=None, not_empty=False):
+        """对列表中所有元素的同一字段整列断言，如 data[*].amount
+
+        一次提取整列后完成范围、唯一性、排序（order="asc"/"desc"）、枚举（allowed）、
+        空值率（max_null_rate）检查，所有失败项合并为一条断言错误。
+        """
+        response_json = response if isinstance(response, (dict, list)) else response.json()
+        try:
+            values = extract_column(response_json, path)
+        except PathNotFound as e:
+            raise AssertionError(str(e)) from None
+        assert values or not not_empty, f"{path} 为空列表"
+        errors = check_column(path, values, min_value=min_value, max_value=max_value, unique=unique,
+                              order=order, allowed=allowed, max_null_rate=max_null_rate)
+        assert not errors, "列表字段断言失败: " + "; ".join(errors)
+        logger.info(f"列表字段断言通过: {path}，共{len(values)}项")
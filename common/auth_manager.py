@@ -0,0 +1,188 @@
+"""
+认证管理 - 将 获取验证码 -> 登录 作为一个整体重试，多线程共享同一次登录
+
+    auth = AuthManager(req, config["username"], config["password"], config["captcha"])
+    token = auth.token()            # 首次调用时登录，之后返回缓存的token
+    token = auth.refresh(token)     # token失效（如401）时刷新；其他线程已刷新时直接返回新token
+
+- 每次尝试都重新获取验证码和checkKey，登录失败不会复用已失效的checkKey
+- 失败后按指数退避加随机抖动（full jitter）等待，避免多个worker同时重试
+- 同一时刻只有一个线程执行登录，其余调用方等待并共享其结果（single-flight）
+- 验证码、登录、整体耗时记录在直方图中，stats() 返回统计，开启链路追踪时记录span
+"""
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+from common.exceptions import AuthenticationError
+from common.freeze_util import freeze
+from common.logger import Logger
+from common.metrics import LatencyHistogram
+from common.tracing import tracer
+
+logger = Logger().get_logger()
+
+CAPTCHA_URL = "/rpm-api/auth/generateCaptcha"
+LOGIN_URL = "/rpm-api/auth/login"
+# 获取验证码、登录接口使用的请求头（只读，RequestUtil 按对象缓存合并后的结果）
+AUTH_HEADERS = freeze({
+    "accept": "application/json, text/plain, */*",
+    "appid": "app-7zpfoeqntj6",
+    "content-type": "application/json;charset=UTF-8",
+})
+TIMING_NAMES = ("captcha", "login", "total")
+
+
+class AuthManager:
+    """验证码登录流程及token缓存"""
+
+    def __init__(self, req, username: str, password: str, captcha: Optional[str] = None,
+                 max_attempts: int = 3, backoff_base: float = 1.0, backoff_max: float = 10.0,
+                 captcha_solver: Optional[Callable[[Dict[str, Any]], str]] = None):
+        """
+        Args:
+            captcha: 固定验证码（测试环境的万能验证码）
+            max_attempts: 验证码+登录整体的最大尝试次数
+            backoff_base / backoff_max: 第n次失败后等待 random(0, min(backoff_max, backoff_base * 2^(n-1))) 秒
+            captcha_solver: 验证码识别函数，参数为验证码接口返回的 data，返回验证码文本；为空时使用 captcha
+        """
+        self.req = req
+        self.username = username
+        self.password = password
+        self.captcha = captcha
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.captcha_solver = captcha_solver
+        self._token: Optional[str] = None
+        self._flight: Optional[Future] = None
+        self._lock = threading.Lock()
+        self._timings = {name: LatencyHistogram() for name in TIMING_NAMES}
+        self._counters = {"logins": 0, "attempts": 0, "failures": 0, "shared": 0}
+
+    def token(self) -> str:
+        """返回缓存的token，尚未登录时登录"""
+        token = self._token
+        if token is not None:
+            return token
+        return self._single_flight(None)
+
+    def refresh(self, stale_token: Optional[str] = None) -> str:
+        """重新登录并返回新token
+
+        传入失效的token时，如果其他线程已经换成了新token，直接返回新token而不重复登录。
+        """
+        return self._single_flight(stale_token, force=True)
+
+    def invalidate(self) -> None:
+        """清除缓存的token，下次 token() 时重新登录"""
+        with self._lock:
+            self._token = None
+
+    def _single_flight(self, stale_token: Optional[str], force: bool = False) -> str:
+        with self._lock:
+            token = self._token
+            if token is not None and (not force or token != stale_token):
+                return token
+            flight = self._flight
+            leader = flight is None
+            if leader:
+                flight = self._flight = Future()
+            else:
+                self._counters["shared"] += 1
+        if not leader:
+            logger.info("等待进行中的登录完成")
+            return flight.result()
+
+        try:
+            token = self._login_with_retry()
+        except BaseException as e:
+            with self._lock:
+                self._flight = None
+            flight.set_exception(e)
+            raise
+        with self._lock:
+            self._token = token
+            self._flight = None
+        flight.set_result(token)
+        return token
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    def _login_with_retry(self) -> str:
+        start = time.perf_counter()
+        last_error: Optional[Exception] = None
+        with tracer.span("auth.login", username=self.username):
+            for attempt in range(1, self.max_attempts + 1):
+                self._counters["attempts"] += 1
+                try:
+                    check_key, captcha = self._fetch_captcha()
+                    token = self._login(check_key, captcha)
+                except Exception as e:
+                    # 网络错误在 RequestUtil 内已重试过，这里与业务失败一样重新获取验证码后整体重试
+                    last_error = e
+                    self._counters["failures"] += 1
+                    if attempt == self.max_attempts:
+                        break
+                    delay = self._backoff(attempt)
+                    logger.warning(f"登录失败，第{attempt}/{self.max_attempts}次尝试: {e}，{delay:.2f}s后重新获取验证码")
+                    time.sleep(delay)
+                    continue
+                self._counters["logins"] += 1
+                self._timings["total"].record((time.perf_counter() - start) * 1000)
+                logger.info(f"登录成功，第{attempt}次尝试，耗时{(time.perf_counter() - start) * 1000:.0f}ms")
+                return token
+        logger.error(f"登录达到最大尝试次数{self.max_attempts}，测试终止")
+        raise AuthenticationError(f"登录失败（已尝试{self.max_attempts}次）: {last_error}", username=self.username,
+                                  response_code=getattr(last_error, "response_code", None)) from last_error
+
+    def _fetch_captcha(self):
+        start = time.perf_counter()
+        with tracer.span("auth.captcha"):
+            try:
+                response = self.req.send_request("GET", CAPTCHA_URL, headers=AUTH_HEADERS,
+                                                 params={"checkKey": "", "_t": int(time.time() * 1000)},
+                                                 use_cache=False)
+            finally:
+                self._timings["captcha"].record((time.perf_counter() - start) * 1000)
+        data = self._data(response, "获取验证码")
+        check_key = data.get("checkKey") if isinstance(data, dict) else None
+        if not check_key:
+            raise AuthenticationError("验证码接口未返回checkKey", username=self.username,
+                                      response_code=response.status_code)
+        captcha = self.captcha_solver(data) if self.captcha_solver else self.captcha
+        return check_key, captcha
+
+    def _login(self, check_key: str, captcha: Optional[str]) -> str:
+        payload = {"username": self.username, "password": self.password, "checkKey": check_key, "captcha": captcha}
+        start = time.perf_counter()
+        with tracer.span("auth.submit"):
+            try:
+                # 登录为非幂等操作，失败时由本类重新获取验证码后整体重试
+                response = self.req.send_request("POST", LOGIN_URL, json=payload, headers=AUTH_HEADERS, max_retries=1)
+            finally:
+                self._timings["login"].record((time.perf_counter() - start) * 1000)
+        data = self._data(response, "登录")
+        token = data.get("token") if isinstance(data, dict) else None
+        if not token:
+            raise AuthenticationError("登录接口未返回token", username=self.username, response_code=response.status_code)
+        return token
+
+    def _data(self, response, action: str) -> Any:
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        if response.status_code != 200 or not isinstance(body, dict) or body.get("code") != "200":
+            message = body.get("message") if isinstance(body, dict) else response.text[:200]
+            raise AuthenticationError(f"{action}失败: {response.status_code} - {message}",
+                                      username=self.username, response_code=response.status_code)
+        return body.get("data")
+
+    def stats(self) -> Dict[str, Any]:
+        """登录次数、尝试/失败次数、共享等待次数及各阶段耗时分布（毫秒）"""
+        return {**self._counters,
+                **{name: histogram.distribution() for name, histogram in self._timings.items() if histogram.count}}
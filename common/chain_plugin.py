@@ -0,0 +1,205 @@
+"""
+用例链调度插件 - 按声明的资源依赖排序CRUD用例链，独立的链可并行执行
+
+用例通过标记声明产出和依赖的资源::
+
+    @pytest.mark.produces("contract.id")
+    def test_create_contract(self, ..., chain_store):
+        chain_store.put("contract.id", response.json()["data"]["id"])
+
+    @pytest.mark.consumes("contract.id", source="test_create_contract")
+    def test_get_created_contract(self, ..., chain_store):
+        contract_id = chain_store.get("contract.id")
+
+存在依赖关系的用例组成一条链：链内按依赖顺序执行，链与链之间互不影响。
+使用 pytest-xdist 时每条链标记为同一个 xdist_group，``pytest -n auto`` 会自动
+使用 loadgroup 分发方式，使不同的链在不同worker上并行执行。
+产出方用例失败或跳过时，依赖它的用例自动跳过。
+"""
+import heapq
+import threading
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from common.logger import Logger
+
+logger = Logger().get_logger()
+
+_MISSING = object()
+
+
+class ChainStore:
+    """用例链之间传递资源的存储（线程安全）"""
+
+    def __init__(self):
+        self._values: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._values[key] = value
+        logger.info(f"用例链产出资源: {key}={value}")
+
+    def get(self, key: str, default: Any = _MISSING) -> Any:
+        with self._lock:
+            value = self._values.get(key, default)
+        if value is _MISSING:
+            pytest.skip(f"用例链资源 {key} 尚未产出")
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._values
+
+
+def _marker_keys(item, name: str) -> List[str]:
+    return [key for marker in item.iter_markers(name) for key in marker.args]
+
+
+def _producers_of(item, key: str, source: Optional[str], producers: Dict[str, List[Any]]) -> List[Any]:
+    """查找 item 所依赖的产出方：指定 source 时按函数名筛选，否则优先同一模块内的产出方"""
+    candidates = producers.get(key, [])
+    if source:
+        candidates = [producer for producer in candidates if producer.originalname == source]
+    else:
+        same_module = [producer for producer in candidates if producer.module is item.module]
+        candidates = same_module or candidates
+    return [producer for producer in candidates if producer is not item]
+
+
+def _find(parent: Dict[Any, Any], item: Any) -> Any:
+    while parent[item] is not item:
+        parent[item] = parent[parent[item]]
+        item = parent[item]
+    return item
+
+
+def build_chains(items: List[Any]) -> List[List[Any]]:
+    """根据 produces/consumes 标记把用例分组为链，链内按依赖拓扑排序（同层保持原有顺序）"""
+    producers: Dict[str, List[Any]] = {}
+    for item in items:
+        for key in _marker_keys(item, "produces"):
+            producers.setdefault(key, []).append(item)
+
+    parent = {item: item for item in items}
+    dependencies: Dict[Any, List[Any]] = {}
+    for item in items:
+        for marker in item.iter_markers("consumes"):
+            for key in marker.args:
+                upstream = _producers_of(item, key, marker.kwargs.get("source"), producers)
+                if not upstream:
+                    logger.warning(f"用例 {item.nodeid} 依赖的资源 {key} 没有产出方")
+                for producer in upstream:
+                    dependencies.setdefault(item, []).append(producer)
+                    parent[_find(parent, item)] = _find(parent, producer)
+
+    members: Dict[Any, List[Any]] = {}
+    for item in items:
+        if item in dependencies or any(item in deps for deps in dependencies.values()):
+            members.setdefault(_find(parent, item), []).append(item)
+
+    order = {item: index for index, item in enumerate(items)}
+    chains = []
+    for group in members.values():
+        pending = {item: len(set(dependencies.get(item, ()))) for item in group}
+        downstream: Dict[Any, List[Any]] = {}
+        for item in group:
+            for producer in set(dependencies.get(item, ())):
+                downstream.setdefault(producer, []).append(item)
+        ready = [(order[item], item) for item, count in pending.items() if count == 0]
+        heapq.heapify(ready)
+        chain = []
+        while ready:
+            _, item = heapq.heappop(ready)
+            chain.append(item)
+            for consumer in downstream.get(item, ()):
+                pending[consumer] -= 1
+                if pending[consumer] == 0:
+                    heapq.heappush(ready, (order[consumer], consumer))
+        if len(chain) != len(group):
+            cycle = [item.nodeid for item in group if item not in chain]
+            raise pytest.UsageError(f"用例链存在循环依赖: {cycle}")
+        chains.append(chain)
+    return chains
+
+
+@pytest.fixture(scope="session")
+def chain_store():
+    """用例链资源存储：产出方 put，依赖方 get"""
+    return ChainStore()
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "produces(*keys): 用例产出的资源，如 contract.id")
+    config.addinivalue_line("markers", "consumes(*keys, source=None): 用例依赖的资源及其产出用例名")
+    config._chain_outcomes = {}
+    config._chain_dependencies = {}
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_cmdline_main(config):
+    """并行执行且未指定分发方式时使用 loadgroup，保证同一条链在同一个worker上执行"""
+    if getattr(config.option, "numprocesses", None) and getattr(config.option, "dist", None) == "no":
+        config.option.dist = "loadgroup"
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(session, config, items):
+    """把每条链的用例按依赖顺序排在该链第一个用例的位置"""
+    chains = build_chains(items)
+    if not chains:
+        return
+
+    use_xdist_group = config.pluginmanager.hasplugin("xdist")
+    chain_of = {}
+    for index, chain in enumerate(chains):
+        for item in chain:
+            chain_of[item] = index
+            if use_xdist_group:
+                item.add_marker(pytest.mark.xdist_group(name=f"chain-{index}"))
+
+    producers: Dict[str, List[Any]] = {}
+    for item in items:
+        for key in _marker_keys(item, "produces"):
+            producers.setdefault(key, []).append(item)
+    for item in chain_of:
+        config._chain_dependencies[item.nodeid] = [
+            producer.nodeid
+            for marker in item.iter_markers("consumes")
+            for key in marker.args
+            for producer in _producers_of(item, key, marker.kwargs.get("source"), producers)
+        ]
+
+    ordered, emitted = [], set()
+    for item in items:
+        index = chain_of.get(item)
+        if index is None:
+            ordered.append(item)
+        elif index not in emitted:
+            emitted.add(index)
+            ordered.extend(chains[index])
+    items[:] = ordered
+    logger.info(f"用例链调度: {len(chains)}条链, {len(chain_of)}个用例")
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    outcomes = item.config._chain_outcomes
+    if report.when == "setup":
+        # 每次执行（含失败重跑）重新记录产出结果
+        outcomes.pop(item.nodeid, None)
+    if report.when == "call" or report.outcome != "passed":
+        # 任一阶段失败/跳过都视为产出失败，call阶段通过才视为成功
+        if outcomes.get(item.nodeid) in (None, "passed"):
+            outcomes[item.nodeid] = report.outcome
+
+
+def pytest_runtest_setup(item):
+    """产出方未成功执行时跳过依赖它的用例"""
+    for producer in item.config._chain_dependencies.get(item.nodeid, ()):
+        outcome = item.config._chain_outcomes.get(producer)
+        if outcome != "passed":
+            pytest.skip(f"依赖的用例未通过({outcome or '未执行'}): {producer}")
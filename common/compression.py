@@ -0,0 +1,81 @@
+"""
+压缩工具 - 响应压缩协商、流式解压和请求体压缩
+"""
+import json
+from importlib.util import find_spec
+from typing import Any, Optional, Tuple
+
+_ACCEPT_ENCODING: Optional[str] = None
+
+
+def _has_module(*names: str) -> bool:
+    return any(find_spec(name) is not None for name in names)
+
+
+def accept_encoding() -> str:
+    """根据已安装的可选依赖生成 Accept-Encoding，按压缩率从高到低排列
+
+    br 需要 brotli/brotlicffi，zstd 需要 zstandard，缺少时只协商 gzip/deflate；
+    解压由urllib3完成，与其支持的编码保持一致。
+    """
+    global _ACCEPT_ENCODING
+    if _ACCEPT_ENCODING is None:
+        encodings = []
+        if _has_module("zstandard"):
+            from urllib3.response import HAS_ZSTD
+            if HAS_ZSTD:
+                encodings.append("zstd")
+        if _has_module("brotli", "brotlicffi"):
+            encodings.append("br")
+        encodings.extend(["gzip", "deflate"])
+        _ACCEPT_ENCODING = ", ".join(encodings)
+    return _ACCEPT_ENCODING
+
+
+def compress_body(body: bytes, encoding: str = "gzip") -> bytes:
+    """压缩请求体，支持 gzip 和 deflate"""
+    if encoding == "gzip":
+        import gzip
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    if encoding == "deflate":
+        import zlib
+        return zlib.compress(body, 6)
+    raise ValueError(f"不支持的请求体压缩编码: {encoding}")
+
+
+def encode_json_body(payload: Any) -> bytes:
+    """JSON请求体序列化为UTF-8字节（不转义中文，体积更小）"""
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def wire_size(response) -> Tuple[int, int]:
+    """返回响应的 (传输字节数, 解压后字节数)
+
+    传输字节数优先取urllib3记录的已读取字节数，不可用时退回 Content-Length。
+    """
+    body_bytes = len(response.content or b"")
+    wire_bytes = None
+    raw = getattr(response, "raw", None)
+    if raw is not None and hasattr(raw, "tell"):
+        try:
+            wire_bytes = raw.tell()
+        except Exception:
+            wire_bytes = None
+    if not wire_bytes:
+        content_length = response.headers.get("Content-Length")
+        wire_bytes = int(content_length) if content_length and content_length.isdigit() else body_bytes
+    return wire_bytes, body_bytes
+
+
+def stream_json(response, chunk_size: int = 64 * 1024) -> Any:
+    """以流式方式解压响应体并解析JSON，适用于 stream=True 的大响应
+
+    解压后的数据块直接写入同一个缓冲区，再从字节解析JSON，
+    不经过 response.text 的字符串转换和编码探测。
+    """
+    buffer = bytearray()
+    for chunk in response.raw.stream(chunk_size, decode_content=True):
+        buffer += chunk
+    response._content = bytes(buffer)
+    response._content_consumed = True
+    return json.loads(response._content)
@@ -2,87 +2,182 @@
 配置管理器 - 统一管理所有配置
 """
 import os
-import yaml
-from typing import Dict, Any, Optional, List
+import threading
+from collections.abc import Mapping
+from typing import Dict, Any, Optional, List, Callable, Iterator, Tuple
 from pathlib import Path
 from common.logger import Logger
-from common.security_util import SecurityUtil
+from common.exceptions import ConfigurationError
+from common.freeze_util import freeze, thaw
 
 logger = Logger().get_logger()
 
+
+class ConfigSnapshot(Mapping):
+    """不可变配置快照
+
+    创建时将嵌套配置预先展开为 "a.b.c" 形式的扁平索引，
+    get/[] 均为一次字典查找；快照本身只读，可在线程间安全共享。
+    """
+
+    __slots__ = ("_data", "_flat", "version")
+
+    def __init__(self, data: Dict[str, Any], version: int = 0):
+        self._data = freeze(data)
+        self._flat: Dict[Any, Any] = {}
+        self._flatten(self._data, "")
+        self.version = version
+
+    def _flatten(self, data: Mapping, prefix: str) -> None:
+        for key, value in data.items():
+            path = f"{prefix}{key}" if prefix else key
+            self._flat[path] = value
+            if isinstance(value, Mapping):
+                self._flatten(value, f"{path}.")
+
+    def __getitem__(self, key: str) -> Any:
+        return self._flat[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._flat
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """获取配置值，支持嵌套键（如：database.host）"""
+        return self._flat.get(key, default)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """返回可修改的配置副本"""
+        return thaw(self._data)
+
+    def __repr__(self) -> str:
+        return f"ConfigSnapshot(version={self.version}, keys={list(self._data)})"
+
+
 class ConfigManager:
     """配置管理器，支持环境变量覆盖和多环境配置"""
-    
+
     _instance: Optional['ConfigManager'] = None
     _config: Dict[str, Any] = {}
     _config_loaded: bool = False
-    
+    _snapshot: Optional[ConfigSnapshot] = None
+    _version: int = 0
+    _source_stats: Dict[Path, Optional[Tuple[int, int]]] = {}
+    _lock = threading.RLock()
+    _listeners: List[Callable[[ConfigSnapshot], None]] = []
+    _watch_thread: Optional[threading.Thread] = None
+    _watch_stop: Optional[threading.Event] = None
+
     def __new__(cls) -> 'ConfigManager':
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
-    
+
     def __init__(self):
         if not self._config_loaded:
             self._load_config()
             self._config_loaded = True
-    
+
     def _load_config(self) -> None:
         """加载配置文件"""
         try:
-            config_dir = Path(__file__).parent.parent / "config"
-            
             # 获取环境标识
             env = os.getenv("TEST_ENV", "default")
             logger.info(f"当前环境: {env}")
-            
+
+            config: Dict[str, Any] = {}
+            main_config_file, env_config_file = self._source_files()
+
             # 加载主配置文件
-            main_config_file = config_dir / "config.yaml"
             if main_config_file.exists():
-                with open(main_config_file, 'r', encoding='utf-8') as f:
-                    self._config = yaml.safe_load(f) or {}
+                config = self._read_yaml(main_config_file)
                 logger.info(f"加载主配置文件: {main_config_file}")
             else:
                 logger.warning(f"主配置文件不存在: {main_config_file}")
-                self._config = {}
-            
+
             # 加载环境特定配置
-            if env != "default":
-                env_config_file = config_dir / f"config_{env}.yaml"
-                if env_config_file.exists():
-                    with open(env_config_file, 'r', encoding='utf-8') as f:
-                        env_config = yaml.safe_load(f) or {}
-                        self._config.update(env_config)
-                    logger.info(f"加载环境配置文件: {env_config_file}")
-            
-            # 环境变量覆盖
-            self._override_with_env_vars()
-            
-            # 验证配置安全性
-            self._validate_security()
-            
-            # 设置默认值
-            self._set_defaults()
-            
+            if env_config_file is not None and env_config_file.exists():
+                config.update(self._read_yaml(env_config_file))
+                logger.info(f"加载环境配置文件: {env_config_file}")
+
+            with self._lock:
+                self._config = config
+                self._source_stats = self._stat_sources()
+
+                # 环境变量覆盖
+                self._override_with_env_vars()
+
+                # 验证配置安全性
+                self._validate_security()
+
+                # 设置默认值
+                self._set_defaults()
+
+                # 生成只读快照
+                self._publish()
+
             logger.info("配置加载完成")
-            
+
+        except ConfigurationError:
+            raise
         except Exception as e:
             logger.error(f"配置加载失败: {str(e)}")
             raise ConfigurationError(f"配置加载失败: {str(e)}")
-    
+
+    @staticmethod
+    def _source_files() -> Tuple[Path, Optional[Path]]:
+        """返回主配置文件及当前环境配置文件的路径"""
+        config_dir = Path(__file__).parent.parent / "config"
+        env = os.getenv("TEST_ENV", "default")
+        env_config_file = config_dir / f"config_{env}.yaml" if env != "default" else None
+        return config_dir / "config.yaml", env_config_file
+
+    @staticmethod
+    def _read_yaml(path: Path) -> Dict[str, Any]:
+        """读取YAML配置文件"""
+        import yaml
+
+        with open(path, 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f) or {}
+
+    def _stat_sources(self) -> Dict[Path, Optional[Tuple[int, int]]]:
+        """记录配置文件的mtime和大小，用于检测文件变更"""
+        stats = {}
+        for path in self._source_files():
+            if path is None:
+                continue
+            try:
+                st = path.stat()
+                stats[path] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                stats[path] = None
+        return stats
+
+    def _publish(self) -> None:
+        """根据当前配置生成新的只读快照并整体替换"""
+        ConfigManager._version += 1
+        self._snapshot = ConfigSnapshot(self._config, self._version)
+
     def _override_with_env_vars(self) -> None:
         """使用环境变量覆盖配置"""
         env_mappings = {
             "BASE_URL": "base_url",
-            "USERNAME": "username", 
+            "USERNAME": "username",
             "PASSWORD": "password",
             "CAPTCHA": "captcha",
             "TIMEOUT": "timeout",
             "MAX_RETRIES": "max_retries",
             "LOG_LEVEL": "log_level",
-            "ALLURE_RESULTS_DIR": "allure_results_dir"
+            "LOG_FORMAT": "log_format",
+            "ALLURE_RESULTS_DIR": "allure_results_dir",
+            "HTTP_CACHE_DIR": "http_cache_dir"
         }
-        
+
         overridden_keys = []
         for env_key, config_key in env_mappings.items():
             env_value = os.getenv(env_key)
@@ -96,20 +191,22 @@ class ConfigManager:
                         continue
                 elif config_key in ["debug"]:
                     env_value = env_value.lower() in ['true', '1', 'yes', 'on']
-                
+
                 self._config[config_key] = env_value
                 overridden_keys.append(config_key)
-        
+
         if overridden_keys:
             logger.info(f"环境变量覆盖配置项: {overridden_keys}")
-    
+
     def _validate_security(self) -> None:
         """验证配置安全性"""
+        from common.security_util import SecurityUtil
+
         security_issues = SecurityUtil.validate_config_security(self._config)
         if security_issues:
             for issue in security_issues:
                 logger.warning(f"安全警告: {issue}")
-    
+
     def _set_defaults(self) -> None:
         """设置默认配置值"""
         defaults = {
@@ -119,48 +216,73 @@ class ConfigManager:
             "allure_results_dir": "./allure-results",
             "verify_ssl": True,
             "pool_connections": 10,
-            "pool_maxsize": 20
+            "pool_maxsize": 20,
+            "config_watch_interval": 0,
+            "response_cache_enabled": False,
+            "response_cache_ttl": 60,
+            "response_cache_max_size": 256,
+            "conditional_requests_enabled": False,
+            "conditional_request_paths": ["/rpm-api/contract/list", "/rpm-api/project/list"],
+            "http_cache_dir": "./.cache/http",
+            "accept_encoding": None,
+            "request_compression_min_bytes": 0,
+            "resource_pool_size": 4,
+            "resource_pool_workers": 8,
+            "tracing_enabled": False,
+            "tracing_max_spans": 65536,
+            "log_format": "text",
+            "metrics_recent_capacity": 65536,
+            "default_headers": {},
+            "auth_max_attempts": 3,
+            "auth_backoff_base": 1.0,
+            "auth_backoff_max": 10.0,
+            "endpoints_file": None,
+            "api_budget_strict": False,
+            "soak_leak_thresholds": {},
+            "rerun_categories": ["network", "timeout", "server"],
+            "flaky_history_window": 20,
+            "flaky_quarantine_threshold": 3
         }
-        
+
         for key, default_value in defaults.items():
             if key not in self._config:
                 self._config[key] = default_value
-    
+
+    @property
+    def snapshot(self) -> ConfigSnapshot:
+        """当前配置的只读快照（重新加载后整体替换，已取得的快照保持不变）"""
+        return self._snapshot
+
     def get(self, key: str, default: Any = None) -> Any:
         """获取配置值，支持嵌套键（如：database.host）"""
-        try:
-            keys = key.split('.')
-            value = self._config
-            
-            for k in keys:
-                if isinstance(value, dict) and k in value:
-                    value = value[k]
-                else:
-                    return default
-            
-            return value
-        except Exception as e:
-            logger.warning(f"获取配置项 '{key}' 失败: {str(e)}")
-            return default
-    
+        return self._snapshot.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._snapshot[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._snapshot
+
     def set(self, key: str, value: Any) -> None:
         """设置配置值"""
         try:
-            keys = key.split('.')
-            config = self._config
-            
-            # 导航到最后一级
-            for k in keys[:-1]:
-                if k not in config:
-                    config[k] = {}
-                config = config[k]
-            
-            config[keys[-1]] = value
+            with self._lock:
+                keys = key.split('.')
+                config = self._config
+
+                # 导航到最后一级
+                for k in keys[:-1]:
+                    if k not in config:
+                        config[k] = {}
+                    config = config[k]
+
+                config[keys[-1]] = value
+                self._publish()
             logger.debug(f"设置配置项: {key} = {value}")
         except Exception as e:
             logger.error(f"设置配置项 '{key}' 失败: {str(e)}")
-            raise ConfigurationError(f"设置配置项失败: {str(e)}")
-    
+            raise ConfigurationError(f"设置配置项失败: {str(e)}", config_key=key)
+
     def get_api_config(self) -> Dict[str, Any]:
         """获取API相关配置"""
         return {
@@ -171,7 +293,7 @@ class ConfigManager:
             "pool_connections": self.get("pool_connections", 10),
             "pool_maxsize": self.get("pool_maxsize", 20)
         }
-    
+
     def get_auth_config(self) -> Dict[str, str]:
         """获取认证相关配置"""
         return {
@@ -179,7 +301,7 @@ class ConfigManager:
             "password": self.get("password"),
             "captcha": self.get("captcha")
         }
-    
+
     def get_logging_config(self) -> Dict[str, Any]:
         """获取日志相关配置"""
         return {
@@ -189,7 +311,7 @@ class ConfigManager:
             "log_max_size": self.get("log_max_size", "10MB"),
             "log_backup_count": self.get("log_backup_count", 5)
         }
-    
+
     def get_allure_config(self) -> Dict[str, Any]:
         """获取Allure相关配置"""
         return {
@@ -197,31 +319,76 @@ class ConfigManager:
             "report_dir": self.get("allure_report_dir", "./allure-report"),
             "clean_results": self.get("allure_clean_results", True)
         }
-    
+
     def validate_required_config(self, required_keys: List[str]) -> None:
         """验证必需的配置项是否存在"""
         missing_keys = []
         for key in required_keys:
             if self.get(key) is None:
                 missing_keys.append(key)
-        
+
         if missing_keys:
             error_msg = f"缺少必需的配置项: {missing_keys}"
             logger.error(error_msg)
-            raise ConfigurationError(error_msg)
-    
+            raise ConfigurationError(error_msg, config_key=",".join(missing_keys))
+
     def get_safe_config(self) -> Dict[str, Any]:
         """获取脱敏后的配置（用于日志记录）"""
+        from common.security_util import SecurityUtil
+
         return SecurityUtil.sanitize_data(self._config.copy())
-    
+
     def reload_config(self) -> None:
-        """重新加载配置"""
+        """重新加载配置，成功后通知已注册的监听者"""
         logger.info("重新加载配置...")
-        self._config.clear()
-        self._config_loaded = False
-        self._load_config()
-        self._config_loaded = True
-
-class ConfigurationError(Exception):
-    """配置错误异常"""
-    pass
\ No newline at end of file
+        with self._lock:
+            self._load_config()
+            self._config_loaded = True
+            snapshot = self._snapshot
+
+        for listener in list(self._listeners):
+            try:
+                listener(snapshot)
+            except Exception as e:
+                logger.warning(f"配置变更回调执行失败: {str(e)}")
+
+    def add_listener(self, callback: Callable[[ConfigSnapshot], None]) -> None:
+        """注册配置重新加载后的回调，回调参数为新的配置快照"""
+        self._listeners.append(callback)
+
+    def check_for_changes(self) -> bool:
+        """检查配置文件是否变更（比较mtime和大小），有变更时重新加载"""
+        if self._stat_sources() == self._source_stats:
+            return False
+        logger.info("检测到配置文件变更")
+        self.reload_config()
+        return True
+
+    def start_watching(self, interval: float = 5.0) -> None:
+        """启动后台线程定期检查配置文件变更，用于长时间运行的稳定性测试"""
+        if self._watch_thread is not None and self._watch_thread.is_alive():
+            return
+
+        stop_event = threading.Event()
+
+        def _watch():
+            while not stop_event.wait(interval):
+                try:
+                    self.check_for_changes()
+                except Exception as e:
+                    # 文件写入中途或格式错误时保留旧快照，等待下一次检查
+                    logger.warning(f"配置热加载失败，继续使用旧配置: {str(e)}")
+
+        ConfigManager._watch_stop = stop_event
+        ConfigManager._watch_thread = threading.Thread(target=_watch, name="config-watcher", daemon=True)
+        ConfigManager._watch_thread.start()
+        logger.info(f"已启动配置文件监听，检查间隔: {interval}s")
+
+    def stop_watching(self) -> None:
+        """停止配置文件监听"""
+        if self._watch_stop is not None:
+            self._watch_stop.set()
+        if self._watch_thread is not None:
+            self._watch_thread.join(timeout=5)
+        ConfigManager._watch_thread = None
+        ConfigManager._watch_stop = None
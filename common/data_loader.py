@@ -0,0 +1,207 @@
+"""
+测试数据加载器 - YAML解析结果缓存与只读视图
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from common.exceptions import TestDataError
+from common.freeze_util import freeze, thaw
+from common.logger import Logger
+
+logger = Logger().get_logger()
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# 缓存格式变化时递增，旧缓存自动失效
+CACHE_VERSION = 1
+
+
+def _file_digest(path: Path) -> str:
+    """计算文件内容的sha256"""
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _file_stat(path: Path) -> Tuple[int, int]:
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+class DataLoader:
+    """测试数据加载器
+
+    - 优先使用libyaml的C加载器（CSafeLoader），不可用时回退到纯Python实现
+    - 解析结果以pickle形式缓存在 .cache/test_data 下，按文件内容哈希命名，
+      多个并行worker共享同一份缓存，只有第一个worker需要解析YAML
+    - 支持 ``!include other.yaml`` 及 ``!include other.yaml#a.b`` 跨文件引用
+      （文件内的锚点/别名由YAML本身支持）
+    - 默认返回只读视图（FrozenDict/tuple），需要修改时调用 copy() 或 thaw()
+    """
+
+    _memory_cache: Dict[Path, Tuple[Dict[Path, Tuple[int, int]], Any]] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, cache_dir: Optional[str] = None, use_cache: bool = True):
+        self.cache_dir = Path(cache_dir) if cache_dir else ROOT_DIR / ".cache" / "test_data"
+        self.use_cache = use_cache
+
+    @staticmethod
+    def resolve_path(data_file: str) -> Path:
+        """相对路径以项目根目录为基准，不受当前工作目录影响"""
+        path = Path(data_file)
+        if not path.is_absolute():
+            path = ROOT_DIR / path
+        return path.resolve()
+
+    def load(self, data_file: str, readonly: bool = True) -> Any:
+        """加载YAML测试数据文件"""
+        path = self.resolve_path(data_file)
+        if not path.exists():
+            raise TestDataError(f"测试数据文件不存在: {path}", data_file=str(data_file))
+
+        data = self._load_cached(path)
+        return data if readonly else thaw(data)
+
+    def _load_cached(self, path: Path) -> Any:
+        # 进程内缓存：文件及其引用文件的mtime/大小均未变化时直接返回
+        with self._lock:
+            cached = self._memory_cache.get(path)
+        if cached is not None and self._stats_unchanged(cached[0]):
+            return cached[1]
+
+        disk_cached = self._load_from_disk_cache(path) if self.use_cache else None
+        if disk_cached is not None:
+            data, deps = disk_cached
+        else:
+            data, deps = self._parse_file(path)
+            if self.use_cache:
+                self._write_disk_cache(path, data, deps)
+
+        frozen = freeze(data)
+        stats = {dep: _file_stat(dep) for dep in deps}
+        with self._lock:
+            self._memory_cache[path] = (stats, frozen)
+        return frozen
+
+    @staticmethod
+    def _stats_unchanged(stats: Dict[Path, Tuple[int, int]]) -> bool:
+        try:
+            return all(_file_stat(dep) == stat for dep, stat in stats.items())
+        except OSError:
+            return False
+
+    def _cache_file(self, path: Path, digest: str) -> Path:
+        return self.cache_dir / f"{path.stem}-v{CACHE_VERSION}-{digest[:20]}.pickle"
+
+    def _load_from_disk_cache(self, path: Path) -> Optional[Tuple[Any, Dict[Path, str]]]:
+        """读取磁盘缓存，主文件及所有被引用文件的哈希都一致时才有效"""
+        cache_file = self._cache_file(path, _file_digest(path))
+        if not cache_file.exists():
+            return None
+        try:
+            with open(cache_file, "rb") as f:
+                payload = pickle.load(f)
+            deps = {Path(dep): digest for dep, digest in payload["deps"].items()}
+            if any(not dep.exists() or _file_digest(dep) != digest for dep, digest in deps.items()):
+                return None
+            logger.debug(f"命中测试数据缓存: {cache_file}")
+            return payload["data"], deps
+        except Exception as e:
+            logger.warning(f"读取测试数据缓存失败，重新解析: {cache_file}, {str(e)}")
+            return None
+
+    def _write_disk_cache(self, path: Path, data: Any, deps: Dict[Path, str]) -> None:
+        """原子写入缓存文件，避免并行worker读到写了一半的文件"""
+        cache_file = self._cache_file(path, deps[path])
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump({"deps": {str(dep): digest for dep, digest in deps.items()}, "data": data},
+                            f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_file)
+        except OSError as e:
+            logger.warning(f"写入测试数据缓存失败: {cache_file}, {str(e)}")
+
+    def _parse_file(self, path: Path, deps: Optional[Dict[Path, str]] = None,
+                    stack: Optional[List[Path]] = None,
+                    parsed: Optional[Dict[Path, Any]] = None) -> Tuple[Any, Dict[Path, str]]:
+        """解析YAML文件，返回数据及其依赖文件（含自身）的哈希
+
+        同一次加载中被多次 !include 的文件只解析一次。
+        """
+        deps = {} if deps is None else deps
+        stack = [] if stack is None else stack
+        parsed = {} if parsed is None else parsed
+        if path in stack:
+            chain = " -> ".join(str(p) for p in stack + [path])
+            raise TestDataError(f"测试数据存在循环引用: {chain}", data_file=str(path))
+        if path in parsed:
+            return parsed[path], deps
+
+        try:
+            content = path.read_bytes()
+        except OSError as e:
+            raise TestDataError(f"读取测试数据文件失败: {str(e)}", data_file=str(path))
+        deps[path] = hashlib.sha256(content).hexdigest()
+
+        loader = _include_loader_class()(content)
+        loader.data_file = path
+        loader.include = lambda target: self._parse_file(target, deps, stack + [path], parsed)[0]
+        try:
+            data = loader.get_single_data()
+        except TestDataError:
+            raise
+        except Exception as e:
+            raise TestDataError(f"解析测试数据文件失败: {str(e)}", data_file=str(path))
+        finally:
+            loader.dispose()
+
+        logger.info(f"解析测试数据文件: {path}")
+        parsed[path] = data
+        return data, deps
+
+
+_INCLUDE_LOADER = None
+
+
+def _include_loader_class():
+    """构造支持 !include 的YAML加载器（优先C实现），首次使用时才导入yaml"""
+    global _INCLUDE_LOADER
+    if _INCLUDE_LOADER is None:
+        import yaml
+
+        base_loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+        class IncludeLoader(base_loader):
+            data_file: Path
+            include = None
+
+        IncludeLoader.add_constructor("!include", _construct_include)
+        _INCLUDE_LOADER = IncludeLoader
+    return _INCLUDE_LOADER
+
+
+def _construct_include(loader, node) -> Any:
+    """处理 !include 标签：``!include 文件路径[#键路径]``，文件路径相对于当前文件"""
+    reference = loader.construct_scalar(node)
+    file_part, _, key_path = reference.partition("#")
+    target = (loader.data_file.parent / file_part).resolve()
+    if not target.exists():
+        raise TestDataError(f"!include 引用的文件不存在: {target}", data_file=str(loader.data_file))
+
+    value = loader.include(target)
+    for key in filter(None, key_path.split(".")):
+        if isinstance(value, dict) and key in value:
+            value = value[key]
+        elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+            value = value[int(key)]
+        else:
+            raise TestDataError(f"!include 引用的键不存在: {reference}",
+                                data_file=str(loader.data_file), data_key=key_path)
+    return value
+
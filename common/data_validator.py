@@ -1,38 +1,59 @@
 """
 数据校验器
 """
-import allure
 from typing import Dict, Any, List, Union
 from common.logger import Logger
+from common.allure_util import step
+from common.path_util import MISSING, WILDCARD, get_value, iter_values, parse_path
 
 logger = Logger().get_logger()
 
 class DataValidator:
     """响应数据校验器"""
+
+    # YAML中使用的类型名称与Python类型的对应关系
+    TYPE_NAMES = {
+        "str": str,
+        "int": int,
+        "float": float,
+        "number": (int, float),
+        "bool": bool,
+        "dict": dict,
+        "list": list,
+        "null": type(None),
+    }
     
     def __init__(self, response):
         self.response = response
         self.data = response.json()
     
-    @allure.step("校验响应数据结构")
+    @step("校验响应数据结构")
     def validate_schema(self, expected_schema: Dict[str, type]):
         """校验响应数据结构
         
         Args:
-            expected_schema: 期望的数据结构，格式：{"field_name": expected_type}
+            expected_schema: 期望的数据结构，格式：{"field_path": expected_type}
+                - field_path 支持 data.user.name、data.items[*].status 形式的路径，[*] 表示列表中每个元素都要满足；
+                  以 ? 结尾表示可选字段（如 "data.remark?"），不存在时跳过，存在时仍校验类型
+                - expected_type 可以是Python类型，也可以是YAML中的类型名称（如 "str"、"dict"），
+                  或类型名称列表表示允许多种类型（如 [str, null]）
         """
-        for field_name, expected_type in expected_schema.items():
-            if field_name not in self.data:
-                assert False, f"响应中缺少必需字段: {field_name}"
-            
-            actual_value = self.data[field_name]
-            if not isinstance(actual_value, expected_type):
-                assert False, f"字段{field_name}类型错误，期望{expected_type.__name__}，实际{type(actual_value).__name__}"
+        for field_path, expected_type in expected_schema.items():
+            optional = field_path.endswith("?")
+            path = field_path[:-1] if optional else field_path
+            expected_type = self._resolve_type(expected_type)
+            for concrete_path, actual_value in iter_values(self.data, path):
+                if actual_value is MISSING:
+                    if optional:
+                        continue
+                    assert False, f"响应中缺少必需字段: {concrete_path}"
+                if not isinstance(actual_value, expected_type):
+                    assert False, f"字段{concrete_path}类型错误，期望{self._type_name(expected_type)}，实际{type(actual_value).__name__}"
         
         logger.info(f"数据结构校验通过: {list(expected_schema.keys())}")
         return self
     
-    @allure.step("校验业务规则")
+    @step("校验业务规则")
     def validate_business_rules(self, rules: List[Dict[str, Any]]):
         """校验业务规则
         
@@ -49,24 +70,47 @@ class DataValidator:
             expected = rule['value']
             custom_message = rule.get('message', '')
             
-            actual = self._get_nested_value(field)
+            if WILDCARD in parse_path(field):
+                # 含 [*] 的规则对列表中每个元素逐一校验
+                values = [(path, None if actual is MISSING else actual) for path, actual in iter_values(self.data, field)]
+            else:
+                values = [(field, self._get_nested_value(field))]
             
-            if not self._check_rule(actual, operator, expected):
-                error_msg = custom_message or f"业务规则校验失败: {field} {operator} {expected}，实际值: {actual}"
-                assert False, error_msg
+            for path, actual in values:
+                if not self._check_rule(actual, operator, expected):
+                    error_msg = custom_message or f"业务规则校验失败: {path} {operator} {expected}，实际值: {actual}"
+                    assert False, error_msg
         
         logger.info(f"业务规则校验通过: {len(rules)}条规则")
         return self
     
+    @classmethod
+    def _resolve_type(cls, expected_type):
+        """将类型名称转换为Python类型，类型列表转换为类型元组"""
+        if isinstance(expected_type, (list, tuple)):
+            resolved = []
+            for item in expected_type:
+                item = cls._resolve_type(item)
+                resolved.extend(item if isinstance(item, tuple) else (item,))
+            return tuple(dict.fromkeys(resolved))
+        if expected_type is None:
+            # YAML中未加引号的 null 会被解析为None
+            return type(None)
+        if isinstance(expected_type, str):
+            if expected_type not in cls.TYPE_NAMES:
+                raise ValueError(f"不支持的类型名称: {expected_type}")
+            return cls.TYPE_NAMES[expected_type]
+        return expected_type
+
+    @staticmethod
+    def _type_name(expected_type) -> str:
+        if isinstance(expected_type, tuple):
+            return "/".join(t.__name__ for t in expected_type)
+        return expected_type.__name__
+
     def _get_nested_value(self, field_path: str):
-        """获取嵌套字段值"""
-        value = self.data
-        for field in field_path.split('.'):
-            if isinstance(value, dict) and field in value:
-                value = value[field]
-            else:
-                return None
-        return value
+        """获取嵌套字段值，路径不存在时返回None"""
+        return get_value(self.data, field_path, None)
     
     def _check_rule(self, actual, operator: str, expected) -> bool:
         """检查单个规则"""
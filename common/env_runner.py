@@ -0,0 +1,205 @@
+"""
+多环境并行执行 - 同一套用例同时在多个环境执行，汇总各环境的通过情况和接口耗时对比
+
+    python -m common.env_runner --envs dev,staging,preprod
+    python -m common.env_runner --envs dev,staging -- testcases/test_contract.py -m critical
+
+每个环境在独立的pytest进程中执行（TEST_ENV=<环境>，读取 config/config_<环境>.yaml），
+连接池、登录token、响应缓存互不影响；每个环境的结果写入 ``<输出目录>/<环境>/``：
+pytest.log、junit.xml、metrics.json、perf_report.json、logs/、allure-results/、http-cache/、
+flaky_history.json（失败重跑插件的不稳定用例历史，各环境分别统计）、traces.json（开启链路追踪时）。
+响应快照按环境对比 ``data/snapshots/<环境>/`` 下的基线，一个环境的数据不会成为其他环境的基线。
+全部执行完成后生成 ``<输出目录>/comparison.json``，并输出各环境结果不一致的用例和接口耗时对比。
+"""
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).parent.parent
+CONFIG_DIR = PROJECT_ROOT / "config"
+# 各环境的数据不同，响应快照按环境分别保存在 data/snapshots/<环境>/ 下（需提交到仓库）
+SNAPSHOT_DIR = PROJECT_ROOT / "data" / "snapshots"
+DEFAULT_OUTPUT = "reports/envs"
+OUTCOMES = ("passed", "failed", "error", "skipped")
+# 同一用例出现多条记录（如用例失败且teardown出错）时保留较严重的结果
+_SEVERITY = {"passed": 0, "skipped": 1, "failed": 2, "error": 3}
+
+
+class EnvRun:
+    """单个环境的执行"""
+
+    def __init__(self, env: str, output: Path, pytest_args: List[str]):
+        self.env = env
+        self.directory = output / env
+        self.pytest_args = pytest_args
+        self.returncode: Optional[int] = None
+        self.duration = 0.0
+
+    def command(self) -> List[str]:
+        command = [sys.executable, "-m", "pytest", *self.pytest_args,
+                   f"--junitxml={self.directory / 'junit.xml'}",
+                   f"--metrics-output={self.directory / 'metrics.json'}",
+                   f"--perf-report={self.directory / 'perf_report.json'}",
+                   # 不稳定用例历史、链路追踪按环境区分，并行执行时互不覆盖
+                   f"--flaky-history={self.directory / 'flaky_history.json'}",
+                   f"--trace-output={self.directory / 'traces.json'}",
+                   f"--snapshot-dir={SNAPSHOT_DIR / self.env}"]
+        if importlib.util.find_spec("allure_pytest") is not None:
+            command.append(f"--alluredir={self.directory / 'allure-results'}")
+        return command
+
+    def environ(self) -> Dict[str, str]:
+        env = dict(os.environ)
+        env.update({
+            "TEST_ENV": self.env,
+            "LOG_DIR": str(self.directory / "logs"),
+            "ALLURE_RESULTS_DIR": str(self.directory / "allure-results"),
+            # 条件请求缓存按路径区分，不同环境必须使用各自的目录
+            "HTTP_CACHE_DIR": str(self.directory / "http-cache"),
+        })
+        return env
+
+    def run(self) -> "EnvRun":
+        self.directory.mkdir(parents=True, exist_ok=True)
+        start = time.perf_counter()
+        with open(self.directory / "pytest.log", "w", encoding="utf-8") as log:
+            self.returncode = subprocess.call(self.command(), cwd=PROJECT_ROOT, env=self.environ(),
+                                              stdout=log, stderr=subprocess.STDOUT)
+        self.duration = time.perf_counter() - start
+        print(f"[{self.env}] 执行完成，退出码 {self.returncode}，耗时 {self.duration:.1f}s", flush=True)
+        return self
+
+
+def read_junit(path: Path) -> Dict[str, Dict[str, Any]]:
+    """解析junit.xml：{用例: {"outcome": ..., "duration": 秒}}"""
+    results: Dict[str, Dict[str, Any]] = {}
+    if not path.exists():
+        return results
+    for case in ET.parse(path).getroot().iter("testcase"):
+        name = f"{case.get('classname', '')}::{case.get('name', '')}"
+        outcome = "passed"
+        for child in case:
+            if child.tag in ("failure", "error", "skipped"):
+                outcome = "failed" if child.tag == "failure" else child.tag
+                break
+        previous = results.get(name)
+        if previous is None or _SEVERITY[outcome] > _SEVERITY[previous["outcome"]]:
+            results[name] = {"outcome": outcome, "duration": float(case.get("time") or 0)}
+    return results
+
+
+def read_metrics(path: Path) -> Dict[str, Dict[str, Any]]:
+    """解析metrics.json：{接口: {"count", "p50", "p95", "p99", "errors"}}"""
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        summary = json.load(f)
+    return {item["endpoint"]: {
+        "count": item["count"],
+        **{key: item["phases"]["total"].get(key, 0.0) for key in ("p50", "p95", "p99")},
+        "errors": sum(count for status, count in item.get("status_counts", {}).items() if int(status) >= 500),
+    } for item in summary}
+
+
+def compare(runs: List[EnvRun]) -> Dict[str, Any]:
+    """合并各环境结果：环境汇总、结果不一致的用例、接口耗时对比"""
+    envs = [run.env for run in runs]
+    tests = {run.env: read_junit(run.directory / "junit.xml") for run in runs}
+    metrics = {run.env: read_metrics(run.directory / "metrics.json") for run in runs}
+
+    summary = {}
+    for run in runs:
+        counts = {outcome: 0 for outcome in OUTCOMES}
+        for result in tests[run.env].values():
+            counts[result["outcome"]] += 1
+        summary[run.env] = {"returncode": run.returncode, "duration_s": round(run.duration, 2), **counts}
+
+    all_tests = sorted(set().union(*(results.keys() for results in tests.values())))
+    test_rows = []
+    for name in all_tests:
+        outcomes = {env: tests[env].get(name, {}).get("outcome", "missing") for env in envs}
+        test_rows.append({
+            "test": name,
+            "consistent": len(set(outcomes.values())) == 1,
+            "outcomes": outcomes,
+            "durations": {env: tests[env][name]["duration"] for env in envs if name in tests[env]},
+        })
+
+    all_endpoints = sorted(set().union(*(items.keys() for items in metrics.values())))
+    endpoint_rows = [{"endpoint": endpoint, **{env: metrics[env].get(endpoint) for env in envs}}
+                     for endpoint in all_endpoints]
+    return {"envs": envs, "summary": summary, "tests": test_rows, "endpoints": endpoint_rows}
+
+
+def format_comparison(data: Dict[str, Any]) -> List[str]:
+    envs = data["envs"]
+    width = max(10, *(len(env) + 2 for env in envs))
+    lines = ["环境汇总:", f"  {'环境':<{width}} {'通过':>6} {'失败':>6} {'错误':>6} {'跳过':>6} {'耗时s':>8} {'退出码':>6}"]
+    for env in envs:
+        item = data["summary"][env]
+        lines.append(f"  {env:<{width}} {item['passed']:>6} {item['failed']:>6} {item['error']:>6} "
+                     f"{item['skipped']:>6} {item['duration_s']:>8.1f} {item['returncode']:>6}")
+
+    diverged = [row for row in data["tests"] if not row["consistent"]]
+    lines.append("")
+    lines.append(f"结果不一致的用例: {len(diverged)}")
+    for row in diverged:
+        lines.append(f"  {row['test']}")
+        lines.append("    " + "  ".join(f"{env}={row['outcomes'][env]}" for env in envs))
+
+    if data["endpoints"]:
+        lines.append("")
+        lines.append("接口总耗时 p95 (ms):")
+        lines.append(f"  {'接口':<50} " + " ".join(f"{env:>{width}}" for env in envs))
+        for row in data["endpoints"]:
+            values = " ".join(f"{row[env]['p95']:>{width}.1f}" if row[env] else f"{'-':>{width}}" for env in envs)
+            lines.append(f"  {row['endpoint']:<50} {values}")
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="在多个环境并行执行同一套用例并对比结果",
+                                     usage="python -m common.env_runner --envs dev,staging [选项] [-- pytest参数]")
+    parser.add_argument("--envs", required=True, help="逗号分隔的环境名，对应 config/config_<环境>.yaml")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help=f"结果目录（默认: {DEFAULT_OUTPUT}）")
+    parser.add_argument("--parallel", type=int, default=0, help="同时执行的环境数（默认: 全部同时执行）")
+    args, pytest_args = parser.parse_known_args(argv)
+    if pytest_args[:1] == ["--"]:
+        pytest_args = pytest_args[1:]
+
+    envs = [env.strip() for env in args.envs.split(",") if env.strip()]
+    missing = [env for env in envs if env != "default" and not (CONFIG_DIR / f"config_{env}.yaml").exists()]
+    if missing:
+        print(f"环境配置文件不存在: {', '.join(f'config/config_{env}.yaml' for env in missing)}", file=sys.stderr)
+        return 2
+    if len(set(envs)) != len(envs):
+        print("环境名重复", file=sys.stderr)
+        return 2
+
+    output = Path(args.output)
+    if not output.is_absolute():
+        output = PROJECT_ROOT / output
+    runs = [EnvRun(env, output, pytest_args) for env in envs]
+    print(f"并行执行环境: {', '.join(envs)}，结果目录: {output}", flush=True)
+    with ThreadPoolExecutor(max_workers=args.parallel or len(runs)) as executor:
+        list(executor.map(EnvRun.run, runs))
+
+    data = compare(runs)
+    output.mkdir(parents=True, exist_ok=True)
+    with open(output / "comparison.json", "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    print("\n".join(format_comparison(data)))
+    print(f"对比结果已写入: {output / 'comparison.json'}")
+    return 0 if all(run.returncode == 0 for run in runs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,7 +4,12 @@
 from typing import Optional, Dict, Any
 
 class RPMTestException(Exception):
-    """RPM测试框架基础异常类"""
+    """RPM测试框架基础异常类
+
+    retryable 表示偶发失败（网络抖动、超时、服务端5xx），用例失败时可以重新执行（见 rerun_plugin）
+    """
+    
+    retryable = False
     
     def __init__(self, message: str, error_code: Optional[str] = None, details: Optional[Dict[str, Any]] = None):
         self.message = message
@@ -50,10 +55,17 @@ class APIRequestError(RPMTestException):
         self.url = url
         self.status_code = status_code
         self.response_text = response_text
+    
+    @property
+    def retryable(self) -> bool:
+        """服务端5xx错误可重试"""
+        return self.status_code is not None and self.status_code >= 500
 
 class NetworkError(RPMTestException):
     """网络错误异常"""
     
+    retryable = True
+    
     def __init__(self, message: str, url: str, retry_count: int = 0):
         super().__init__(message, "NETWORK_ERROR", {
             "url": url,
@@ -90,7 +102,9 @@ class TestDataError(RPMTestException):
 class TimeoutError(RPMTestException):
     """超时错误异常"""
     
-    def __init__(self, message: str, timeout_seconds: int, operation: Optional[str] = None):
+    retryable = True
+    
+    def __init__(self, message: str, timeout_seconds: Any, operation: Optional[str] = None):
         super().__init__(message, "TIMEOUT_ERROR", {
             "timeout_seconds": timeout_seconds,
             "operation": operation
@@ -108,4 +122,15 @@ class BusinessLogicError(RPMTestException):
             "business_message": business_message
         })
         self.business_code = business_code
-        self.business_message = business_message
\ No newline at end of file
+        self.business_message = business_message
+
+class ResourceProvisionError(RPMTestException):
+    """测试资源创建错误异常"""
+    
+    def __init__(self, message: str, resource_type: Optional[str] = None, status_code: Optional[int] = None):
+        super().__init__(message, "RESOURCE_ERROR", {
+            "resource_type": resource_type,
+            "status_code": status_code
+        })
+        self.resource_type = resource_type
+        self.status_code = status_code
\ No newline at end of file
@@ -0,0 +1,50 @@
+"""
+只读数据工具 - 将配置、测试数据转换为不可变视图
+"""
+from typing import Any
+
+
+class FrozenDict(dict):
+    """只读字典
+
+    继承 dict 以保证可以直接传给 requests 的 json 参数、json.dumps 等；
+    所有修改操作都会抛出 TypeError，copy() 返回普通可修改的 dict。
+    """
+
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("只读数据不允许修改，请先调用 copy() 或 thaw()")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def copy(self) -> dict:
+        return dict(self)
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+    def __repr__(self) -> str:
+        return f"FrozenDict({dict.__repr__(self)})"
+
+
+def freeze(data: Any) -> Any:
+    """递归转换为只读结构：dict -> FrozenDict，list -> tuple"""
+    if isinstance(data, FrozenDict):
+        return data
+    if isinstance(data, dict):
+        return FrozenDict((key, freeze(value)) for key, value in data.items())
+    if isinstance(data, (list, tuple)):
+        return tuple(freeze(item) for item in data)
+    return data
+
+
+def thaw(data: Any) -> Any:
+    """递归转换回可修改结构：FrozenDict/dict -> dict，tuple/list -> list"""
+    if isinstance(data, dict):
+        return {key: thaw(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [thaw(item) for item in data]
+    return data
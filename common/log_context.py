@@ -0,0 +1,50 @@
+"""
+日志上下文 - 在日志中关联请求ID、用例ID和worker ID
+"""
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional, Tuple
+
+# (请求ID, 接口) ，在 RequestUtil.send_request 内有效
+_request: ContextVar[Optional[Tuple[str, str]]] = ContextVar("log_request", default=None)
+_test: ContextVar[Optional[str]] = ContextVar("log_test", default=None)
+# 线程池中的线程不继承contextvars，用例ID以进程内当前用例兜底（用例在进程内顺序执行）
+_current_test: Optional[str] = None
+
+
+def worker_id() -> str:
+    """pytest-xdist worker编号，未并行执行时为 master"""
+    return os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+
+def current_request() -> Tuple[Optional[str], Optional[str]]:
+    """当前请求的 (请求ID, 接口)"""
+    return _request.get() or (None, None)
+
+
+def current_test() -> Optional[str]:
+    return _test.get() or _current_test
+
+
+@contextmanager
+def request_scope(request_id: str, endpoint: str) -> Iterator[str]:
+    """在请求生命周期内（含重试）绑定请求ID"""
+    token = _request.set((request_id, endpoint))
+    try:
+        yield request_id
+    finally:
+        _request.reset(token)
+
+
+@contextmanager
+def bind_test(nodeid: str) -> Iterator[str]:
+    """在用例执行期间绑定用例ID"""
+    global _current_test
+    token = _test.set(nodeid)
+    _current_test = nodeid
+    try:
+        yield nodeid
+    finally:
+        _current_test = None
+        _test.reset(token)
@@ -0,0 +1,149 @@
+"""
+日志查询工具 - 基于索引按请求ID、接口、用例快速检索JSONL日志
+
+首次查询时扫描日志建立索引（请求ID/接口/用例 -> 行偏移），保存在日志文件旁的
+``<日志文件>.idx`` 中；日志追加写入后只对新增部分增量建立索引，查询时按偏移
+直接定位，不需要重新扫描整个文件。
+
+用法::
+
+    python -m common.log_query logs/test_20250101.jsonl --request-id 3f2a9c1d0b7e4a56
+    python -m common.log_query logs/*.jsonl --endpoint "PUT /rpm-api/contract/{id}" --limit 20
+    python -m common.log_query logs/test_20250101.jsonl --test "testcases/test_contract.py::TestContract::test_create_contract"
+"""
+import argparse
+import json
+import os
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+INDEX_VERSION = 1
+INDEX_FIELDS = ("request_id", "endpoint", "test")
+
+
+class LogIndex:
+    """单个JSONL日志文件的索引"""
+
+    def __init__(self, log_file: str):
+        self.log_file = Path(log_file)
+        self.index_file = self.log_file.with_name(self.log_file.name + ".idx")
+        self.indexed_size = 0
+        self.entries: Dict[str, Dict[str, List[int]]] = {field: {} for field in INDEX_FIELDS}
+
+    def _load(self) -> None:
+        try:
+            with open(self.index_file, "rb") as f:
+                payload = pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError):
+            return
+        if payload.get("version") != INDEX_VERSION:
+            return
+        self.indexed_size = payload["indexed_size"]
+        self.entries = payload["entries"]
+
+    def _save(self) -> None:
+        payload = {"version": INDEX_VERSION, "indexed_size": self.indexed_size, "entries": self.entries}
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.index_file.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.index_file)
+        except OSError as e:
+            print(f"保存日志索引失败: {self.index_file}, {e}", file=sys.stderr)
+
+    def refresh(self) -> "LogIndex":
+        """加载索引，并对索引之后追加的日志增量建立索引（日志被截断或轮转时重建）"""
+        self._load()
+        size = self.log_file.stat().st_size
+        if size < self.indexed_size:
+            self.indexed_size = 0
+            self.entries = {field: {} for field in INDEX_FIELDS}
+        if size == self.indexed_size:
+            return self
+
+        with open(self.log_file, "rb") as f:
+            f.seek(self.indexed_size)
+            offset = self.indexed_size
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # 最后一行可能正在写入，下次再建立索引
+                    break
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    event = None
+                if isinstance(event, dict):
+                    for field in INDEX_FIELDS:
+                        value = event.get(field)
+                        if value:
+                            self.entries[field].setdefault(value, []).append(offset)
+                offset += len(line)
+        self.indexed_size = offset
+        self._save()
+        return self
+
+    def lookup(self, field: str, value: str) -> Iterator[Dict[str, Any]]:
+        """按索引读取匹配的日志事件"""
+        offsets = self.entries[field].get(value, [])
+        if not offsets:
+            return
+        with open(self.log_file, "rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                yield json.loads(f.readline())
+
+    def values(self, field: str) -> Dict[str, int]:
+        """某字段所有取值及其事件数"""
+        return {value: len(offsets) for value, offsets in self.entries[field].items()}
+
+
+def query(log_files: List[str], field: str, value: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """在多个日志文件中按字段查询，按时间排序"""
+    events = []
+    for log_file in log_files:
+        events.extend(LogIndex(log_file).refresh().lookup(field, value))
+    events.sort(key=lambda event: event.get("ts", ""))
+    return events[:limit] if limit else events
+
+
+def _format_event(event: Dict[str, Any]) -> str:
+    context = " ".join(f"{key}={event[key]}" for key in ("worker", "request_id") if event.get(key))
+    return f"{event.get('ts')} {event.get('level'):<7} [{context}] {event.get('msg')}"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="按请求ID、接口或用例检索JSONL日志")
+    parser.add_argument("log_files", nargs="+", help="JSONL日志文件（LOG_FORMAT=json 时生成）")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--request-id", help="请求ID")
+    target.add_argument("--endpoint", help="接口，如 \"PUT /rpm-api/contract/{id}\"")
+    target.add_argument("--test", help="用例nodeid")
+    target.add_argument("--list", choices=INDEX_FIELDS, help="列出某字段的所有取值及事件数")
+    parser.add_argument("--limit", type=int, default=None, help="最多输出的事件数")
+    parser.add_argument("--json", action="store_true", help="输出原始JSON行")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        counts: Dict[str, int] = {}
+        for log_file in args.log_files:
+            for value, count in LogIndex(log_file).refresh().values(args.list).items():
+                counts[value] = counts.get(value, 0) + count
+        for value, count in sorted(counts.items(), key=lambda item: item[1], reverse=True)[:args.limit]:
+            print(f"{count:>8}  {value}")
+        return 0
+
+    field, value = next((field, getattr(args, field)) for field in INDEX_FIELDS if getattr(args, field))
+    events = query(args.log_files, field, value, args.limit)
+    for event in events:
+        print(json.dumps(event, ensure_ascii=False) if args.json else _format_event(event))
+    if not events:
+        print(f"未找到 {field}={value} 的日志", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
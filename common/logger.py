@@ -1,14 +1,73 @@
 """
 日志管理工具
 """
+import json
 import logging
 import os
 from datetime import datetime
 
+from common.log_context import current_request, current_test, worker_id
+
+# 日志格式：text（默认，可读文本）或 json（JSON Lines，每行一个事件，便于检索）
+LOG_FORMATS = ("text", "json")
+
+# LogRecord 自带的属性，其余属性（通过 extra 传入）作为结构化字段输出
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class _LazyFileHandler(logging.FileHandler):
+    """延迟打开的文件处理器：首次写日志时才创建日志目录并打开文件"""
+
+    def __init__(self, filename, encoding=None):
+        super().__init__(filename, encoding=encoding, delay=True)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+class _ContextFilter(logging.Filter):
+    """为每条日志补充请求ID、接口、用例ID和worker ID"""
+
+    def filter(self, record):
+        request_id, endpoint = current_request()
+        record.request_id = request_id
+        record.endpoint = endpoint
+        record.test = current_test()
+        record.worker = worker_id()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """JSON Lines格式化器"""
+
+    def format(self, record):
+        event = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "endpoint": getattr(record, "endpoint", None),
+            "test": getattr(record, "test", None),
+            "worker": getattr(record, "worker", None),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and key not in event:
+                event[key] = value
+        if record.exc_info:
+            event["exc"] = self.formatException(record.exc_info)
+        return json.dumps(event, ensure_ascii=False, default=str)
+
 
 class Logger:
     """日志管理类"""
     
+    # 日志格式和目录，可通过 LOG_FORMAT / LOG_DIR 环境变量或 Logger.configure() 设置
+    log_format = os.getenv("LOG_FORMAT", "text").lower()
+    log_dir = os.getenv("LOG_DIR", "logs")
+    _configured = set()
+    
     def __init__(self, name=None, level=logging.INFO):
         self.logger = logging.getLogger(name or __name__)
         self.logger.setLevel(level)
@@ -16,17 +75,33 @@ class Logger:
         # 避免重复添加handler
         if not self.logger.handlers:
             self._setup_handlers()
+        Logger._configured.add(self.logger.name)
+    
+    @classmethod
+    def configure(cls, log_format=None, log_dir=None):
+        """切换日志格式（text/json）或日志目录，已创建的logger立即生效"""
+        if log_format is not None:
+            log_format = log_format.lower()
+            if log_format not in LOG_FORMATS:
+                raise ValueError(f"不支持的日志格式: {log_format}，可选: {', '.join(LOG_FORMATS)}")
+            cls.log_format = log_format
+        if log_dir is not None:
+            cls.log_dir = log_dir
+        for name in cls._configured:
+            logger = logging.getLogger(name)
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+                handler.close()
+            cls(name)
     
     def _setup_handlers(self):
-        """设置日志处理器"""
-        # 创建logs目录
-        log_dir = "logs"
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
+        """设置日志处理器（日志目录和日志文件在首次写入时才创建）"""
+        structured = self.log_format == "json"
         
-        # 文件处理器
-        log_file = os.path.join(log_dir, f"test_{datetime.now().strftime('%Y%m%d')}.log")
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        # 文件处理器：json格式写入 .jsonl 文件
+        suffix = "jsonl" if structured else "log"
+        log_file = os.path.join(self.log_dir, f"test_{datetime.now().strftime('%Y%m%d')}.{suffix}")
+        file_handler = _LazyFileHandler(log_file, encoding='utf-8')
         file_handler.setLevel(logging.INFO)
         
         # 控制台处理器
@@ -39,12 +114,14 @@ class Logger:
             datefmt='%Y-%m-%d %H:%M:%S'
         )
         
-        file_handler.setFormatter(formatter)
+        file_handler.setFormatter(JsonFormatter() if structured else formatter)
         console_handler.setFormatter(formatter)
         
         # 添加处理器
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        context_filter = _ContextFilter()
+        for handler in (file_handler, console_handler):
+            handler.addFilter(context_filter)
+            self.logger.addHandler(handler)
     
     def get_logger(self):
         """获取logger实例"""
@@ -0,0 +1,348 @@
+"""
+请求指标 - 按接口汇总的运行时指标
+"""
+import functools
+import math
+import threading
+import time
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+
+
+def _is_id_segment(segment: str) -> bool:
+    """路径中的资源ID片段：数字、UUID、长十六进制串"""
+    if segment.isdigit():
+        return True
+    if len(segment) == 36 and segment.count("-") == 4:
+        return _HEX_DIGITS.issuperset(segment.replace("-", ""))
+    return len(segment) >= 24 and _HEX_DIGITS.issuperset(segment)
+
+
+@functools.lru_cache(maxsize=4096)
+def normalize_endpoint(method: str, url: str) -> str:
+    """将请求归一化为接口标识，资源ID统一替换为 {id}，如 PUT /rpm-api/contract/{id}"""
+    path = urlsplit(url).path if "://" in url else url.split("?", 1)[0]
+    segments = ["{id}" if _is_id_segment(segment) else segment for segment in path.split("/")]
+    return f"{method.upper()} {'/'.join(segments)}"
+
+
+class LatencyHistogram:
+    """耗时直方图（HDR风格的对数线性分桶），内存占用固定，与样本数量无关
+
+    以微秒为单位：小于128µs的值每微秒一个桶；之后每个2的幂区间分为64个桶，
+    相对误差不超过1/64（约1.6%）。覆盖范围1µs ~ 约71分钟，超出部分计入最后一个桶。
+    """
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    SUB_BUCKETS = 128
+    MAX_VALUE_US = (1 << 32) - 1
+    BUCKETS = SUB_BUCKETS + (32 - 7) * (SUB_BUCKETS // 2)
+
+    def __init__(self):
+        self.counts = array("Q", bytes(8 * self.BUCKETS))
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    @classmethod
+    def _index(cls, value_us: int) -> int:
+        if value_us < cls.SUB_BUCKETS:
+            return value_us
+        shift = value_us.bit_length() - 7
+        return cls.SUB_BUCKETS + (shift - 1) * 64 + (value_us >> shift) - 64
+
+    @classmethod
+    def _bucket_value(cls, index: int) -> float:
+        """桶的代表值（区间中点，毫秒）"""
+        if index < cls.SUB_BUCKETS:
+            return index / 1000
+        shift, sub = divmod(index - cls.SUB_BUCKETS, 64)
+        shift += 1
+        lower = (sub + 64) << shift
+        return (lower + (1 << shift) / 2) / 1000
+
+    def record(self, value_ms: float) -> None:
+        value_us = min(max(int(value_ms * 1000), 0), self.MAX_VALUE_US)
+        self.counts[self._index(value_us)] += 1
+        self.count += 1
+        self.total += value_ms
+        if value_ms < self.min:
+            self.min = value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+
+    def percentiles(self, *percents: float) -> List[float]:
+        """一次遍历计算多个百分位数（最近秩法，结果限制在实际最小/最大值之间）"""
+        if not self.count:
+            return [0.0] * len(percents)
+        targets = sorted((max(int(math.ceil(p / 100 * self.count)), 1), i) for i, p in enumerate(percents))
+        results = [0.0] * len(percents)
+        cumulative = 0
+        position = 0
+        for index, bucket_count in enumerate(self.counts):
+            if not bucket_count:
+                continue
+            cumulative += bucket_count
+            while position < len(targets) and targets[position][0] <= cumulative:
+                value = self._bucket_value(index)
+                results[targets[position][1]] = min(max(value, self.min), self.max)
+                position += 1
+            if position == len(targets):
+                break
+        return results
+
+    def distribution(self) -> Dict[str, float]:
+        p50, p95, p99 = self.percentiles(50, 95, 99)
+        return {
+            "mean": round(self.total / self.count, 2) if self.count else 0.0,
+            "p50": round(p50, 2),
+            "p95": round(p95, 2),
+            "p99": round(p99, 2),
+            "max": round(self.max, 2),
+        }
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for index, bucket_count in enumerate(other.counts):
+            if bucket_count:
+                self.counts[index] += bucket_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def export_state(self) -> Dict[str, Any]:
+        """只导出非空的桶"""
+        return {
+            "buckets": [[index, bucket_count] for index, bucket_count in enumerate(self.counts) if bucket_count],
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "LatencyHistogram":
+        histogram = cls()
+        for index, bucket_count in state["buckets"]:
+            histogram.counts[index] = bucket_count
+        histogram.count = state["count"]
+        histogram.total = state["total"]
+        histogram.min = state["min"] if state["count"] else math.inf
+        histogram.max = state["max"]
+        return histogram
+
+
+class RequestLog:
+    """最近请求的定长环形缓冲区，按列存储（接口ID、状态码、耗时、时间戳）
+
+    每条记录16字节，容量写满后覆盖最旧的记录，长时间运行内存不增长。
+    """
+
+    __slots__ = ("capacity", "endpoint_ids", "status_codes", "latencies_us", "timestamps", "_next", "_size")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.endpoint_ids = array("H", bytes(2 * capacity))
+        self.status_codes = array("H", bytes(2 * capacity))
+        # "I" 在各平台均为4字节，与 LatencyHistogram.MAX_VALUE_US（2**32-1）一致；"L" 在64位Linux上为8字节
+        self.latencies_us = array("I", bytes(4 * capacity))
+        self.timestamps = array("d", bytes(8 * capacity))
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, endpoint_id: int, status_code: int, latency_ms: float, timestamp: float) -> None:
+        if not self.capacity:
+            return
+        i = self._next
+        self.endpoint_ids[i] = endpoint_id
+        self.status_codes[i] = status_code
+        self.latencies_us[i] = min(max(int(latency_ms * 1000), 0), LatencyHistogram.MAX_VALUE_US)
+        self.timestamps[i] = timestamp
+        self._next = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def rows(self) -> Iterator[Tuple[int, int, float, float]]:
+        """按时间顺序返回 (接口ID, 状态码, 耗时ms, 时间戳)"""
+        start = (self._next - self._size) % self.capacity if self.capacity else 0
+        for offset in range(self._size):
+            i = (start + offset) % self.capacity
+            yield self.endpoint_ids[i], self.status_codes[i], self.latencies_us[i] / 1000, self.timestamps[i]
+
+
+class EndpointStats:
+    """单个接口的累计指标"""
+
+    __slots__ = ("requests", "wire_bytes", "body_bytes", "request_body_bytes", "request_wire_bytes",
+                 "phases", "reused_connections", "status_counts")
+
+    def __init__(self):
+        self.requests = 0
+        # 响应：实际传输字节数（压缩后）与解压后的响应体字节数
+        self.wire_bytes = 0
+        self.body_bytes = 0
+        # 请求体：原始字节数与实际发送字节数（压缩后）
+        self.request_body_bytes = 0
+        self.request_wire_bytes = 0
+        # 传输阶段耗时直方图：阶段名 -> LatencyHistogram
+        self.phases: Dict[str, LatencyHistogram] = {}
+        self.reused_connections = 0
+        self.status_counts: Dict[int, int] = {}
+
+    def histogram(self, phase: str) -> LatencyHistogram:
+        histogram = self.phases.get(phase)
+        if histogram is None:
+            histogram = self.phases[phase] = LatencyHistogram()
+        return histogram
+
+
+class MetricsRegistry:
+    """请求指标注册表（线程安全），按接口聚合
+
+    耗时以直方图累计，另保留最近 recent_capacity 次请求的原始记录，
+    内存占用只与接口数量和容量有关，与请求总数无关。
+    """
+
+    def __init__(self, recent_capacity: int = 65536):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, EndpointStats] = {}
+        self._endpoint_ids: Dict[str, int] = {}
+        self._endpoint_names: List[str] = []
+        self._recent = RequestLog(recent_capacity)
+
+    def configure(self, recent_capacity: int) -> None:
+        """调整最近请求记录的容量（已有记录会被清空）"""
+        with self._lock:
+            if recent_capacity != self._recent.capacity:
+                self._recent = RequestLog(recent_capacity)
+
+    def _stats(self, endpoint: str) -> EndpointStats:
+        stats = self._endpoints.get(endpoint)
+        if stats is None:
+            stats = self._endpoints.setdefault(endpoint, EndpointStats())
+        return stats
+
+    def _endpoint_id(self, endpoint: str) -> int:
+        endpoint_id = self._endpoint_ids.get(endpoint)
+        if endpoint_id is None:
+            endpoint_id = self._endpoint_ids[endpoint] = len(self._endpoint_names)
+            self._endpoint_names.append(endpoint)
+        return endpoint_id
+
+    def record_response(self, endpoint: str, wire_bytes: int, body_bytes: int) -> None:
+        """记录一次响应的传输字节数和解压后字节数"""
+        with self._lock:
+            stats = self._stats(endpoint)
+            stats.requests += 1
+            stats.wire_bytes += wire_bytes
+            stats.body_bytes += body_bytes
+
+    def record_request_body(self, endpoint: str, body_bytes: int, wire_bytes: int) -> None:
+        """记录一次请求体的原始字节数和实际发送字节数"""
+        with self._lock:
+            stats = self._stats(endpoint)
+            stats.request_body_bytes += body_bytes
+            stats.request_wire_bytes += wire_bytes
+
+    def record_phases(self, endpoint: str, phases: Dict[str, float], reused: bool, status_code: int = 0) -> None:
+        """记录一次请求的传输阶段耗时（dns/connect/tls/send/ttfb/download，毫秒）和状态码"""
+        total = sum(phases.values())
+        now = time.time()
+        with self._lock:
+            stats = self._stats(endpoint)
+            for phase, value in phases.items():
+                stats.histogram(phase).record(value)
+            stats.histogram("total").record(total)
+            if reused:
+                stats.reused_connections += 1
+            stats.status_counts[status_code] = stats.status_counts.get(status_code, 0) + 1
+            self._recent.append(self._endpoint_id(endpoint), status_code, total, now)
+
+    def phase_summary(self) -> List[Dict[str, Any]]:
+        """各接口传输阶段耗时的平均值/p50/p95/p99/最大值，按总耗时p95降序"""
+        with self._lock:
+            items = [(endpoint, {phase: histogram.distribution() for phase, histogram in stats.phases.items()},
+                      stats.phases["total"].count, stats.reused_connections, dict(stats.status_counts))
+                     for endpoint, stats in self._endpoints.items() if "total" in stats.phases]
+        summary = [{
+            "endpoint": endpoint,
+            "count": count,
+            "reused_rate": round(reused / count, 4),
+            "status_counts": status_counts,
+            "phases": phases,
+        } for endpoint, phases, count, reused, status_counts in items]
+        return sorted(summary, key=lambda item: item["phases"]["total"]["p95"], reverse=True)
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """最近的请求记录（按时间顺序），limit 为空时返回缓冲区内全部记录"""
+        with self._lock:
+            rows = list(self._recent.rows())
+            names = list(self._endpoint_names)
+        if limit is not None:
+            rows = rows[-limit:] if limit else []
+        return [{"endpoint": names[endpoint_id], "status_code": status_code, "elapsed_ms": latency, "timestamp": ts}
+                for endpoint_id, status_code, latency, ts in rows]
+
+    def compression_summary(self) -> List[Dict[str, Any]]:
+        """各接口压缩节省的字节数，按节省量降序"""
+        with self._lock:
+            items = list(self._endpoints.items())
+        summary = []
+        for endpoint, stats in items:
+            saved = (stats.body_bytes - stats.wire_bytes) + (stats.request_body_bytes - stats.request_wire_bytes)
+            summary.append({
+                "endpoint": endpoint,
+                "requests": stats.requests,
+                "response_wire_bytes": stats.wire_bytes,
+                "response_body_bytes": stats.body_bytes,
+                "request_body_bytes": stats.request_body_bytes,
+                "request_wire_bytes": stats.request_wire_bytes,
+                "bytes_saved": saved,
+                "response_ratio": round(stats.wire_bytes / stats.body_bytes, 4) if stats.body_bytes else 1.0,
+            })
+        return sorted(summary, key=lambda item: item["bytes_saved"], reverse=True)
+
+    def export_state(self) -> Dict[str, Dict[str, Any]]:
+        """导出累计指标（仅含基础类型），用于pytest-xdist worker向主进程汇总；最近请求记录不导出"""
+        with self._lock:
+            state = {}
+            for endpoint, stats in self._endpoints.items():
+                fields = {field: getattr(stats, field) for field in EndpointStats.__slots__
+                          if field not in ("phases", "status_counts")}
+                fields["phases"] = {phase: histogram.export_state() for phase, histogram in stats.phases.items()}
+                fields["status_counts"] = dict(stats.status_counts)
+                state[endpoint] = fields
+            return state
+
+    def merge_state(self, state: Dict[str, Dict[str, Any]]) -> None:
+        """合并其他进程导出的指标"""
+        with self._lock:
+            for endpoint, fields in state.items():
+                stats = self._stats(endpoint)
+                for field, value in fields.items():
+                    if field == "phases":
+                        for phase, histogram_state in value.items():
+                            stats.histogram(phase).merge(LatencyHistogram.from_state(histogram_state))
+                    elif field == "status_counts":
+                        for code, count in value.items():
+                            stats.status_counts[code] = stats.status_counts.get(code, 0) + count
+                    else:
+                        setattr(stats, field, getattr(stats, field) + value)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+            self._endpoint_ids.clear()
+            self._endpoint_names.clear()
+            self._recent = RequestLog(self._recent.capacity)
+
+
+# 进程内共享的指标注册表
+registry = MetricsRegistry()
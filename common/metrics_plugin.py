@@ -0,0 +1,85 @@
+"""
+请求指标插件 - 会话结束时输出按接口汇总的传输阶段耗时和压缩统计
+
+使用 pytest-xdist 并行时，各worker的指标在主进程合并后再输出。
+``--metrics-output`` 将按接口汇总的耗时分布写入JSON文件（多环境对比等工具读取）。
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from common.config_manager import ConfigManager
+from common.logger import Logger
+from common.metrics import registry
+
+logger = Logger().get_logger()
+
+PHASE_COLUMNS = ("dns", "connect", "tls", "send", "ttfb", "download", "total")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("metrics", "请求指标")
+    group.addoption("--metrics-top", action="store", type=int, default=10,
+                    help="会话结束时输出的接口数量（默认: 10，0 表示不输出）")
+    group.addoption("--metrics-output", action="store", default=None,
+                    help="将按接口汇总的耗时分布写入该JSON文件")
+
+
+def pytest_configure(config):
+    registry.configure(ConfigManager().get("metrics_recent_capacity", 65536))
+
+
+def pytest_sessionfinish(session, exitstatus):
+    workeroutput = getattr(session.config, "workeroutput", None)
+    if workeroutput is not None:
+        workeroutput["request_metrics"] = registry.export_state()
+        return
+    output = session.config.getoption("--metrics-output")
+    if output:
+        write_summary(output)
+
+
+def write_summary(output: str) -> None:
+    """写入各接口的请求数、状态码分布和各阶段耗时分布"""
+    path = Path(output)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(registry.phase_summary(), f, ensure_ascii=False, indent=2)
+        logger.info(f"请求指标已写入: {path}")
+    except OSError as e:
+        logger.warning(f"写入请求指标失败: {path}, {str(e)}")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    state = getattr(node, "workeroutput", {}).get("request_metrics")
+    if state:
+        registry.merge_state(state)
+
+
+def format_phase_table(summary, top: int) -> list:
+    """各接口传输阶段耗时表（p95，毫秒）"""
+    header = f"{'接口':<50} {'次数':>6} {'复用率':>7} " + " ".join(f"{column:>9}" for column in PHASE_COLUMNS)
+    lines = [header]
+    for item in summary[:top]:
+        phases = item["phases"]
+        values = " ".join(f"{phases.get(column, {}).get('p95', 0.0):>9.1f}" for column in PHASE_COLUMNS)
+        lines.append(f"{item['endpoint']:<50} {item['count']:>6} {item['reused_rate']:>7.0%} {values}")
+    return lines
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    top = config.getoption("--metrics-top")
+    if not top or getattr(config, "workeroutput", None) is not None:
+        return
+    summary = registry.phase_summary()
+    if not summary:
+        return
+    lines = format_phase_table(summary, top)
+    terminalreporter.write_sep("=", "传输阶段耗时 p95 (ms)")
+    for line in lines:
+        terminalreporter.write_line(line)
+    for line in lines:
+        logger.info(f"传输阶段耗时: {line}")
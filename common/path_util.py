@@ -0,0 +1,152 @@
+"""
+字段路径工具 - 按 data.user.name、data.list[0].id、data[*].amount 形式的路径取值
+
+- ``.`` 分隔字典键，``[n]`` 或纯数字段为列表下标（支持负数）
+- ``[*]`` 展开列表中的所有元素，得到一列值（extract_column）
+"""
+import functools
+import re
+from typing import Any, Iterator, List, Tuple
+
+WILDCARD = "*"
+_SEGMENT = re.compile(r"([^.\[\]]+)|\[(\*|-?\d+)\]")
+_MISSING = object()
+_ABSENT = object()
+# iter_values 中表示字段不存在
+MISSING = object()
+
+
+class PathNotFound(LookupError):
+    """路径在数据中不存在"""
+
+    def __init__(self, path: str, at: str):
+        super().__init__(f"字段路径 {path} 不存在（在 {at} 处中断）")
+        self.path = path
+        self.at = at
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_path(path: str) -> Tuple[Any, ...]:
+    """将路径解析为键/下标序列，如 "data.list[0].id" -> ("data", "list", 0, "id")"""
+    tokens = []
+    for key, index in _SEGMENT.findall(path):
+        if index:
+            tokens.append(WILDCARD if index == WILDCARD else int(index))
+        elif key == WILDCARD:
+            tokens.append(WILDCARD)
+        else:
+            tokens.append(key)
+    return tuple(tokens)
+
+
+def _step(value: Any, token: Any) -> Any:
+    if isinstance(value, dict):
+        if isinstance(token, str) and token in value:
+            return value[token]
+        # 纯数字段在字典中按字符串键查找
+        if isinstance(token, int) and str(token) in value:
+            return value[str(token)]
+        return _MISSING
+    if isinstance(value, (list, tuple)):
+        if isinstance(token, str) and token.lstrip("-").isdigit():
+            token = int(token)
+        if isinstance(token, int) and -len(value) <= token < len(value):
+            return value[token]
+    return _MISSING
+
+
+def get_value(data: Any, path: str, default: Any = _MISSING) -> Any:
+    """按路径取单个值；路径不存在时返回 default，未提供 default 时抛出 PathNotFound"""
+    value = data
+    for position, token in enumerate(parse_path(path)):
+        if token == WILDCARD:
+            raise ValueError(f"路径 {path} 包含 [*]，请使用 extract_column")
+        value = _step(value, token)
+        if value is _MISSING:
+            if default is not _MISSING:
+                return default
+            raise PathNotFound(path, _format_tokens(parse_path(path)[:position + 1]))
+    return value
+
+
+def has_path(data: Any, path: str) -> bool:
+    """路径是否存在（值为None也算存在）"""
+    return get_value(data, path, _ABSENT) is not _ABSENT
+
+
+def extract_column(data: Any, path: str) -> List[Any]:
+    """按含 [*] 的路径提取一列值，如 data[*].amount；元素中缺少该字段时取 None
+
+    多个 [*] 会逐层展开并拼接为一列。路径中 [*] 之前的部分不存在时抛出 PathNotFound。
+    """
+    tokens = parse_path(path)
+    if WILDCARD not in tokens:
+        value = get_value(data, path)
+        return list(value) if isinstance(value, list) else [value]
+    split = tokens.index(WILDCARD)
+    container = data
+    for position, token in enumerate(tokens[:split]):
+        container = _step(container, token)
+        if container is _MISSING:
+            raise PathNotFound(path, _format_tokens(tokens[:position + 1]))
+    if not isinstance(container, list):
+        raise PathNotFound(path, _format_tokens(tokens[:split + 1]))
+    rest = tokens[split + 1:]
+    if not rest:
+        return list(container)
+    if WILDCARD in rest:
+        rest_path = _format_tokens(rest)
+        column: List[Any] = []
+        for item in container:
+            try:
+                column.extend(extract_column(item, rest_path))
+            except PathNotFound:
+                continue
+        return column
+    return [_get_tokens(item, rest) for item in container]
+
+
+def iter_values(data: Any, path: str) -> Iterator[Tuple[str, Any]]:
+    """按路径逐个产出 (具体路径, 值)，如 data[*].id -> ("data[0].id", 1), ("data[1].id", 2)
+
+    字段不存在时值为 MISSING；[*] 作用于非列表（含None）时不产出任何值，
+    列表本身是否存在、类型是否正确由列表自己的路径负责校验。
+    """
+    stack = [(data, 0, ())]
+    tokens = parse_path(path)
+    while stack:
+        value, position, concrete = stack.pop()
+        if position == len(tokens):
+            yield _format_tokens(concrete), value
+            continue
+        token = tokens[position]
+        if token == WILDCARD:
+            if isinstance(value, list):
+                for index in range(len(value) - 1, -1, -1):
+                    stack.append((value[index], position + 1, concrete + (index,)))
+            continue
+        child = _step(value, token)
+        if child is _MISSING:
+            yield _format_tokens(concrete + tokens[position:]), MISSING
+            continue
+        stack.append((child, position + 1, concrete + (token,)))
+
+
+def _get_tokens(value: Any, tokens: Tuple[Any, ...]) -> Any:
+    for token in tokens:
+        value = _step(value, token)
+        if value is _MISSING:
+            return None
+    return value
+
+
+def _format_tokens(tokens: Tuple[Any, ...]) -> str:
+    text = ""
+    for token in tokens:
+        if token == WILDCARD:
+            text += "[*]"
+        elif isinstance(token, int):
+            text += f"[{token}]"
+        else:
+            text += f".{token}" if text else token
+    return text
@@ -0,0 +1,215 @@
+"""
+性能报告插件 - 记录每个用例 setup/call/teardown 耗时及其发出的HTTP请求数和字节数
+
+会话结束时输出排行：最慢的用例、HTTP请求最多的用例、尾延迟最高的接口，
+同时写入 ``--perf-report`` 指定的JSON文件（默认 logs/perf_report.json）。
+每个用例的耗时和请求统计附加到allure报告。
+"""
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from common.allure_util import attach
+from common.compression import wire_size
+from common.logger import Logger
+from common.metrics import registry
+from common.request_hooks import global_hooks
+
+logger = Logger().get_logger()
+
+DEFAULT_PERF_REPORT = "logs/perf_report.json"
+PHASES = ("setup", "call", "teardown")
+
+
+class CasePerf:
+    """单个用例的性能统计"""
+
+    __slots__ = ("nodeid", "setup", "call", "teardown", "outcome", "http_calls", "http_bytes")
+
+    def __init__(self, nodeid: str):
+        self.nodeid = nodeid
+        self.setup = 0.0
+        self.call = 0.0
+        self.teardown = 0.0
+        self.outcome = "passed"
+        self.http_calls = 0
+        self.http_bytes = 0
+
+    @property
+    def total(self) -> float:
+        return self.setup + self.call + self.teardown
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "nodeid": self.nodeid,
+            "outcome": self.outcome,
+            "setup_s": round(self.setup, 4),
+            "call_s": round(self.call, 4),
+            "teardown_s": round(self.teardown, 4),
+            "total_s": round(self.total, 4),
+            "http_calls": self.http_calls,
+            "http_bytes": self.http_bytes,
+        }
+
+
+# 当前正在执行的用例（用例在进程内顺序执行，资源工厂等线程池中的请求也计入当前用例）
+_current: Optional[CasePerf] = None
+# 当前会话的汇总对象（pytest_runtest_logreport 只接收report参数）
+_report: Optional["PerfReport"] = None
+_setup_key = pytest.StashKey[float]()
+
+
+def _on_before_request(context) -> None:
+    if _current is not None:
+        _current.http_calls += 1
+
+
+def _on_after_response(context) -> None:
+    """累计请求体和响应的传输字节数（流式响应由调用方读取，不计入）"""
+    if _current is None:
+        return
+    response = context.response
+    request_body = getattr(response.request, "body", None)
+    if request_body:
+        _current.http_bytes += len(request_body)
+    if not context.kwargs.get("stream"):
+        _current.http_bytes += wire_size(response)[0]
+
+
+class PerfReport:
+    """汇总各用例的性能统计（xdist主进程通过report汇总worker的数据）"""
+
+    def __init__(self):
+        self.tests: Dict[str, CasePerf] = {}
+
+    def record(self, report) -> None:
+        perf = self.tests.get(report.nodeid)
+        if perf is None:
+            perf = self.tests[report.nodeid] = CasePerf(report.nodeid)
+        if report.when in PHASES:
+            setattr(perf, report.when, report.duration)
+        if report.outcome != "passed" and perf.outcome == "passed":
+            perf.outcome = report.outcome
+        for name, value in report.user_properties:
+            if name == "http_stats":
+                perf.http_calls, perf.http_bytes = value
+
+    def build(self, top: int) -> Dict[str, Any]:
+        tests = list(self.tests.values())
+        endpoints = sorted(registry.phase_summary(), key=lambda item: item["phases"]["total"]["p99"], reverse=True)
+        return {
+            "tests": len(tests),
+            "total_duration_s": round(sum(perf.total for perf in tests), 4),
+            "total_http_calls": sum(perf.http_calls for perf in tests),
+            "slowest_tests": [perf.as_dict() for perf in sorted(tests, key=lambda p: p.total, reverse=True)[:top]],
+            "most_http_calls": [perf.as_dict() for perf in
+                                sorted(tests, key=lambda p: (p.http_calls, p.http_bytes), reverse=True)[:top]
+                                if perf.http_calls],
+            "worst_tail_endpoints": [
+                {"endpoint": item["endpoint"], "count": item["count"], **item["phases"]["total"]}
+                for item in endpoints[:top]
+            ],
+        }
+
+
+def format_report(data: Dict[str, Any]) -> List[str]:
+    lines = [f"用例数: {data['tests']}, 总耗时: {data['total_duration_s']:.2f}s, HTTP请求数: {data['total_http_calls']}"]
+    lines.append("")
+    lines.append("最慢的用例:")
+    lines.append(f"  {'总耗时s':>8} {'setup':>8} {'call':>8} {'teardown':>8}  用例")
+    for item in data["slowest_tests"]:
+        lines.append(f"  {item['total_s']:>8.3f} {item['setup_s']:>8.3f} {item['call_s']:>8.3f} "
+                     f"{item['teardown_s']:>8.3f}  {item['nodeid']}")
+    if data["most_http_calls"]:
+        lines.append("")
+        lines.append("HTTP请求最多的用例:")
+        lines.append(f"  {'请求数':>6} {'字节数':>10}  用例")
+        for item in data["most_http_calls"]:
+            lines.append(f"  {item['http_calls']:>6} {item['http_bytes']:>10}  {item['nodeid']}")
+    if data["worst_tail_endpoints"]:
+        lines.append("")
+        lines.append("尾延迟最高的接口 (ms):")
+        lines.append(f"  {'p99':>8} {'p95':>8} {'p50':>8} {'max':>8} {'次数':>6}  接口")
+        for item in data["worst_tail_endpoints"]:
+            lines.append(f"  {item['p99']:>8.1f} {item['p95']:>8.1f} {item['p50']:>8.1f} "
+                         f"{item['max']:>8.1f} {item['count']:>6}  {item['endpoint']}")
+    return lines
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("perf_report", "性能报告")
+    group.addoption("--perf-top", action="store", type=int, default=10,
+                    help="性能报告各排行的条数（默认: 10，0 表示不输出）")
+    group.addoption("--perf-report", action="store", default=DEFAULT_PERF_REPORT,
+                    help=f"性能报告JSON文件（默认: {DEFAULT_PERF_REPORT}）")
+
+
+def pytest_configure(config):
+    global _report
+    _report = PerfReport()
+    global_hooks.add("before_request", _on_before_request)
+    global_hooks.add("after_response", _on_after_response)
+
+
+def pytest_unconfigure(config):
+    global_hooks.remove("before_request", _on_before_request)
+    global_hooks.remove("after_response", _on_after_response)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    global _current
+    _current = CasePerf(item.nodeid)
+    try:
+        yield
+    finally:
+        _current = None
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    perf = _current
+    if perf is None:
+        return
+    if call.when == "call":
+        attach(f"setup: {item.stash.get(_setup_key, 0.0):.3f}s\ncall: {report.duration:.3f}s\n"
+               f"HTTP请求数: {perf.http_calls}\nHTTP字节数: {perf.http_bytes}",
+               name="用例性能统计", attachment_type="TEXT")
+    elif call.when == "setup":
+        item.stash[_setup_key] = report.duration
+    elif call.when == "teardown":
+        # 通过 user_properties 传给xdist主进程
+        report.user_properties.append(("http_stats", (perf.http_calls, perf.http_bytes)))
+
+
+def pytest_runtest_logreport(report):
+    if _report is not None:
+        _report.record(report)
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if getattr(config, "workeroutput", None) is not None:
+        return
+    top = config.getoption("--perf-top")
+    perf_report = _report
+    if not top or perf_report is None or not perf_report.tests:
+        return
+    data = perf_report.build(top)
+    lines = format_report(data)
+    terminalreporter.write_sep("=", "性能报告")
+    for line in lines:
+        terminalreporter.write_line(line)
+
+    output = Path(config.getoption("--perf-report"))
+    try:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump({**data, "all_tests": [perf.as_dict() for perf in perf_report.tests.values()]},
+                      f, ensure_ascii=False, indent=2)
+        terminalreporter.write_line(f"性能报告已写入: {output}")
+    except OSError as e:
+        logger.warning(f"写入性能报告失败: {output}, {str(e)}")
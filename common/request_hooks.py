@@ -0,0 +1,79 @@
+"""
+请求钩子 - RequestUtil发送请求过程中的扩展点
+
+支持的事件：
+- before_request: 每次发送前（含重试），可修改 context.kwargs
+  （kwargs["headers"] 可能是缓存的只读字典，增加请求头时整体替换：kwargs["headers"] = {**kwargs["headers"], ...}）
+- after_response: 收到响应后（含5xx重试前的响应）
+- on_retry: 决定重试时，context.error 或 context.response 为重试原因
+- on_error: 请求最终失败（抛出异常）时
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from common.log_context import current_request
+from common.logger import Logger
+
+logger = Logger().get_logger()
+
+HOOK_EVENTS = ("before_request", "after_response", "on_retry", "on_error")
+
+
+class RequestContext:
+    """单次请求在各钩子之间共享的上下文"""
+
+    __slots__ = ("method", "url", "endpoint", "request_id", "kwargs", "attempt", "max_retries",
+                 "response", "error", "start_time", "extras")
+
+    def __init__(self, method: str, url: str, endpoint: str, kwargs: Dict[str, Any], max_retries: int):
+        self.method = method
+        self.url = url
+        self.endpoint = endpoint
+        # 与日志中的 request_id 一致，便于按请求关联日志
+        self.request_id = current_request()[0]
+        self.kwargs = kwargs
+        self.attempt = 0
+        self.max_retries = max_retries
+        self.response = None
+        self.error: Optional[BaseException] = None
+        self.start_time = time.perf_counter()
+        # 供钩子之间传递自定义数据
+        self.extras: Dict[str, Any] = {}
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.start_time) * 1000
+
+
+class HookRegistry:
+    """钩子注册表，钩子自身抛出的异常只记录日志，不影响请求"""
+
+    def __init__(self):
+        self._hooks: Dict[str, List[Callable[[RequestContext], Any]]] = {event: [] for event in HOOK_EVENTS}
+        self._lock = threading.Lock()
+
+    def add(self, event: str, callback: Callable[[RequestContext], Any]) -> Callable:
+        if event not in self._hooks:
+            raise ValueError(f"不支持的钩子事件: {event}，可选: {', '.join(HOOK_EVENTS)}")
+        with self._lock:
+            self._hooks[event] = self._hooks[event] + [callback]
+        return callback
+
+    def remove(self, event: str, callback: Callable) -> None:
+        with self._lock:
+            self._hooks[event] = [hook for hook in self._hooks[event] if hook is not callback]
+
+    def __bool__(self) -> bool:
+        return any(self._hooks.values())
+
+    def emit(self, event: str, context: RequestContext) -> None:
+        for callback in self._hooks[event]:
+            try:
+                callback(context)
+            except Exception as e:
+                logger.warning(f"请求钩子 {event} 执行失败: {getattr(callback, '__name__', callback)}, {str(e)}")
+
+
+# 对所有RequestUtil实例生效的全局钩子（插件使用）
+global_hooks = HookRegistry()
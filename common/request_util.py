@@ -1,89 +1,379 @@
-import requests
+import threading
 import time
-import allure
 from common.logger import Logger
+from common.allure_util import step, attach
+from common.config_manager import ConfigManager
+from common.response_cache import ResponseCache, ConditionalCacheStore, WRITE_METHODS, auth_scope_of
+from common.compression import accept_encoding, compress_body, encode_json_body, wire_size
+from common.metrics import normalize_endpoint, registry
+from common.request_hooks import RequestContext, HookRegistry, global_hooks
+from common.tracing import tracer
+from common.log_context import request_scope
+from common.security_util import SecurityUtil
+from common.freeze_util import FrozenDict
+from common.exceptions import NetworkError, TimeoutError as RequestTimeoutError
 
 logger = Logger().get_logger()
 
+# 合并后请求头缓存的条目上限
+HEADER_MEMO_SIZE = 64
+
 
 class RequestUtil:
     """HTTP请求工具类"""
     
-    def __init__(self, base_url, timeout=30, max_retries=3):
-        self.base_url = base_url
-        self.timeout = timeout
-        self.max_retries = max_retries
-        logger.info(f"初始化RequestUtil，base_url: {base_url}, timeout: {timeout}s")
+    def __init__(self, base_url=None, timeout=None, max_retries=None):
+        """未显式传入的参数从 ConfigManager 配置快照读取，配置热加载后自动生效"""
+        self.config = ConfigManager()
+        self.base_url = base_url if base_url is not None else self.config.get("base_url")
+        self._timeout = timeout
+        self._max_retries = max_retries
+        # 认证范围（用于响应缓存键），为空时根据Authorization请求头计算
+        self.auth_scope = None
+        # 实例级请求钩子，全局钩子见 common.request_hooks.global_hooks
+        self.hooks = HookRegistry()
+        self._session = None
+        self._session_lock = threading.Lock()
+        # id(调用方请求头) -> (调用方请求头, 配置版本, 合并后的只读请求头)
+        self._header_memo = {}
+        self.response_cache = None
+        if self.config.get("response_cache_enabled", False):
+            self.enable_response_cache(
+                ttl=self.config.get("response_cache_ttl", 60),
+                max_size=self.config.get("response_cache_max_size", 256)
+            )
+        self.conditional_store = None
+        if self.config.get("conditional_requests_enabled", False):
+            self.enable_conditional_requests(
+                cache_dir=self.config.get("http_cache_dir", "./.cache/http"),
+                paths=self.config.get("conditional_request_paths")
+            )
+        logger.info(f"初始化RequestUtil，base_url: {self.base_url}, timeout: {self.timeout}s")
+
+    @property
+    def timeout(self):
+        """请求超时时间（秒）"""
+        return self._timeout if self._timeout is not None else self.config.get("timeout", 30)
+
+    @timeout.setter
+    def timeout(self, value):
+        self._timeout = value
+
+    @property
+    def max_retries(self):
+        """最大重试次数"""
+        return self._max_retries if self._max_retries is not None else self.config.get("max_retries", 3)
+
+    @max_retries.setter
+    def max_retries(self, value):
+        self._max_retries = value
+
+    @property
+    def session(self):
+        """复用连接的HTTP会话（首次使用时创建），连接池大小取自 pool_connections / pool_maxsize"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    from common.transport import create_session
+                    self._session = create_session(
+                        pool_connections=self.config.get("pool_connections", 10),
+                        pool_maxsize=self.config.get("pool_maxsize", 20)
+                    )
+        return self._session
+
+    def close(self):
+        """关闭HTTP会话，释放连接池中的连接"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def enable_response_cache(self, ttl=60, max_size=256):
+        """开启会话内GET响应缓存（LRU + TTL，写操作自动失效）"""
+        self.response_cache = ResponseCache(ttl=ttl, max_size=max_size)
+        logger.info(f"已开启响应缓存，ttl: {ttl}s, max_size: {max_size}")
+        return self.response_cache
+
+    def disable_response_cache(self):
+        """关闭响应缓存"""
+        self.response_cache = None
+
+    def enable_conditional_requests(self, cache_dir="./.cache/http", paths=None):
+        """开启条件请求：保存ETag/Last-Modified及响应体到磁盘，304时使用本地响应体
+
+        Args:
+            cache_dir: 磁盘缓存目录
+            paths: 使用条件请求的路径前缀列表，为空表示所有GET请求
+        """
+        self.conditional_store = ConditionalCacheStore(cache_dir, paths)
+        logger.info(f"已开启条件请求，缓存目录: {cache_dir}, 路径: {list(paths or []) or '全部GET请求'}")
+        return self.conditional_store
+
+    def _default_headers(self, headers):
+        """合并默认请求头：default_headers 配置、按已安装的解压库协商的 Accept-Encoding，调用方显式设置的优先
 
-    @allure.step("发送HTTP请求")
+        未传请求头或传入只读请求头（FrozenDict，如 headers fixture）时，合并结果按对象和配置版本缓存，
+        同一组请求头重复发送时直接复用，返回只读字典；传入普通 dict 时每次重新合并。
+        """
+        version = self.config.snapshot.version
+        cacheable = headers is None or isinstance(headers, FrozenDict)
+        if cacheable:
+            entry = self._header_memo.get(id(headers))
+            if entry is not None and entry[0] is headers and entry[1] == version:
+                return entry[2]
+        merged = dict(self.config.get("default_headers") or {})
+        merged.update(headers or {})
+        if not any(key.lower() == "accept-encoding" for key in merged):
+            merged["Accept-Encoding"] = self.config.get("accept_encoding") or accept_encoding()
+        if not cacheable:
+            return merged
+        merged = FrozenDict(merged)
+        if len(self._header_memo) >= HEADER_MEMO_SIZE:
+            self._header_memo.clear()
+        self._header_memo[id(headers)] = (headers, version, merged)
+        return merged
+
+    def _compress_request_body(self, method, full_url, kwargs, compress):
+        """JSON请求体超过阈值（或 compress=True）时以gzip压缩发送，返回实际发送用的参数
+
+        阈值为 request_compression_min_bytes，0 表示默认不压缩；compress=False 强制不压缩。
+        """
+        payload = kwargs.get('json')
+        threshold = self.config.get("request_compression_min_bytes", 0) or 0
+        if payload is None or compress is False or (compress is None and not threshold):
+            return kwargs
+
+        body = encode_json_body(payload)
+        if compress is None and len(body) < threshold:
+            return kwargs
+
+        compressed = compress_body(body)
+        registry.record_request_body(normalize_endpoint(method, full_url), len(body), len(compressed))
+        logger.info(f"请求体已gzip压缩: {len(body)} -> {len(compressed)} bytes")
+        request_kwargs = {key: value for key, value in kwargs.items() if key != 'json'}
+        request_kwargs['data'] = compressed
+        request_kwargs['headers'] = {
+            **(kwargs.get('headers') or {}),
+            "Content-Type": "application/json",
+            "Content-Encoding": "gzip",
+        }
+        return request_kwargs
+
+    def _cache_scope(self, headers):
+        return self.auth_scope or auth_scope_of(headers)
+
+    @step("发送HTTP请求")
     def send_request(self, method, url, **kwargs):
-        """发送HTTP请求，支持重试和详细日志"""
+        """发送HTTP请求，支持重试、详细日志和GET响应缓存
+
+        开启响应缓存时，可传入 use_cache=False 跳过单次GET请求的缓存；
+        传入 compress=True/False 可强制开启/关闭单次请求的请求体压缩；
+        传入 max_retries 可覆盖单次请求的最大尝试次数（如非幂等接口传1不重试）。
+        请求生命周期内（含重试）的日志都带有同一个请求ID。
+        """
+        request_id = SecurityUtil.generate_request_id(method, url)
+        with request_scope(request_id, normalize_endpoint(method, url)):
+            return self._dispatch(method, url, kwargs)
+    
+    def _dispatch(self, method, url, kwargs):
+        """按缓存策略分发请求"""
         full_url = self.base_url + url
+        use_cache = kwargs.pop('use_cache', True)
+        compress = kwargs.pop('compress', None)
+        kwargs['headers'] = self._default_headers(kwargs.get('headers'))
         
         # 设置默认超时时间
         if 'timeout' not in kwargs:
             kwargs['timeout'] = self.timeout
         
-        start_time = time.time()
-        
-        for attempt in range(self.max_retries):
+        method_upper = method.upper()
+        cache = self.response_cache
+        if method_upper in WRITE_METHODS:
             try:
-                logger.info(f"发送请求 - 方法: {method}, URL: {full_url}, 尝试: {attempt + 1}/{self.max_retries}")
-                
-                # 记录请求参数（敏感信息脱敏）
+                return self._send_with_retry(method, full_url, kwargs, compress)
+            finally:
+                # 写操作完成后使同一资源集合下的GET缓存失效
+                if cache is not None:
+                    cache.invalidate(url)
+        
+        if method_upper != "GET" or not use_cache:
+            return self._send_with_retry(method, full_url, kwargs)
+        
+        cache_key = None
+        if cache is not None:
+            cache_key = cache.make_key(method_upper, url, kwargs.get('params'), self._cache_scope(kwargs.get('headers')))
+            response = cache.get(cache_key)
+            if response is not None:
+                logger.info(f"命中响应缓存 - 方法: {method}, URL: {full_url}")
+                return response
+        
+        response = self._send_conditional(method, url, full_url, kwargs)
+        if cache_key is not None and response.status_code == 200:
+            cache.put(cache_key, response)
+        return response
+    
+    def _send_conditional(self, method, url, full_url, kwargs):
+        """对配置的路径发送条件GET，服务端返回304时使用本地缓存的响应体"""
+        store = self.conditional_store
+        if store is None or not store.applies_to(url):
+            return self._send_with_retry(method, full_url, kwargs)
+        
+        store_key = ResponseCache.make_key("GET", url, kwargs.get('params'), self.auth_scope or "shared")
+        entry = store.get(store_key)
+        if entry is not None:
+            kwargs['headers'] = {**(kwargs.get('headers') or {}), **store.validator_headers(entry)}
+        
+        response = self._send_with_retry(method, full_url, kwargs)
+        if response.status_code == 304 and entry is not None:
+            logger.info(f"资源未修改(304)，使用本地缓存的响应体 - URL: {full_url}")
+            return store.build_response(entry, response)
+        
+        store.put(store_key, response)
+        return response
+    
+    def _send_with_retry(self, method, full_url, kwargs, compress=None):
+        """发送请求，网络异常和5xx错误按指数退避重试
+
+        达到最大尝试次数后，连接错误抛出 NetworkError、超时抛出 common.exceptions.TimeoutError
+        （原始的requests异常作为 __cause__），用例失败重跑插件据此判断是否为偶发失败。
+        """
+        # 延迟导入requests，仅导入common模块（如 pytest -k 筛选）时不承担其导入开销
+        import requests
+        from common import transport
+
+        start_time = time.time()
+        max_retries = kwargs.pop('max_retries', None) or self.max_retries
+        endpoint = normalize_endpoint(method, full_url)
+        with tracer.span("http.request", method=method, endpoint=endpoint) as request_span:
+            # 请求参数（敏感信息脱敏）按压缩前的原始参数记录；请求体只在重试循环外压缩一次
+            with tracer.span("sanitize"):
                 safe_kwargs = self._sanitize_kwargs(kwargs.copy())
-                logger.info(f"请求参数: {safe_kwargs}")
-                
-                response = requests.request(method, full_url, **kwargs)
-                
-                # 计算响应时间
-                response_time = round((time.time() - start_time) * 1000, 2)
-                
-                # 记录响应信息
-                logger.info(f"响应状态码: {response.status_code}, 响应时间: {response_time}ms")
-                
-                # 记录响应内容（限制长度）
-                response_text = response.text[:500] + "..." if len(response.text) > 500 else response.text
-                logger.info(f"响应内容: {response_text}")
-                
-                # 添加到allure报告
-                allure.attach(
-                    f"Method: {method}\nURL: {full_url}\nResponse Time: {response_time}ms\nStatus Code: {response.status_code}",
-                    name="请求信息",
-                    attachment_type=allure.attachment_type.TEXT
-                )
-                
-                allure.attach(
-                    response.text,
-                    name="响应内容",
-                    attachment_type=allure.attachment_type.JSON if self._is_json_response(response) else allure.attachment_type.TEXT
-                )
-                
-                # 如果状态码正常或者是最后一次尝试，直接返回
-                if response.status_code < 500 or attempt == self.max_retries - 1:
-                    return response
+            with tracer.span("compress"):
+                request_kwargs = self._compress_request_body(method, full_url, kwargs, compress)
+            context = RequestContext(method, full_url, endpoint, request_kwargs, max_retries)
+            
+            for attempt in range(max_retries):
+                context.attempt = attempt + 1
+                context.response = None
+                context.error = None
+                try:
+                    logger.info(f"发送请求 - 方法: {method}, URL: {full_url}, 尝试: {attempt + 1}/{max_retries}",
+                                extra={"event": "request", "method": method, "attempt": attempt + 1})
+                    logger.info(f"请求参数: {safe_kwargs}")
+                    self._emit("before_request", context)
                     
-                # 5xx错误进行重试
-                logger.warning(f"服务器错误 {response.status_code}，将进行重试")
-                time.sleep(2 ** attempt)  # 指数退避
-                
-            except requests.exceptions.Timeout:
-                logger.warning(f"请求超时，第{attempt + 1}次尝试")
-                if attempt == self.max_retries - 1:
-                    logger.error("请求超时，达到最大重试次数")
-                    raise
-                time.sleep(2 ** attempt)
-                
-            except requests.exceptions.ConnectionError:
-                logger.warning(f"连接错误，第{attempt + 1}次尝试")
-                if attempt == self.max_retries - 1:
-                    logger.error("连接错误，达到最大重试次数")
+                    with tracer.span("http.send", attempt=attempt + 1) as send_span:
+                        timings = transport.start_recording()
+                        try:
+                            response = self.session.request(method, full_url, **context.kwargs)
+                        finally:
+                            transport.stop_recording()
+                        send_span.set_attribute("http.status_code", response.status_code)
+                        send_span.set_attribute("http.server_elapsed_ms", round(response.elapsed.total_seconds() * 1000, 2))
+                        for phase, value in timings.as_dict().items():
+                            send_span.set_attribute(f"http.{phase}_ms", value)
+                    context.response = response
+                    context.extras["phases"] = timings
+                    registry.record_phases(endpoint, timings.as_dict(), timings.reused, response.status_code)
+                    request_span.set_attribute("http.status_code", response.status_code)
+                    
+                    # 计算响应时间
+                    response_time = round((time.time() - start_time) * 1000, 2)
+                    
+                    # 记录响应信息
+                    logger.info(f"响应状态码: {response.status_code}, 响应时间: {response_time}ms",
+                                extra={"event": "response", "status_code": response.status_code,
+                                       "elapsed_ms": response_time, "attempt": attempt + 1})
+                    logger.info(f"传输阶段耗时: {timings}", extra={"event": "phases", "phases": timings.as_dict()})
+                    
+                    if context.kwargs.get('stream'):
+                        # 流式响应由调用方读取（如 compression.stream_json），此处不消费响应体
+                        logger.info("响应内容: <stream>")
+                        self._emit("after_response", context)
+                        if response.status_code < 500 or attempt == max_retries - 1:
+                            return response
+                        logger.warning(f"服务器错误 {response.status_code}，将进行重试")
+                        self._emit("on_retry", context)
+                        response.close()
+                        time.sleep(2 ** attempt)
+                        continue
+                    
+                    with tracer.span("decode"):
+                        is_json = self._is_json_response(response)
+                        if is_json and response.encoding is None:
+                            # JSON默认UTF-8，避免对整个响应体做字符集探测
+                            response.encoding = "utf-8"
+                        wire_bytes, body_bytes = wire_size(response)
+                        registry.record_response(endpoint, wire_bytes, body_bytes)
+                        # 响应体只解码一次，日志与报告共用（日志限制长度）
+                        full_text = response.text
+                    
+                    with tracer.span("log.response"):
+                        response_text = full_text[:500] + "..." if len(full_text) > 500 else full_text
+                        logger.info(f"响应内容: {response_text}")
+                    
+                    # 添加到allure报告
+                    with tracer.span("allure.attach"):
+                        attach(
+                            f"Method: {method}\nURL: {full_url}\nResponse Time: {response_time}ms\nStatus Code: {response.status_code}",
+                            name="请求信息",
+                            attachment_type="TEXT"
+                        )
+                        
+                        attach(
+                            full_text,
+                            name="响应内容",
+                            attachment_type="JSON" if is_json else "TEXT"
+                        )
+                    self._emit("after_response", context)
+                    
+                    # 如果状态码正常或者是最后一次尝试，直接返回
+                    if response.status_code < 500 or attempt == max_retries - 1:
+                        return response
+                        
+                    # 5xx错误进行重试
+                    logger.warning(f"服务器错误 {response.status_code}，将进行重试")
+                    self._emit("on_retry", context)
+                    time.sleep(2 ** attempt)  # 指数退避
+                    
+                except requests.exceptions.Timeout as e:
+                    context.error = e
+                    logger.warning(f"请求超时，第{attempt + 1}次尝试")
+                    if attempt == max_retries - 1:
+                        logger.error("请求超时，达到最大重试次数")
+                        self._emit("on_error", context)
+                        raise RequestTimeoutError(f"请求超时（已尝试{max_retries}次）: {method} {full_url}, {e}",
+                                                  timeout_seconds=context.kwargs.get('timeout'),
+                                                  operation=endpoint) from e
+                    self._emit("on_retry", context)
+                    time.sleep(2 ** attempt)
+                    
+                except requests.exceptions.ConnectionError as e:
+                    context.error = e
+                    logger.warning(f"连接错误，第{attempt + 1}次尝试")
+                    if attempt == max_retries - 1:
+                        logger.error("连接错误，达到最大重试次数")
+                        self._emit("on_error", context)
+                        raise NetworkError(f"连接错误（已尝试{max_retries}次）: {method} {full_url}, {e}",
+                                           url=full_url, retry_count=max_retries) from e
+                    self._emit("on_retry", context)
+                    time.sleep(2 ** attempt)
+                    
+                except Exception as e:
+                    context.error = e
+                    logger.error(f"请求发生未知错误: {str(e)}")
+                    self._emit("on_error", context)
                     raise
-                time.sleep(2 ** attempt)
-                
-            except Exception as e:
-                logger.error(f"请求发生未知错误: {str(e)}")
-                raise
+    
+    def _emit(self, event, context):
+        """依次触发全局钩子和实例钩子"""
+        if global_hooks:
+            global_hooks.emit(event, context)
+        if self.hooks:
+            self.hooks.emit(event, context)
+    
+    def add_hook(self, event, callback):
+        """注册请求钩子：before_request / after_response / on_retry / on_error，回调参数为 RequestContext"""
+        return self.hooks.add(event, callback)
     
     def _sanitize_kwargs(self, kwargs):
         """对请求参数进行脱敏处理"""
@@ -106,12 +396,9 @@ class RequestUtil:
         return kwargs
     
     def _is_json_response(self, response):
-        """判断响应是否为JSON格式"""
-        try:
-            response.json()
-            return True
-        except:
-            return False
+        """根据Content-Type判断响应是否为JSON格式（不解析响应体）"""
+        content_type = response.headers.get("Content-Type", "").split(";", 1)[0].strip().lower()
+        return content_type == "application/json" or content_type.endswith("+json")
     
     def get(self, url, **kwargs):
         """GET请求的便捷方法"""
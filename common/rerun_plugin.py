@@ -0,0 +1,333 @@
+"""
+失败重跑插件 - 只重跑偶发失败的用例，记录每个用例的不稳定历史，隔离长期不稳定的用例
+
+开启方式：``pytest --smart-reruns 2 [--rerun-delay 1]``
+
+- 失败分类：network（连接错误）、timeout（超时）、server（服务端5xx）、auth（登录失败）、
+  assertion（断言、数据校验、业务错误）、error（其他异常）
+- 分类依据 common.exceptions 中异常的 retryable 属性，并沿 ``raise ... from`` 的异常链查找：
+  RequestUtil 重试耗尽后抛出 NetworkError / TimeoutError，登录失败的 AuthenticationError 由网络错误引起时按网络错误处理；
+  断言失败且本次执行中有请求在重试耗尽后仍收到5xx响应时归为 server
+- 只有配置 rerun_categories 中的分类（默认 network、timeout、server）在原进程内立即重跑，不需要重跑整个用例集
+- 每个用例的最终结果追加到本地历史（``--flaky-history``，默认 .cache/flaky_history.json）：
+  P 通过、R 偶发失败（重跑后通过，或隔离中以可重跑的原因失败）、F 失败
+- 最近 flaky_history_window 次执行中 R 的次数达到 flaky_quarantine_threshold 的用例进入隔离：
+  照常执行一次但不重跑，以可重跑的原因失败时记为 xfail 不影响本次结果，断言等其他原因的失败照常报告；
+  R 的次数回落到阈值以下后自动解除隔离
+"""
+import builtins
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+import pytest
+from _pytest.runner import runtestprotocol
+
+from common.config_manager import ConfigManager
+from common.exceptions import RPMTestException
+from common.logger import Logger
+from common.request_hooks import global_hooks
+
+logger = Logger().get_logger()
+
+DEFAULT_HISTORY_FILE = ".cache/flaky_history.json"
+RETRYABLE_CATEGORIES = ("network", "timeout", "server")
+# 可重试异常的错误码对应的分类，其余可重试异常（如 APIRequestError 5xx）归为 server
+_RETRYABLE_CODES = {"NETWORK_ERROR": "network", "TIMEOUT_ERROR": "timeout"}
+_ERROR_CODES = {"AUTH_ERROR": "auth", "VALIDATION_ERROR": "assertion", "BUSINESS_ERROR": "assertion"}
+
+
+def _category_of(exc: BaseException) -> str:
+    if isinstance(exc, RPMTestException):
+        if exc.retryable:
+            return _RETRYABLE_CODES.get(exc.error_code, "server")
+        return _ERROR_CODES.get(exc.error_code, "error")
+    # 未经 RequestUtil 包装的底层异常（如直接使用 requests 或 socket）
+    requests = sys.modules.get("requests")
+    if isinstance(exc, builtins.TimeoutError) or (requests and isinstance(exc, requests.exceptions.Timeout)):
+        return "timeout"
+    if isinstance(exc, ConnectionError) or (requests and isinstance(exc, requests.exceptions.ConnectionError)):
+        return "network"
+    if isinstance(exc, AssertionError):
+        return "assertion"
+    return "error"
+
+
+def classify_failure(exc: BaseException, server_errors: int = 0) -> str:
+    """失败分类
+
+    Args:
+        exc: 用例抛出的异常
+        server_errors: 本次执行中重试耗尽后仍为5xx的请求数
+    """
+    cause: Optional[BaseException] = exc
+    while cause is not None:
+        category = _category_of(cause)
+        if category in RETRYABLE_CATEGORIES:
+            return category
+        cause = cause.__cause__
+    category = _category_of(exc)
+    if category == "assertion" and server_errors:
+        # 如 assert_status_code_200 在 RequestUtil 重试耗尽后仍收到502
+        return "server"
+    return category
+
+
+class FlakyHistory:
+    """本地不稳定历史：{用例: {"recent": 最近的结果序列, 计数, "quarantined": 是否隔离}}"""
+
+    def __init__(self, path: str, window: int = 20, threshold: int = 3):
+        self.path = Path(path)
+        self.window = max(1, window)
+        self.threshold = max(1, threshold)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.quarantine_changes: Dict[str, bool] = {}
+
+    def load(self) -> "FlakyHistory":
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取不稳定用例历史失败，重新记录: {self.path}, {str(e)}")
+        return self
+
+    def quarantined(self) -> Set[str]:
+        return {nodeid for nodeid, entry in self.entries.items() if entry.get("quarantined")}
+
+    def record(self, nodeid: str, outcome: str, category: Optional[str] = None) -> None:
+        """追加一次执行结果：P 通过、R 偶发失败、F 失败"""
+        entry = self.entries.setdefault(nodeid, {"recent": "", "runs": 0, "flaky": 0, "failures": 0,
+                                                  "quarantined": False})
+        entry["recent"] = (entry["recent"] + outcome)[-self.window:]
+        entry["runs"] += 1
+        if outcome == "R":
+            entry["flaky"] += 1
+        elif outcome == "F":
+            entry["failures"] += 1
+        if category:
+            entry["last_category"] = category
+        entry["last_run"] = datetime.now().isoformat(timespec="seconds")
+        quarantined = entry["recent"].count("R") >= self.threshold
+        if quarantined != entry["quarantined"]:
+            entry["quarantined"] = quarantined
+            self.quarantine_changes[nodeid] = quarantined
+
+    def save(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(dict(sorted(self.entries.items())), f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            logger.warning(f"写入不稳定用例历史失败: {self.path}, {str(e)}")
+
+
+class RerunState:
+    """插件状态：worker中执行重跑，主进程汇总结果并更新历史"""
+
+    def __init__(self, reruns: int, delay: float, categories, history: FlakyHistory, quarantine: bool,
+                 master: bool = True):
+        self.reruns = reruns
+        self.delay = delay
+        self.categories = frozenset(categories)
+        self.history = history
+        self.master = master
+        self.quarantined = history.quarantined() if quarantine else set()
+        # 当前执行中最终收到5xx（RequestUtil重试耗尽）的请求数（用例在进程内顺序执行）
+        self.server_errors = 0
+        # 主进程：{用例: {"reruns": 次数, "categories": [...], "failed": bool, "passed": bool, "quarantined": bool}}
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def on_after_response(self, context) -> None:
+        # after_response 在每次重试前也会触发，只统计不再重试的最终响应
+        if (context.response is not None and context.response.status_code >= 500
+                and context.attempt >= context.max_retries):
+            self.server_errors += 1
+
+
+_state: Optional[RerunState] = None
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("rerun", "失败重跑")
+    group.addoption("--smart-reruns", action="store", type=int, default=0,
+                    help="偶发失败（网络、超时、服务端5xx）的用例最多重跑的次数（默认: 0，不开启）")
+    group.addoption("--rerun-delay", action="store", type=float, default=1.0,
+                    help="重跑前等待的秒数（默认: 1）")
+    group.addoption("--flaky-history", action="store", default=DEFAULT_HISTORY_FILE,
+                    help=f"不稳定用例历史文件（默认: {DEFAULT_HISTORY_FILE}）")
+    group.addoption("--no-quarantine", action="store_true", default=False,
+                    help="不隔离长期不稳定的用例")
+
+
+def pytest_configure(config):
+    global _state
+    reruns = config.getoption("--smart-reruns")
+    if not reruns or reruns < 0:
+        return
+    settings = ConfigManager()
+    history = FlakyHistory(config.getoption("--flaky-history"),
+                           window=settings.get("flaky_history_window", 20),
+                           threshold=settings.get("flaky_quarantine_threshold", 3)).load()
+    _state = RerunState(reruns, config.getoption("--rerun-delay"),
+                        settings.get("rerun_categories") or RETRYABLE_CATEGORIES,
+                        history, quarantine=not config.getoption("--no-quarantine"),
+                        master=getattr(config, "workerinput", None) is None)
+    global_hooks.add("after_response", _state.on_after_response)
+    if _state.quarantined and _state.master:
+        logger.info(f"隔离中的不稳定用例: {len(_state.quarantined)}个")
+
+
+def pytest_unconfigure(config):
+    global _state
+    if _state is not None:
+        global_hooks.remove("after_response", _state.on_after_response)
+        _state = None
+
+
+def _reset_failed_fixtures(item) -> None:
+    """清除setup失败的fixture缓存的异常，重跑时重新执行（如登录时的网络错误），与pytest-rerunfailures相同"""
+    for fixturedefs in item._fixtureinfo.name2fixturedefs.values():
+        for fixturedef in fixturedefs:
+            cached = getattr(fixturedef, "cached_result", None)
+            if cached is not None and cached[2] is not None:
+                fixturedef.cached_result = None
+                # 失败的fixture只登记了 pytest_fixture_post_finalizer，不清除时重新执行会断言失败
+                getattr(fixturedef, "_finalizers", []).clear()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_protocol(item, nextitem):
+    state = _state
+    if state is None:
+        return None
+    max_reruns = 0 if item.nodeid in state.quarantined else state.reruns
+    ihook = item.ihook
+    ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+    for attempt in range(max_reruns + 1):
+        state.server_errors = 0
+        reports = runtestprotocol(item, nextitem=nextitem, log=False)
+        failed = next((report for report in reports if report.failed and report.when != "teardown"), None)
+        category = getattr(failed, "failure_category", None)
+        rerun = failed is not None and attempt < max_reruns and category in state.categories
+        for report in reports:
+            if rerun and report is failed:
+                # 与pytest-rerunfailures一致：本次执行只报告到失败的阶段为止，结果记为 rerun
+                report.outcome = "rerun"
+                ihook.pytest_runtest_logreport(report=report)
+                break
+            ihook.pytest_runtest_logreport(report=report)
+        if not rerun:
+            break
+        logger.warning(f"用例偶发失败（{category}），第{attempt + 1}/{max_reruns}次重跑: {item.nodeid}")
+        _reset_failed_fixtures(item)
+        if state.delay:
+            time.sleep(state.delay)
+    ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+    return True
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    state = _state
+    if state is None or call.excinfo is None:
+        return
+    report = outcome.get_result()
+    if not report.failed:
+        return
+    report.failure_category = classify_failure(call.excinfo.value, state.server_errors)
+    # 隔离只掩盖偶发原因的失败，隔离中的用例出现断言失败等真实问题时照常报告
+    if (item.nodeid in state.quarantined and report.when in ("setup", "call")
+            and report.failure_category in state.categories):
+        report.outcome = "skipped"
+        report.wasxfail = f"隔离中的不稳定用例（{report.failure_category}）"
+        report.quarantined = True
+
+
+def pytest_report_teststatus(report, config):
+    if report.outcome == "rerun":
+        return "rerun", "R", ("RERUN", {"yellow": True})
+    return None
+
+
+def pytest_runtest_logreport(report):
+    state = _state
+    if state is None or not state.master:
+        return
+    result = state.results.setdefault(report.nodeid, {"reruns": 0, "categories": [], "failed": False,
+                                                      "passed": False, "quarantined": False})
+    category = getattr(report, "failure_category", None)
+    if category:
+        result["categories"].append(category)
+    if report.outcome == "rerun":
+        result["reruns"] += 1
+    elif getattr(report, "quarantined", False):
+        result["quarantined"] = True
+    elif report.failed:
+        result["failed"] = True
+    elif report.passed and report.when == "call":
+        result["passed"] = True
+
+
+def pytest_sessionfinish(session, exitstatus):
+    state = _state
+    if state is None or not state.master:
+        return
+    for nodeid, result in state.results.items():
+        category = result["categories"][-1] if result["categories"] else None
+        if result["failed"]:
+            outcome = "F"
+        elif result["quarantined"]:
+            outcome = "R"
+        elif result["passed"]:
+            outcome = "R" if result["reruns"] else "P"
+        else:
+            continue  # 跳过的用例不记录
+        state.history.record(nodeid, outcome, category)
+    if state.results:
+        state.history.save()
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    state = _state
+    if state is None or not state.master:
+        return
+    lines = format_rerun_summary(state)
+    if not lines:
+        return
+    terminalreporter.section("失败重跑")
+    for line in lines:
+        terminalreporter.write_line(line)
+        logger.info(f"失败重跑: {line}")
+
+
+def format_rerun_summary(state: RerunState) -> List[str]:
+    results = state.results
+    lines = []
+    rerun = {nodeid: result for nodeid, result in results.items() if result["reruns"]}
+    if rerun:
+        lines.append(f"重跑用例: {len(rerun)}个，共{sum(result['reruns'] for result in rerun.values())}次")
+    for title, selected in (
+        ("重跑后通过（不稳定）", [nodeid for nodeid, result in rerun.items() if result["passed"]]),
+        ("重跑后仍然失败", [nodeid for nodeid, result in rerun.items() if result["failed"]]),
+        ("失败但不重跑", [nodeid for nodeid, result in results.items() if result["failed"] and not result["reruns"]]),
+        ("隔离中失败（记为xfail）", [nodeid for nodeid, result in results.items() if result["quarantined"]]),
+    ):
+        if selected:
+            lines.append(f"{title}:")
+            lines.extend(f"  {nodeid}  [{', '.join(results[nodeid]['categories'])}]" for nodeid in selected)
+    history = state.history
+    for title, value in (("新进入隔离", True), ("解除隔离", False)):
+        changed = [nodeid for nodeid, quarantined in history.quarantine_changes.items() if quarantined is value]
+        if changed:
+            lines.append(f"{title}:")
+            lines.extend(f"  {nodeid}  最近{len(history.entries[nodeid]['recent'])}次: {history.entries[nodeid]['recent']}"
+                         for nodeid in changed)
+    if lines:
+        lines.append(f"不稳定用例历史: {history.path}")
+    return lines
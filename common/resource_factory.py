@@ -0,0 +1,201 @@
+"""
+测试资源工厂 - 并发创建/清理合同、项目等测试资源，并以资源池的形式分发给用例
+"""
+import math
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List
+
+from common.contract_api import ContractAPI
+from common.exceptions import ResourceProvisionError
+from common.freeze_util import thaw
+from common.log_context import worker_id
+from common.logger import Logger
+from common.project_api import ProjectAPI
+
+logger = Logger().get_logger()
+
+
+def worker_share(total: int) -> int:
+    """并行执行时每个worker分到的资源数量（向上取整，至少为1）
+
+    每个worker只创建并使用属于自己的那一份资源，worker之间互不争用，
+    总创建量与串行执行时基本一致。
+    """
+    worker_count = int(os.environ.get("PYTEST_XDIST_WORKER_COUNT", "1") or 1)
+    return max(1, math.ceil(total / worker_count)) if total > 0 else 0
+
+
+class ResourceType:
+    """一种测试资源的创建与删除方式"""
+
+    __slots__ = ("name", "create", "delete", "payload")
+
+    def __init__(self, name: str, create: Callable, delete: Callable, payload: Dict[str, Any]):
+        self.name = name
+        # create(payload, headers) -> response；delete(resource_id, headers) -> response
+        self.create = create
+        self.delete = delete
+        self.payload = payload
+
+
+class ResourceFactory:
+    """测试资源工厂
+
+    - provision(): 用线程池并发创建资源，创建耗时与数量基本无关（受 max_workers 限制）
+    - acquire()/release()/lease(): 从资源池借出、归还资源；池为空时按需补充创建
+    - take(): 借出后不再归还（如删除类用例），会话结束时仍会尝试清理
+    - teardown(): 并发删除本工厂创建的所有资源，单个资源删除失败只记录日志
+    """
+
+    def __init__(self, req, headers: Dict[str, str], max_workers: int = 8, name_prefix: str = "autotest"):
+        self.req = req
+        self.headers = headers
+        self.max_workers = max_workers
+        self.name_prefix = f"{name_prefix}-{worker_id()}"
+        self._types: Dict[str, ResourceType] = {}
+        self._pools: Dict[str, "queue.Queue[Any]"] = {}
+        self._created: Dict[str, List[Any]] = {}
+        self._lock = threading.Lock()
+        self._counter = 0
+
+    def register(self, name: str, create: Callable, delete: Callable, payload: Dict[str, Any]) -> None:
+        """注册资源类型"""
+        self._types[name] = ResourceType(name, create, delete, thaw(payload))
+        self._pools.setdefault(name, queue.Queue())
+        self._created.setdefault(name, [])
+
+    def register_defaults(self, contract_payload: Dict[str, Any], project_payload: Dict[str, Any]) -> None:
+        """注册合同、项目两种内置资源"""
+        contract_api = ContractAPI(self.req)
+        project_api = ProjectAPI(self.req)
+        self.register("contract", contract_api.create_contract, contract_api.delete_contract, contract_payload)
+        self.register("project", project_api.create_project, project_api.delete_project, project_payload)
+
+    def _resource_type(self, name: str) -> ResourceType:
+        if name not in self._types:
+            raise ResourceProvisionError(f"未注册的资源类型: {name}", resource_type=name)
+        return self._types[name]
+
+    def _next_name(self, resource_type: ResourceType) -> str:
+        with self._lock:
+            self._counter += 1
+            return f"{self.name_prefix}-{resource_type.name}-{self._counter}"
+
+    def create_one(self, name: str) -> Any:
+        """同步创建一个资源，返回资源ID"""
+        resource_type = self._resource_type(name)
+        payload = dict(resource_type.payload)
+        payload["name"] = self._next_name(resource_type)
+        response = resource_type.create(payload, self.headers)
+        try:
+            body = response.json()
+            resource_id = body["data"]["id"]
+        except Exception:
+            raise ResourceProvisionError(
+                f"创建{name}失败: {response.status_code} - {response.text[:200]}",
+                resource_type=name, status_code=response.status_code
+            )
+        if response.status_code != 200 or body.get("code") != "200":
+            raise ResourceProvisionError(f"创建{name}失败: {body.get('message')}",
+                                         resource_type=name, status_code=response.status_code)
+        with self._lock:
+            self._created[name].append(resource_id)
+        return resource_id
+
+    def provision(self, counts: Dict[str, int]) -> Dict[str, List[Any]]:
+        """并发创建各类资源并放入资源池，如 provision({"contract": 4, "project": 4})
+
+        部分资源创建失败时记录日志并继续，某类资源一个都没创建成功时抛出异常。
+        """
+        tasks = [name for name, count in counts.items() for _ in range(count)]
+        if not tasks:
+            return {}
+        for name in counts:
+            self._resource_type(name)
+
+        results: Dict[str, List[Any]] = {name: [] for name in counts}
+        errors: Dict[str, List[str]] = {name: [] for name in counts}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tasks)),
+                                thread_name_prefix="resource-setup") as executor:
+            futures = [(name, executor.submit(self.create_one, name)) for name in tasks]
+            for name, future in futures:
+                try:
+                    resource_id = future.result()
+                except Exception as e:
+                    errors[name].append(str(e))
+                    logger.warning(f"创建测试资源失败: {name}, {str(e)}")
+                    continue
+                results[name].append(resource_id)
+                self._pools[name].put(resource_id)
+
+        for name, created in results.items():
+            if counts[name] and not created:
+                raise ResourceProvisionError(f"测试资源{name}全部创建失败: {errors[name][:3]}", resource_type=name)
+        logger.info(f"测试资源创建完成: { {name: len(ids) for name, ids in results.items()} }")
+        return results
+
+    def acquire(self, name: str) -> Any:
+        """从资源池借出一个资源，池为空时立即创建一个新资源"""
+        pool = self._pools.get(name)
+        if pool is None:
+            self._resource_type(name)
+        try:
+            return pool.get_nowait()
+        except queue.Empty:
+            logger.info(f"资源池{name}已空，按需创建")
+            return self.create_one(name)
+
+    def release(self, name: str, resource_id: Any) -> None:
+        """归还资源到资源池"""
+        self._pools[name].put(resource_id)
+
+    def take(self, name: str) -> Any:
+        """借出资源且不再归还（用例会删除或破坏该资源）"""
+        return self.acquire(name)
+
+    @contextmanager
+    def lease(self, name: str) -> Iterator[Any]:
+        """借出资源，用完自动归还"""
+        resource_id = self.acquire(name)
+        try:
+            yield resource_id
+        finally:
+            self.release(name, resource_id)
+
+    def available(self, name: str) -> int:
+        """资源池中当前可借出的资源数"""
+        return self._pools[name].qsize() if name in self._pools else 0
+
+    def teardown(self) -> Dict[str, int]:
+        """并发删除本工厂创建的所有资源，返回各类资源的删除成功数"""
+        with self._lock:
+            targets = [(name, resource_id) for name, ids in self._created.items() for resource_id in ids]
+            for ids in self._created.values():
+                ids.clear()
+        deleted = {name: 0 for name in self._types}
+        if not targets:
+            return deleted
+
+        def delete(name: str, resource_id: Any) -> bool:
+            try:
+                response = self._types[name].delete(resource_id, self.headers)
+                return response.status_code < 400
+            except Exception as e:
+                logger.warning(f"删除测试资源失败: {name} {resource_id}, {str(e)}")
+                return False
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(targets)),
+                                thread_name_prefix="resource-teardown") as executor:
+            futures = [(name, executor.submit(delete, name, resource_id)) for name, resource_id in targets]
+            for name, future in futures:
+                if future.result():
+                    deleted[name] += 1
+        for pool in self._pools.values():
+            while not pool.empty():
+                pool.get_nowait()
+        logger.info(f"测试资源清理完成: {deleted}")
+        return deleted
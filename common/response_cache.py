@@ -0,0 +1,246 @@
+"""
+响应缓存 - 会话内幂等GET请求的响应复用，以及跨会话的条件请求（ETag / If-Modified-Since）缓存
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from common.logger import Logger
+
+logger = Logger().get_logger()
+
+# 会使同一资源下的缓存失效的写操作
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+def auth_scope_of(headers: Optional[Dict[str, str]]) -> str:
+    """根据Authorization请求头计算认证范围，不同token的缓存互不共享"""
+    if headers:
+        for key, value in headers.items():
+            if key.lower() == "authorization":
+                return hashlib.sha1(str(value).encode()).hexdigest()[:12]
+    return "anonymous"
+
+
+def resource_prefix(url: str) -> str:
+    """资源所在集合的路径前缀：/rpm-api/contract/1 -> /rpm-api/contract/"""
+    path = url.split("?", 1)[0].rstrip("/")
+    return path.rsplit("/", 1)[0] + "/"
+
+
+class ResponseCache:
+    """会话内GET响应缓存
+
+    - 缓存键：方法 + URL + 查询参数 + 认证范围
+    - 条目超过 ttl 秒自动过期，超过 max_size 时淘汰最久未使用的条目（LRU）
+    - 对同一资源集合的写操作（POST/PUT/PATCH/DELETE）会使该集合下的缓存失效，
+      如 PUT /rpm-api/contract/1 会使 /rpm-api/contract/list 和 /rpm-api/contract/1 失效
+    """
+
+    def __init__(self, ttl: float = 60, max_size: int = 256):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Tuple[float, str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(method: str, url: str, params: Any = None, scope: str = "anonymous") -> Hashable:
+        """生成缓存键，查询参数与顺序无关"""
+        if isinstance(params, dict):
+            normalized = tuple(sorted(
+                (str(key), tuple(value) if isinstance(value, (list, tuple)) else str(value))
+                for key, value in params.items()
+            ))
+        elif params:
+            normalized = tuple(params) if isinstance(params, (list, tuple)) else str(params)
+        else:
+            normalized = ()
+        return method.upper(), url, normalized, scope
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """获取未过期的缓存响应，未命中返回None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, _, response = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def put(self, key: Hashable, response: Any) -> None:
+        """写入缓存，超过容量时淘汰最久未使用的条目"""
+        path = key[1].split("?", 1)[0]
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, path, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, url: str) -> int:
+        """使写操作所在资源集合下的缓存失效，返回失效条目数"""
+        prefix = resource_prefix(url)
+        with self._lock:
+            stale = [key for key, (_, path, _) in self._entries.items()
+                     if path.startswith(prefix) or path == prefix.rstrip("/")]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+        if stale:
+            logger.debug(f"写操作使响应缓存失效: {prefix}*, {len(stale)}条")
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存命中统计"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+# 不随缓存体保存的响应头：缓存中保存的是已解压的内容
+_UNSTORED_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding", "connection"})
+
+
+class ConditionalCacheStore:
+    """条件请求磁盘缓存
+
+    保存GET响应的校验器（ETag、Last-Modified）和响应体，跨会话复用。
+    再次请求时携带 If-None-Match / If-Modified-Since，服务端返回304时
+    直接用本地缓存的响应体构造完整响应，减少传输字节数。
+
+    缓存键不区分token（token每次运行都会变化），校验由服务端完成：
+    不同用户看到的内容不同时其ETag也不同，服务端会返回完整的200响应。
+    """
+
+    def __init__(self, cache_dir: str, paths: Optional[Tuple[str, ...]] = None):
+        self.cache_dir = Path(cache_dir)
+        # 仅对这些路径前缀使用条件请求，为空表示所有GET请求
+        self.paths = tuple(paths or ())
+        self._lock = threading.Lock()
+        self.revalidated = 0
+        self.stored = 0
+        self.bytes_saved = 0
+
+    def applies_to(self, url: str) -> bool:
+        if not self.paths:
+            return True
+        path = url.split("?", 1)[0]
+        return any(path.startswith(prefix) for prefix in self.paths)
+
+    def _entry_file(self, key: Hashable) -> Path:
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return self.cache_dir / digest[:2] / f"{digest}.pickle"
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """读取缓存条目，不存在或损坏时返回None"""
+        entry_file = self._entry_file(key)
+        try:
+            with open(entry_file, "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"读取条件请求缓存失败: {entry_file}, {str(e)}")
+            return None
+
+    @staticmethod
+    def validator_headers(entry: Dict[str, Any]) -> Dict[str, str]:
+        """根据缓存条目生成条件请求头"""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, key: Hashable, response: Any) -> bool:
+        """保存带有ETag或Last-Modified的200响应，返回是否已保存"""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status_code != 200 or not (etag or last_modified):
+            return False
+
+        entry = {
+            "url": response.url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "status_code": response.status_code,
+            "reason": response.reason,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() not in _UNSTORED_HEADERS},
+            "encoding": response.encoding,
+            "content": response.content,
+            "stored_at": time.time(),
+        }
+        entry_file = self._entry_file(key)
+        try:
+            entry_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=entry_file.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, entry_file)
+        except OSError as e:
+            logger.warning(f"写入条件请求缓存失败: {entry_file}, {str(e)}")
+            return False
+        with self._lock:
+            self.stored += 1
+        return True
+
+    def build_response(self, entry: Dict[str, Any], not_modified: Any) -> Any:
+        """用缓存条目和304响应构造完整的响应对象"""
+        import requests
+        from requests.structures import CaseInsensitiveDict
+
+        response = requests.Response()
+        response.status_code = entry["status_code"]
+        response.reason = entry["reason"]
+        response._content = entry["content"]
+        response.encoding = entry["encoding"]
+        headers = CaseInsensitiveDict(entry["headers"])
+        # 304响应中的头（Date、ETag、Cache-Control等）覆盖缓存中的旧值
+        for name, value in not_modified.headers.items():
+            if name.lower() not in _UNSTORED_HEADERS:
+                headers[name] = value
+        response.headers = headers
+        response.url = not_modified.url
+        response.request = not_modified.request
+        response.elapsed = not_modified.elapsed
+        response.connection = getattr(not_modified, "connection", None)
+        response.from_conditional_cache = True
+        with self._lock:
+            self.revalidated += 1
+            self.bytes_saved += len(entry["content"])
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """条件请求统计"""
+        return {
+            "revalidated": self.revalidated,
+            "stored": self.stored,
+            "bytes_saved": self.bytes_saved,
+        }
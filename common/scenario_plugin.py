@@ -0,0 +1,181 @@
+"""
+数据驱动场景插件 - 根据YAML场景文件生成测试用例
+
+场景文件放在 data/scenarios/ 下（可通过 --scenario-dir 指定），每个场景描述
+请求、期望的响应结构、业务规则和性能预算；matrix 中的取值做笛卡尔积展开，
+一个场景即可生成大量用例。所有用例共用同一个通用测试函数执行，
+任何声明了 ``scenario`` 参数的测试函数都会被自动参数化。
+"""
+import itertools
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pytest
+
+from common.allure_util import get_allure, step
+from common.data_loader import DataLoader
+from common.data_validator import DataValidator
+from common.exceptions import TestDataError
+from common.freeze_util import thaw
+from common.logger import Logger
+
+logger = Logger().get_logger()
+
+DEFAULT_SCENARIO_DIR = "data/scenarios"
+
+
+class Scenario:
+    """展开后的单个场景用例"""
+
+    __slots__ = ("id", "name", "source", "request", "expected", "marks", "story")
+
+    def __init__(self, id: str, name: str, source: str, request: Dict[str, Any],
+                 expected: Dict[str, Any], marks: Tuple[str, ...] = (), story: Optional[str] = None):
+        self.id = id
+        self.name = name
+        self.source = source
+        self.request = request
+        self.expected = expected
+        self.marks = marks
+        self.story = story
+
+    def __repr__(self) -> str:
+        return f"Scenario({self.id})"
+
+
+def _merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    """深度合并两个字典，override 优先"""
+    result = thaw(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = _merge(result[key], value)
+        else:
+            result[key] = thaw(value)
+    return result
+
+
+def _set_path(data: Dict[str, Any], path: str, value: Any) -> None:
+    """按点分路径设置值，如 path.contract_id"""
+    keys = path.split(".")
+    for key in keys[:-1]:
+        data = data.setdefault(key, {})
+    data[keys[-1]] = thaw(value)
+
+
+def _matrix_cases(values: Any) -> List[Tuple[str, Any]]:
+    """matrix 取值：字典按键命名，列表中的标量以值命名，其余以序号命名"""
+    if isinstance(values, dict):
+        return [(str(name), value) for name, value in values.items()]
+    if isinstance(values, (list, tuple)):
+        return [(str(value) if isinstance(value, (str, int, float, bool)) else str(index), value)
+                for index, value in enumerate(values)]
+    return [(str(values), values)]
+
+
+def expand_scenarios(spec: Dict[str, Any], source: str) -> Iterator[Scenario]:
+    """将场景文件展开为用例"""
+    defaults = spec.get("defaults") or {}
+    for index, raw in enumerate(spec.get("scenarios") or []):
+        definition = _merge(defaults, raw)
+        name = definition.get("name", f"scenario_{index}")
+        scenario_id = definition.get("id", name)
+        if "request" not in definition:
+            raise TestDataError(f"场景缺少 request 定义: {name}", data_file=source)
+
+        matrix = definition.get("matrix") or {}
+        axes = [[(path, case_id, value) for case_id, value in _matrix_cases(values)]
+                for path, values in matrix.items()]
+        for combination in itertools.product(*axes):
+            request = thaw(definition["request"])
+            for path, _, value in combination:
+                _set_path(request, path, value)
+            case_ids = [case_id for _, case_id, _ in combination]
+            yield Scenario(
+                id="-".join([scenario_id] + case_ids),
+                name=name,
+                source=source,
+                request=request,
+                expected=definition.get("expected") or {},
+                marks=tuple(definition.get("marks") or ()),
+                story=definition.get("story"),
+            )
+
+
+def load_scenarios(scenario_dir: Path, loader: Optional[DataLoader] = None) -> List[Scenario]:
+    """加载目录下所有场景文件（按文件名排序，保证用例顺序稳定）"""
+    loader = loader or DataLoader()
+    scenarios = []
+    for scenario_file in sorted(scenario_dir.glob("*.yaml")):
+        spec = loader.load(str(scenario_file))
+        scenarios.extend(expand_scenarios(spec, scenario_file.name))
+    return scenarios
+
+
+@step("执行数据驱动场景")
+def run_scenario(req, headers: Dict[str, str], scenario: Scenario):
+    """发送场景请求并按 expected 校验状态码、响应结构、业务规则和响应时间"""
+    allure = get_allure()
+    if scenario.story:
+        allure.dynamic.story(scenario.story)
+    allure.dynamic.title(scenario.id)
+
+    request = scenario.request
+    url = request["url"].format(**request.get("path", {}))
+    kwargs = {"headers": {**headers, **request.get("headers", {})}}
+    for key in ("params", "json", "data"):
+        if key in request:
+            kwargs[key] = request[key]
+
+    logger.info(f"执行场景: {scenario.id} ({scenario.source})")
+    response = req.send_request(request.get("method", "GET").upper(), url, **kwargs)
+
+    expected = scenario.expected
+    expected_status = expected.get("status_code")
+    if expected_status is not None:
+        assert response.status_code == expected_status, \
+            f"场景{scenario.id}期望状态码{expected_status}，实际状态码{response.status_code}"
+
+    if expected.get("schema") or expected.get("business_rules"):
+        validator = DataValidator(response)
+        if expected.get("schema"):
+            validator.validate_schema(expected["schema"])
+        if expected.get("business_rules"):
+            validator.validate_business_rules(expected["business_rules"])
+
+    budget_ms = expected.get("max_response_time_ms")
+    if budget_ms is not None:
+        elapsed_ms = response.elapsed.total_seconds() * 1000
+        assert elapsed_ms <= budget_ms, \
+            f"场景{scenario.id}响应时间{elapsed_ms:.0f}ms超过性能预算{budget_ms}ms"
+    return response
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--scenario-dir",
+        action="store",
+        default=DEFAULT_SCENARIO_DIR,
+        help=f"数据驱动场景文件目录（默认: {DEFAULT_SCENARIO_DIR}）",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "scenario: 由YAML场景文件生成的数据驱动用例")
+
+
+def pytest_generate_tests(metafunc):
+    """为声明了 scenario 参数的测试函数生成场景用例"""
+    if "scenario" not in metafunc.fixturenames:
+        return
+
+    scenario_dir = Path(metafunc.config.getoption("--scenario-dir"))
+    if not scenario_dir.is_absolute():
+        scenario_dir = Path(metafunc.config.rootpath) / scenario_dir
+    scenarios = load_scenarios(scenario_dir) if scenario_dir.is_dir() else []
+    logger.info(f"从 {scenario_dir} 生成数据驱动用例: {len(scenarios)}个")
+
+    metafunc.parametrize(
+        "scenario",
+        [pytest.param(scenario, id=scenario.id, marks=[getattr(pytest.mark, mark) for mark in scenario.marks])
+         for scenario in scenarios],
+    )
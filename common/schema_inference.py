@@ -0,0 +1,252 @@
+"""
+响应结构推断 - 从录制的响应中推断每个接口的数据结构，生成 DataValidator 可直接使用的YAML
+
+录制：``pytest --record-responses data/recorded`` 将每个JSON响应按行追加到
+``data/recorded/responses_<worker>.jsonl``（见 schema_plugin）。
+
+推断::
+
+    python -m common.schema_inference data/recorded/*.jsonl -o data/schemas/inferred.yaml
+    python -m common.schema_inference data/recorded/*.jsonl --endpoint "GET /rpm-api/contract/list"
+
+样本逐行读取、逐个合并到按字段路径组织的统计树中，内存占用只与字段数有关，与样本数无关。
+生成的结构与 DataValidator.validate_schema 的格式一致：
+- ``data.items[*].status: str`` —— 列表中每个元素都有该字段
+- ``data.remark?: str`` —— 部分样本中缺少该字段
+- ``data.owner: [dict, null]`` —— 出现过多种类型（整数与小数合并为 number）
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from common.logger import Logger
+
+logger = Logger().get_logger()
+
+# JSON值类型到 DataValidator.TYPE_NAMES 中类型名称的映射，顺序即输出顺序
+TYPE_NAMES = {dict: "dict", list: "list", str: "str", int: "int", float: "float", bool: "bool", type(None): "null"}
+_TYPE_ORDER = {name: index for index, name in enumerate(TYPE_NAMES.values())}
+DEFAULT_MAX_FIELDS = 500
+
+
+class FieldStats:
+    """单个字段路径的统计：出现次数、各类型出现次数、子字段"""
+
+    __slots__ = ("count", "types", "children", "items")
+
+    def __init__(self):
+        self.count = 0
+        self.types: Dict[str, int] = {}
+        self.children: Dict[str, "FieldStats"] = {}
+        # 列表元素（[*]）的统计
+        self.items: Optional["FieldStats"] = None
+
+
+class SchemaBuilder:
+    """流式合并同一接口的多个响应样本"""
+
+    def __init__(self, max_fields: int = DEFAULT_MAX_FIELDS):
+        self.root = FieldStats()
+        self.max_fields = max_fields
+        self.fields = 0
+        # 超过字段数上限被丢弃的字段（通常是以ID等动态值为键的字典）
+        self.dropped = 0
+
+    @property
+    def samples(self) -> int:
+        return self.root.count
+
+    def _child(self, parent: FieldStats, key: Optional[str]) -> Optional[FieldStats]:
+        if self.fields >= self.max_fields:
+            self.dropped += 1
+            return None
+        self.fields += 1
+        node = FieldStats()
+        if key is None:
+            parent.items = node
+        else:
+            parent.children[key] = node
+        return node
+
+    def observe(self, sample: Any) -> None:
+        """合并一个样本"""
+        stack = [(self.root, sample)]
+        while stack:
+            node, value = stack.pop()
+            node.count += 1
+            type_name = TYPE_NAMES.get(type(value), "str")
+            node.types[type_name] = node.types.get(type_name, 0) + 1
+            if type_name == "dict":
+                children = node.children
+                for key, child_value in value.items():
+                    child = children.get(key) or self._child(node, key)
+                    if child is not None:
+                        stack.append((child, child_value))
+            elif type_name == "list" and value:
+                items = node.items or self._child(node, None)
+                if items is not None:
+                    stack.extend((items, item) for item in value)
+
+    def schema(self) -> Dict[str, Any]:
+        """生成 {字段路径: 类型} 形式的结构，字段按首次出现的顺序排列
+
+        可选字段判断与 DataValidator 一致：字段出现次数少于所在上下文（最近的 [*] 元素或整个响应）的次数时，
+        路径以 ? 结尾。
+        """
+        result: Dict[str, Any] = {}
+        self._emit(self.root, "", self.root, result)
+        return result
+
+    def _emit(self, node: FieldStats, path: str, context: FieldStats, result: Dict[str, Any]) -> None:
+        for key, child in node.children.items():
+            child_path = f"{path}.{key}" if path else key
+            result[child_path + ("?" if child.count < context.count else "")] = _type_spec(child.types)
+            self._emit(child, child_path, context, result)
+        items = node.items
+        if items is not None:
+            items_path = f"{path}[*]"
+            # 元素全部为字典且有子字段时，元素类型由子字段体现，不单独输出
+            if not (items.children and set(items.types) == {"dict"}):
+                result[items_path] = _type_spec(items.types)
+            self._emit(items, items_path, items, result)
+
+
+def _type_spec(types: Dict[str, int]) -> Any:
+    names = set(types)
+    if {"int", "float"} <= names:
+        # 数值字段同时出现整数和小数时合并为 number
+        names -= {"int", "float"}
+        names.add("number")
+    ordered = sorted(names, key=lambda name: _TYPE_ORDER.get(name, len(_TYPE_ORDER)))
+    return ordered[0] if len(ordered) == 1 else ordered
+
+
+class SchemaInferrer:
+    """按接口分组推断结构"""
+
+    def __init__(self, max_fields: int = DEFAULT_MAX_FIELDS, include_errors: bool = False):
+        self.max_fields = max_fields
+        self.include_errors = include_errors
+        self.builders: Dict[str, SchemaBuilder] = {}
+        self.skipped = 0
+
+    def add(self, endpoint: str, body: Any, status_code: int = 200) -> None:
+        """合并一个响应；默认只使用2xx响应，错误响应的结构通常与正常响应不同"""
+        if not self.include_errors and not 200 <= status_code < 300:
+            self.skipped += 1
+            return
+        builder = self.builders.get(endpoint)
+        if builder is None:
+            builder = self.builders[endpoint] = SchemaBuilder(self.max_fields)
+        builder.observe(body)
+
+    def add_records(self, records: Iterable[Dict[str, Any]]) -> "SchemaInferrer":
+        for record in records:
+            self.add(record["endpoint"], record.get("body"), record.get("status_code", 200))
+        return self
+
+    def schemas(self, endpoint: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """{接口: {"samples": 样本数, "schema": 结构}}"""
+        return {name: {"samples": builder.samples, "schema": builder.schema()}
+                for name, builder in sorted(self.builders.items())
+                if endpoint is None or name == endpoint}
+
+    def to_yaml(self, endpoint: Optional[str] = None) -> str:
+        """生成YAML，每个接口的 schema 可直接复制到测试数据的 expected_response.schema 中"""
+        import yaml
+
+        class _Dumper(yaml.SafeDumper):
+            pass
+
+        # 多类型写成 [str, 'null'] 形式，字段映射保持逐行
+        _Dumper.add_representer(list, lambda dumper, data: dumper.represent_sequence(
+            "tag:yaml.org,2002:seq", data, flow_style=True))
+        blocks = []
+        for name, info in self.schemas(endpoint).items():
+            builder = self.builders[name]
+            header = f"# {name}（{info['samples']} 个样本"
+            header += f"，{builder.dropped} 个字段超过上限未记录）" if builder.dropped else "）"
+            body = yaml.dump({name: {"schema": info["schema"]}}, Dumper=_Dumper, allow_unicode=True,
+                             sort_keys=False, default_flow_style=False)
+            blocks.append(f"{header}\n{body}")
+        return "\n".join(blocks)
+
+
+def read_records(paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """逐行读取录制文件（支持 .jsonl 与 .jsonl.gz），跳过无法解析的行"""
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    logger.warning(f"跳过无法解析的录制行: {path}:{line_no}")
+                    continue
+                if isinstance(record, dict) and "endpoint" in record:
+                    yield record
+
+
+class ResponseRecorder:
+    """after_response 钩子：将JSON响应按行追加到录制文件"""
+
+    def __init__(self, directory: str):
+        worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"responses_{worker}.jsonl")
+        self.count = 0
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def __call__(self, context) -> None:
+        response = context.response
+        if response is None or context.kwargs.get("stream"):
+            return
+        if "json" not in response.headers.get("Content-Type", "").lower():
+            return
+        try:
+            body = response.json()
+        except ValueError:
+            return
+        line = json.dumps({"endpoint": context.endpoint, "status_code": response.status_code, "body": body},
+                          ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self.count += 1
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="从录制的响应推断接口数据结构")
+    parser.add_argument("record_files", nargs="+", help="录制文件（pytest --record-responses 生成）")
+    parser.add_argument("-o", "--output", help="输出YAML文件，默认输出到标准输出")
+    parser.add_argument("--endpoint", help="只输出指定接口，如 \"GET /rpm-api/contract/list\"")
+    parser.add_argument("--include-errors", action="store_true", help="同时使用非2xx响应")
+    parser.add_argument("--max-fields", type=int, default=DEFAULT_MAX_FIELDS,
+                        help=f"每个接口最多记录的字段数（默认: {DEFAULT_MAX_FIELDS}）")
+    args = parser.parse_args(argv)
+
+    inferrer = SchemaInferrer(args.max_fields, args.include_errors).add_records(read_records(args.record_files))
+    schemas = inferrer.schemas(args.endpoint)
+    if not schemas:
+        print("没有可用的响应样本", file=sys.stderr)
+        return 1
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(inferrer.to_yaml(args.endpoint))
+        print(f"已生成 {len(schemas)} 个接口的结构: {args.output}")
+    else:
+        print(inferrer.to_yaml(args.endpoint), end="")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
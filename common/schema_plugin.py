@@ -0,0 +1,34 @@
+"""
+响应录制插件 - ``pytest --record-responses <目录>`` 录制所有JSON响应，供 schema_inference 推断接口结构
+"""
+from common.logger import Logger
+from common.request_hooks import global_hooks
+from common.schema_inference import ResponseRecorder
+
+logger = Logger().get_logger()
+
+_recorder = None
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("schema", "响应结构推断")
+    group.addoption("--record-responses", action="store", default=None, metavar="DIR",
+                    help="将JSON响应追加录制到 DIR/responses_<worker>.jsonl")
+
+
+def pytest_configure(config):
+    global _recorder
+    directory = config.getoption("--record-responses")
+    if directory:
+        _recorder = ResponseRecorder(directory)
+        global_hooks.add("after_response", _recorder)
+        logger.info(f"已开启响应录制: {_recorder.path}")
+
+
+def pytest_unconfigure(config):
+    global _recorder
+    if _recorder is not None:
+        global_hooks.remove("after_response", _recorder)
+        _recorder.close()
+        logger.info(f"响应录制完成: {_recorder.path}, 共 {_recorder.count} 条")
+        _recorder = None
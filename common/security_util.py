@@ -4,6 +4,9 @@
 import re
 import json
 import hashlib
+import itertools
+import os
+import time
 from typing import Any, Dict, List, Union, Optional
 
 class SecurityUtil:
@@ -104,11 +107,13 @@ class SecurityUtil:
         else:
             return str_value[:2] + "***" + str_value[-2:]
     
+    _request_counter = itertools.count()
+    
     @classmethod
     def generate_request_id(cls, method: str, url: str) -> str:
-        """生成请求ID用于日志追踪"""
-        content = f"{method}:{url}:{hash(str(time.time()))}"
-        return hashlib.md5(content.encode()).hexdigest()[:8]
+        """生成请求ID用于日志追踪（同一毫秒内、多个worker并行时也不重复）"""
+        content = f"{method}:{url}:{time.time_ns()}:{os.getpid()}:{next(cls._request_counter)}"
+        return hashlib.md5(content.encode()).hexdigest()[:16]
     
     @classmethod
     def validate_config_security(cls, config: Dict[str, Any]) -> List[str]:
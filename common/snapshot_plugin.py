@@ -0,0 +1,119 @@
+"""
+快照插件 - 提供 ``snapshot`` fixture，将响应与 data/snapshots 下保存的基线快照对比
+
+    def test_project_detail_snapshot(req, headers, snapshot):
+        response = ProjectAPI(req).get_project_by_id(1, headers)
+        snapshot.assert_match(response, ignore=["**.*_time", "**.update*"])
+
+- 只对用例集本身不会修改的数据做快照（如固定的详情），用例会新增记录的列表每次执行都会变化
+- 快照不存在时自动生成并通过（设置了 CI 环境变量时跳过并在会话结束时列出，避免流水线中悄悄生成基线）
+- 与快照不一致时失败，差异附加到allure报告；``pytest --snapshot-update`` 用当前响应覆盖快照
+"""
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+import pytest
+
+from common.allure_util import attach
+from common.logger import Logger
+from common.snapshot_util import SnapshotDiffer, SnapshotStore, format_changes
+
+logger = Logger().get_logger()
+
+DEFAULT_SNAPSHOT_DIR = "data/snapshots"
+_written: List[str] = []
+_missing: List[str] = []
+
+
+class SnapshotAssertion:
+    """单个用例的快照断言"""
+
+    def __init__(self, store: SnapshotStore, base_name: str, update: bool, ci: bool):
+        self.store = store
+        self.base_name = base_name
+        self.update = update
+        self.ci = ci
+        self._count = 0
+
+    def _name(self, name: Optional[str]) -> str:
+        self._count += 1
+        if name:
+            return f"{self.base_name.rsplit('/', 1)[0]}/{name}"
+        return self.base_name if self._count == 1 else f"{self.base_name}_{self._count}"
+
+    def assert_match(self, data: Any, name: Optional[str] = None, ignore: Iterable[str] = (),
+                     unordered: Iterable[str] = (), key_by: Optional[Dict[str, str]] = None) -> None:
+        """与快照对比，data 可以是响应对象或已解析的JSON
+
+        Args:
+            name: 快照名称，默认为 <模块>/<用例名>，同一用例多次断言时自动加序号
+            ignore / unordered / key_by: 见 SnapshotDiffer
+        """
+        if hasattr(data, "json") and callable(data.json):
+            data = data.json()
+        differ = SnapshotDiffer(ignore=ignore, unordered=unordered, key_by=key_by)
+        snapshot_name = self._name(name)
+        normalized = differ.normalize(data)
+
+        if not self.store.exists(snapshot_name):
+            if self.ci and not self.update:
+                _missing.append(str(self.store.path(snapshot_name)))
+                pytest.skip(f"快照不存在: {self.store.path(snapshot_name)}，请在本地使用 --snapshot-update 生成后提交")
+            self._write(snapshot_name, normalized, "生成")
+            return
+
+        changes = differ.diff(self.store.load(snapshot_name), normalized)
+        if not changes:
+            return
+        if self.update:
+            self._write(snapshot_name, normalized, "更新")
+            return
+        report = format_changes(changes)
+        attach(report, name=f"快照差异: {snapshot_name}", attachment_type="TEXT")
+        pytest.fail(f"与快照 {snapshot_name} 不一致（{len(changes)}处差异，--snapshot-update 可更新快照）:\n{report}",
+                    pytrace=False)
+
+    def _write(self, snapshot_name: str, data: Any, action: str) -> None:
+        if self.store.save(snapshot_name, data):
+            _written.append(f"{action}: {self.store.path(snapshot_name)}")
+            logger.info(f"已{action}快照: {self.store.path(snapshot_name)}")
+
+
+def _base_name(item) -> str:
+    module = item.module.__name__.rsplit(".", 1)[-1] if getattr(item, "module", None) else "snapshots"
+    return f"{module}/{re.sub(r'[^0-9A-Za-z_.-]+', '_', item.name).strip('_')}"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("snapshot", "响应快照")
+    group.addoption("--snapshot-update", action="store_true", default=False,
+                    help="用当前响应生成或覆盖快照")
+    group.addoption("--snapshot-dir", action="store", default=DEFAULT_SNAPSHOT_DIR,
+                    help=f"快照目录（默认: {DEFAULT_SNAPSHOT_DIR}）")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "snapshot: 响应快照回归用例（-m \"not snapshot\" 可排除）")
+
+
+@pytest.fixture
+def snapshot(request):
+    """响应快照断言，见 SnapshotAssertion.assert_match"""
+    config = request.config
+    return SnapshotAssertion(SnapshotStore(config.getoption("--snapshot-dir")), _base_name(request.node),
+                             update=config.getoption("--snapshot-update"), ci=bool(os.environ.get("CI")))
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if getattr(config, "workeroutput", None) is not None:
+        return
+    if _written:
+        terminalreporter.write_sep("=", f"快照写入 {len(_written)} 个")
+        for line in _written:
+            terminalreporter.write_line(line)
+    if _missing:
+        terminalreporter.write_sep("=", f"缺少快照 {len(_missing)} 个（已跳过，需在本地 --snapshot-update 生成后提交）",
+                                   yellow=True)
+        for path in _missing:
+            terminalreporter.write_line(path)
@@ -0,0 +1,397 @@
+"""
+快照对比 - 将完整响应与保存的基线快照做结构化对比
+
+- 忽略规则：按路径模式（data[*].id、**.*_time）屏蔽时间戳、ID等每次都会变化的字段
+- 结构化对比：先比较子树哈希，未变化的分支直接跳过；列表可按顺序对齐（插入/删除只报告变化的元素），
+  也可按无序集合或按某个字段（如 id）匹配
+- 快照以规范化JSON（键排序、无空白）gzip压缩后保存，内容不变时不重写文件
+"""
+import difflib
+import fnmatch
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+from common.path_util import WILDCARD, parse_path
+
+IGNORED = "<ignored>"
+DEEP_WILDCARD = "**"
+_GLOB_CHARS = frozenset("*?[")
+
+
+class PathPattern:
+    """路径模式：``*`` 或 ``[*]`` 匹配任意一个键/下标，``**`` 匹配任意多层，键名支持通配（如 ``*_time``）
+
+    匹配过程是对模式做NFA状态推进，遍历数据树时可逐层传递状态（advance），
+    某个子树上没有存活状态时整棵子树都不需要再检查。
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[Tuple[str, ...]] = []
+        for pattern in patterns:
+            segments = []
+            for part in pattern.split("."):
+                if part == DEEP_WILDCARD:
+                    segments.append(DEEP_WILDCARD)
+                else:
+                    segments.extend(str(token) for token in parse_path(part))
+            self.patterns.append(tuple(segments))
+        self._cache: Dict[Tuple[FrozenSet[Tuple[int, int]], Any], FrozenSet[Tuple[int, int]]] = {}
+        self._sensitive: Dict[FrozenSet[Tuple[int, int]], bool] = {}
+        self._accepted: Dict[FrozenSet[Tuple[int, int]], bool] = {}
+        self.initial = self._closure({(index, 0) for index in range(len(self.patterns))})
+
+    def __bool__(self) -> bool:
+        return bool(self.patterns)
+
+    def _closure(self, states) -> FrozenSet[Tuple[int, int]]:
+        result = set(states)
+        pending = list(states)
+        while pending:
+            index, position = pending.pop()
+            pattern = self.patterns[index]
+            if position < len(pattern) and pattern[position] == DEEP_WILDCARD and (index, position + 1) not in result:
+                result.add((index, position + 1))
+                pending.append((index, position + 1))
+        return frozenset(result)
+
+    @staticmethod
+    def _segment_matches(segment: str, token: Any) -> bool:
+        if segment == WILDCARD:
+            return True
+        token = str(token)
+        if _GLOB_CHARS.isdisjoint(segment):
+            return segment == token
+        return fnmatch.fnmatchcase(token, segment)
+
+    def advance(self, states: FrozenSet[Tuple[int, int]], token: Any) -> FrozenSet[Tuple[int, int]]:
+        """读入一层键/下标后的状态（结果按 (状态, 键) 缓存，遍历大列表时每层只计算一次）"""
+        if isinstance(token, int) and not self.index_sensitive(states):
+            token = WILDCARD
+        cache_key = (states, token)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+        following = set()
+        for index, position in states:
+            pattern = self.patterns[index]
+            if position >= len(pattern):
+                continue
+            segment = pattern[position]
+            if segment == DEEP_WILDCARD:
+                following.add((index, position))
+            elif self._segment_matches(segment, token):
+                following.add((index, position + 1))
+        result = self._closure(following) if following else frozenset()
+        self._cache[cache_key] = result
+        return result
+
+    def index_sensitive(self, states: FrozenSet[Tuple[int, int]]) -> bool:
+        """当前状态下是否有模式段可能只匹配部分下标（否则列表所有元素的推进结果相同）"""
+        sensitive = self._sensitive.get(states)
+        if sensitive is None:
+            sensitive = self._sensitive[states] = any(
+                self._index_segment(self.patterns[index][position])
+                for index, position in states if position < len(self.patterns[index]))
+        return sensitive
+
+    @staticmethod
+    def _index_segment(segment: str) -> bool:
+        if segment in (WILDCARD, DEEP_WILDCARD):
+            return False
+        if segment.lstrip("-").isdigit():
+            return True
+        # 只含数字和通配符的模式（如 1*、?）可能只匹配部分下标
+        return not _GLOB_CHARS.isdisjoint(segment) and all(c.isdigit() or c in "*?[]!-" for c in segment)
+
+    def accepts(self, states: FrozenSet[Tuple[int, int]]) -> bool:
+        accepted = self._accepted.get(states)
+        if accepted is None:
+            accepted = self._accepted[states] = any(position == len(self.patterns[index]) for index, position in states)
+        return accepted
+
+    def matches(self, path: Tuple[Any, ...]) -> bool:
+        states = self.initial
+        for token in path:
+            states = self.advance(states, token)
+            if not states:
+                return False
+        return self.accepts(states)
+
+
+def apply_ignore(data: Any, ignore: PathPattern) -> Any:
+    """将忽略路径上的值替换为 IGNORED，没有命中规则的子树原样共享不复制"""
+    if not ignore:
+        return data
+
+    def walk(value: Any, states) -> Any:
+        if isinstance(value, dict):
+            result = {}
+            for key, child in value.items():
+                child_states = ignore.advance(states, key)
+                if not child_states:
+                    result[key] = child
+                elif ignore.accepts(child_states):
+                    result[key] = IGNORED
+                else:
+                    result[key] = walk(child, child_states) if isinstance(child, (dict, list)) else child
+            return result
+        if isinstance(value, list):
+            if not ignore.index_sensitive(states):
+                # 所有元素的状态相同，只需计算一次；标量元素原样保留
+                child_states = ignore.advance(states, 0)
+                if not child_states:
+                    return value
+                if ignore.accepts(child_states):
+                    return [IGNORED] * len(value)
+                return [walk(child, child_states) if isinstance(child, (dict, list)) else child for child in value]
+            result = []
+            for index, child in enumerate(value):
+                child_states = ignore.advance(states, index)
+                if not child_states:
+                    result.append(child)
+                elif ignore.accepts(child_states):
+                    result.append(IGNORED)
+                else:
+                    result.append(walk(child, child_states) if isinstance(child, (dict, list)) else child)
+            return result
+        return value
+
+    if ignore.accepts(ignore.initial):
+        return IGNORED
+    return walk(data, ignore.initial)
+
+
+class SubtreeHasher:
+    """子树哈希（Merkle树），同一次对比中按对象id缓存，每个容器节点只计算一次
+
+    容器的哈希由子容器的哈希和标量子节点的 repr 组成，标量部分整体交给C实现的 repr，
+    避免逐个标量在Python中计算。repr 区分 1 / 1.0 / True，不会把类型变化当作相等。
+    """
+
+    def __init__(self):
+        self._memo: Dict[int, bytes] = {}
+        # 持有被缓存的对象，避免对象被回收后id复用
+        self._keep: List[Any] = []
+
+    def digest(self, value: Any) -> bytes:
+        if not isinstance(value, (dict, list)):
+            return hashlib.blake2b(repr(value).encode(), digest_size=16).digest()
+        cached = self._memo.get(id(value))
+        if cached is not None:
+            return cached
+        h = hashlib.blake2b(digest_size=16)
+        if isinstance(value, dict):
+            scalars = []
+            children = []
+            for item in sorted(value.items()):
+                (children if isinstance(item[1], (dict, list)) else scalars).append(item)
+            h.update(b"{" + repr(scalars).encode())
+            for key, child in children:
+                h.update(repr(key).encode())
+                h.update(self.digest(child))
+        else:
+            types = set(map(type, value))
+            if dict in types or list in types:
+                h.update(b"[")
+                for item in value:
+                    h.update(self.digest(item))
+            else:
+                h.update(b"[=" + repr(value).encode())
+        result = h.digest()
+        self._memo[id(value)] = result
+        self._keep.append(value)
+        return result
+
+
+class Change(NamedTuple):
+    """一处差异：kind 为 changed（值或类型变化）/ added（新增）/ removed（缺失）"""
+    kind: str
+    path: str
+    expected: Any = None
+    actual: Any = None
+
+
+def _child_path(path: str, token: Any) -> str:
+    if isinstance(token, int):
+        return f"{path}[{token}]"
+    return f"{path}.{token}" if path else str(token)
+
+
+class SnapshotDiffer:
+    """结构化对比
+
+    Args:
+        ignore: 忽略的路径模式，如 ["data[*].id", "**.created_time", "**.*_at"]
+        unordered: 按无序集合比较的列表路径，如 ["data"]、["data.records"]
+        key_by: 按字段匹配的列表 {列表路径: 字段名}，如 {"data": "id"}（同样视为无序），
+            匹配上的元素继续逐字段对比，差异路径显示为 data[id=3].amount
+    """
+
+    def __init__(self, ignore: Iterable[str] = (), unordered: Iterable[str] = (),
+                 key_by: Optional[Dict[str, str]] = None):
+        self.ignore = PathPattern(ignore)
+        self.unordered = PathPattern(unordered)
+        self.key_by = [(PathPattern([pattern]), field) for pattern, field in (key_by or {}).items()]
+
+    def normalize(self, data: Any) -> Any:
+        return apply_ignore(data, self.ignore)
+
+    def diff(self, expected: Any, actual: Any) -> List[Change]:
+        changes: List[Change] = []
+        self._hasher = SubtreeHasher()
+        try:
+            self._diff(self.normalize(expected), self.normalize(actual), "", (), changes)
+        finally:
+            self._hasher = None
+        return changes
+
+    def _list_key(self, tokens: Tuple[Any, ...]) -> Optional[str]:
+        for pattern, field in self.key_by:
+            if pattern.matches(tokens):
+                return field
+        return None
+
+    def _diff(self, expected: Any, actual: Any, path: str, tokens: Tuple[Any, ...], changes: List[Change]) -> None:
+        if expected is actual:
+            return
+        hasher = self._hasher
+        if type(expected) is not type(actual) or not isinstance(expected, (dict, list)):
+            if type(expected) is not type(actual) or expected != actual:
+                changes.append(Change("changed", path, expected, actual))
+            return
+        if hasher.digest(expected) == hasher.digest(actual):
+            return
+        if isinstance(expected, dict):
+            for key in expected:
+                if key not in actual:
+                    changes.append(Change("removed", _child_path(path, key), expected=expected[key]))
+                else:
+                    self._diff(expected[key], actual[key], _child_path(path, key), tokens + (str(key),), changes)
+            for key in actual:
+                if key not in expected:
+                    changes.append(Change("added", _child_path(path, key), actual=actual[key]))
+            return
+        key_field = self._list_key(tokens)
+        if key_field is not None or self.unordered.matches(tokens):
+            self._diff_unordered(expected, actual, path, tokens, changes, key_field)
+        else:
+            self._diff_ordered(expected, actual, path, tokens, changes)
+
+    def _diff_ordered(self, expected: list, actual: list, path: str, tokens, changes: List[Change]) -> None:
+        # 按子树哈希对齐，中间插入/删除的元素不会导致后续元素全部错位
+        matcher = difflib.SequenceMatcher(None, [self._hasher.digest(item) for item in expected],
+                                          [self._hasher.digest(item) for item in actual], autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                continue
+            paired = min(i2 - i1, j2 - j1) if tag == "replace" else 0
+            for offset in range(paired):
+                self._diff(expected[i1 + offset], actual[j1 + offset], _child_path(path, j1 + offset),
+                           tokens + (str(j1 + offset),), changes)
+            for index in range(i1 + paired, i2):
+                changes.append(Change("removed", _child_path(path, index), expected=expected[index]))
+            for index in range(j1 + paired, j2):
+                changes.append(Change("added", _child_path(path, index), actual=actual[index]))
+
+    def _diff_unordered(self, expected: list, actual: list, path: str, tokens, changes: List[Change],
+                        key_field: Optional[str]) -> None:
+        digest = self._hasher.digest
+        remaining = Counter(digest(item) for item in actual)
+        missing = []
+        for item in expected:
+            item_digest = digest(item)
+            if remaining[item_digest]:
+                remaining[item_digest] -= 1
+            else:
+                missing.append(item)
+        extra = []
+        for item in actual:
+            item_digest = digest(item)
+            if remaining[item_digest]:
+                remaining[item_digest] -= 1
+                extra.append(item)
+
+        if key_field is not None:
+            by_key = {}
+            for item in extra:
+                if isinstance(item, dict) and key_field in item:
+                    by_key.setdefault(json.dumps(item[key_field], default=str), []).append(item)
+            unmatched = []
+            for item in missing:
+                candidates = by_key.get(json.dumps(item.get(key_field), default=str)) if isinstance(item, dict) else None
+                if candidates:
+                    other = candidates.pop(0)
+                    extra.remove(other)
+                    label = f"{path}[{key_field}={item[key_field]}]"
+                    self._diff(item, other, label, tokens + (WILDCARD,), changes)
+                else:
+                    unmatched.append(item)
+            missing = unmatched
+
+        for item in missing:
+            changes.append(Change("removed", f"{path}[?]", expected=item))
+        for item in extra:
+            changes.append(Change("added", f"{path}[?]", actual=item))
+
+
+def _short(value: Any, limit: int = 120) -> str:
+    text = json.dumps(value, ensure_ascii=False, default=str)
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def format_changes(changes: List[Change], limit: int = 50) -> str:
+    """差异的文本表示：~ 修改，- 缺失（快照中有），+ 新增（实际响应中有）"""
+    lines = []
+    for change in changes[:limit]:
+        if change.kind == "changed":
+            lines.append(f"~ {change.path}: {_short(change.expected)} -> {_short(change.actual)}")
+        elif change.kind == "removed":
+            lines.append(f"- {change.path}: {_short(change.expected)}")
+        else:
+            lines.append(f"+ {change.path}: {_short(change.actual)}")
+    if len(changes) > limit:
+        lines.append(f"... 共{len(changes)}处差异，仅显示前{limit}处")
+    return "\n".join(lines)
+
+
+class SnapshotStore:
+    """快照存储：<目录>/<名称>.json.gz，规范化JSON + gzip（mtime固定为0，相同内容字节相同）"""
+
+    SUFFIX = ".json.gz"
+
+    def __init__(self, directory: str = "data/snapshots"):
+        self.directory = Path(directory)
+
+    def path(self, name: str) -> Path:
+        return self.directory / f"{name}{self.SUFFIX}"
+
+    def exists(self, name: str) -> bool:
+        return self.path(name).exists()
+
+    def load(self, name: str) -> Any:
+        with gzip.open(self.path(name), "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def encode(data: Any) -> bytes:
+        text = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+        return gzip.compress(text.encode("utf-8"), compresslevel=9, mtime=0)
+
+    def save(self, name: str, data: Any) -> bool:
+        """保存快照，返回是否写入（内容未变化时不写）"""
+        path = self.path(name)
+        payload = self.encode(data)
+        if path.exists() and path.read_bytes() == payload:
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        return True
@@ -0,0 +1,351 @@
+"""
+浸泡测试插件 - 在指定时长内循环执行选中的用例，定期采样进程资源，检测内存和连接泄漏
+
+开启方式：``pytest --soak-duration 8h [--soak-interval 60] testcases/test_contract.py``
+
+- 会话级fixture（登录、RequestUtil会话、资源池）在各轮之间保持不变，与长时间运行的真实场景一致
+- 后台线程按间隔采样 RSS、打开的文件描述符数、socket数、线程数和 tracemalloc 跟踪的内存
+- 第一轮视为预热，之后的采样做线性拟合得到每小时增长量，超过阈值的指标标记为疑似泄漏
+- 会话结束时输出趋势表和内存增长最多的代码行，并写入 ``--soak-report``（默认 logs/soak_report.json）
+"""
+import json
+import os
+import re
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from common.config_manager import ConfigManager
+from common.logger import Logger
+
+logger = Logger().get_logger()
+
+DEFAULT_SOAK_REPORT = "logs/soak_report.json"
+METRICS = ("rss_mb", "fds", "sockets", "threads", "traced_mb")
+# 每小时增长超过阈值视为疑似泄漏，可通过配置 soak_leak_thresholds 覆盖
+DEFAULT_LEAK_THRESHOLDS = {"rss_mb": 20.0, "fds": 10.0, "sockets": 5.0, "threads": 2.0, "traced_mb": 10.0}
+_DURATION_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_duration(text: str) -> float:
+    """解析时长：90、90s、30m、8h、1d，返回秒数"""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*", str(text).lower())
+    if not match:
+        raise pytest.UsageError(f"无法解析时长: {text}（示例: 600、30m、8h）")
+    return float(match.group(1)) * _DURATION_UNITS[match.group(2)]
+
+
+def _proc_counts() -> Optional[Dict[str, float]]:
+    """通过 /proc 读取RSS、文件描述符和socket数（Linux）"""
+    try:
+        with open("/proc/self/statm") as f:
+            rss_pages = int(f.read().split()[1])
+        fds = os.listdir("/proc/self/fd")
+    except OSError:
+        return None
+    sockets = 0
+    for fd in fds:
+        try:
+            if os.readlink(f"/proc/self/fd/{fd}").startswith("socket:"):
+                sockets += 1
+        except OSError:
+            continue
+    return {"rss_mb": rss_pages * os.sysconf("SC_PAGE_SIZE") / 1048576, "fds": len(fds), "sockets": sockets}
+
+
+def _psutil_counts() -> Optional[Dict[str, float]]:
+    """没有 /proc 时（如macOS）使用psutil（可选依赖）"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    process = psutil.Process()
+    connections = getattr(process, "net_connections", None) or process.connections
+    fds = process.num_fds() if hasattr(process, "num_fds") else process.num_handles()
+    return {"rss_mb": process.memory_info().rss / 1048576, "fds": fds, "sockets": len(connections(kind="inet"))}
+
+
+def take_sample() -> Dict[str, Any]:
+    """采样一次进程资源，无法获取的指标为None"""
+    sample: Dict[str, Any] = dict.fromkeys(METRICS)
+    counts = _proc_counts() or _psutil_counts()
+    if counts:
+        sample.update(counts)
+    sample["threads"] = threading.active_count()
+    if tracemalloc.is_tracing():
+        sample["traced_mb"] = tracemalloc.get_traced_memory()[0] / 1048576
+    return sample
+
+
+def slope_per_hour(points: List[tuple]) -> Optional[float]:
+    """最小二乘拟合 (秒, 值) 序列，返回每小时变化量"""
+    if len(points) < 2:
+        return None
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if not variance:
+        return None
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    return covariance / variance * 3600
+
+
+class SoakMonitor:
+    """浸泡测试的资源采样与趋势分析"""
+
+    def __init__(self, duration: float, interval: float, thresholds: Dict[str, float],
+                 trace_memory: bool = True, root: Optional[Path] = None):
+        self.duration = duration
+        self.interval = interval
+        self.thresholds = thresholds
+        self.trace_memory = trace_memory
+        self.root = str(root or Path.cwd())
+        self.samples: List[Dict[str, Any]] = []
+        self.rounds: List[Dict[str, Any]] = []
+        self.warmup_end: Optional[float] = None
+        self._start = 0.0
+        self._round = 0
+        self._baseline_snapshot = None
+        self._top_growth: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start(1)
+        self._start = time.monotonic()
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name="soak-sampler", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> Dict[str, Any]:
+        sample = take_sample()
+        sample["elapsed_s"] = round(time.monotonic() - self._start, 3)
+        sample["round"] = self._round
+        with self._lock:
+            self.samples.append(sample)
+        logger.info(f"浸泡测试采样: {sample}")
+        return sample
+
+    def begin_round(self, round_no: int) -> None:
+        self._round = round_no
+        self.rounds.append({"round": round_no, "start_s": round(time.monotonic() - self._start, 3)})
+
+    def end_round(self, failed: int) -> None:
+        current = self.rounds[-1]
+        current["duration_s"] = round(time.monotonic() - self._start - current["start_s"], 3)
+        current["failed"] = failed
+        if current["round"] == 1:
+            # 第一轮完成后的状态作为基线（连接池、缓存、导入的模块都已就绪）
+            self.warmup_end = self.sample()["elapsed_s"]
+            if tracemalloc.is_tracing():
+                self._baseline_snapshot = self._snapshot()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.sample()
+        if self._baseline_snapshot is not None:
+            self._top_growth = self._compare(self._snapshot(), self._baseline_snapshot)
+            self._baseline_snapshot = None
+        if self.trace_memory:
+            tracemalloc.stop()
+
+    @staticmethod
+    def _snapshot():
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+
+    def _compare(self, snapshot, baseline, limit: int = 15) -> List[Dict[str, Any]]:
+        """与基线相比内存增长最多的代码行"""
+        growth = []
+        for stat in snapshot.compare_to(baseline, "lineno"):
+            if stat.size_diff <= 0:
+                continue
+            frame = stat.traceback[0]
+            filename = frame.filename
+            if filename.startswith(self.root):
+                filename = os.path.relpath(filename, self.root)
+            growth.append({"location": f"{filename}:{frame.lineno}", "size_diff_kb": round(stat.size_diff / 1024, 1),
+                           "count_diff": stat.count_diff})
+            if len(growth) >= limit:
+                break
+        return growth
+
+    def trends(self) -> Dict[str, Dict[str, Any]]:
+        """各指标预热后的起止值、每小时增长量，以及是否疑似泄漏"""
+        with self._lock:
+            samples = list(self.samples)
+        steady = [s for s in samples if self.warmup_end is None or s["elapsed_s"] >= self.warmup_end]
+        result = {}
+        for metric in METRICS:
+            points = [(s["elapsed_s"], s[metric]) for s in steady if s[metric] is not None]
+            if not points:
+                continue
+            slope = slope_per_hour(points)
+            growth = points[-1][1] - points[0][1]
+            threshold = self.thresholds.get(metric)
+            result[metric] = {
+                "start": round(points[0][1], 2),
+                "end": round(points[-1][1], 2),
+                "peak": round(max(value for _, value in points), 2),
+                "growth_per_hour": None if slope is None else round(slope, 2),
+                # 需要同时满足：拟合斜率超过阈值，且整体确实增长（排除抖动）
+                "leak_suspected": bool(slope is not None and threshold is not None
+                                       and slope > threshold and growth > 0),
+            }
+        return result
+
+    def build(self) -> Dict[str, Any]:
+        trends = self.trends()
+        return {
+            "duration_s": round(self.samples[-1]["elapsed_s"], 3) if self.samples else 0.0,
+            "rounds": len(self.rounds),
+            "failed": sum(r.get("failed", 0) for r in self.rounds),
+            "thresholds_per_hour": self.thresholds,
+            "trends": trends,
+            "suspected_leaks": [metric for metric, trend in trends.items() if trend["leak_suspected"]],
+            "top_memory_growth": self._top_growth,
+            "round_stats": self.rounds,
+            "samples": self.samples,
+        }
+
+
+def format_soak_report(data: Dict[str, Any]) -> List[str]:
+    lines = [f"运行时长: {data['duration_s']:.0f}s, 轮数: {data['rounds']}, 失败次数: {data['failed']}", ""]
+    lines.append(f"  {'指标':<10} {'起始':>10} {'结束':>10} {'峰值':>10} {'每小时增长':>12} {'阈值':>8}")
+    for metric, trend in data["trends"].items():
+        growth = "-" if trend["growth_per_hour"] is None else f"{trend['growth_per_hour']:.2f}"
+        threshold = data["thresholds_per_hour"].get(metric, "-")
+        flag = "  疑似泄漏" if trend["leak_suspected"] else ""
+        lines.append(f"  {metric:<10} {trend['start']:>10.2f} {trend['end']:>10.2f} {trend['peak']:>10.2f} "
+                     f"{growth:>12} {threshold:>8}{flag}")
+    if data["top_memory_growth"]:
+        lines.append("")
+        lines.append("预热后内存增长最多的代码行:")
+        for item in data["top_memory_growth"][:10]:
+            lines.append(f"  {item['size_diff_kb']:>10.1f} KB {item['count_diff']:>+8}  {item['location']}")
+    return lines
+
+
+_monitor_key = pytest.StashKey[SoakMonitor]()
+_report_key = pytest.StashKey[Dict[str, Any]]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("soak", "浸泡测试")
+    group.addoption("--soak-duration", action="store", default=None,
+                    help="循环执行选中的用例直到达到该时长，如 600、30m、8h（默认不开启）")
+    group.addoption("--soak-interval", action="store", default="60",
+                    help="资源采样间隔（默认: 60s）")
+    group.addoption("--soak-report", action="store", default=DEFAULT_SOAK_REPORT,
+                    help=f"浸泡测试报告JSON文件（默认: {DEFAULT_SOAK_REPORT}）")
+    group.addoption("--soak-no-tracemalloc", action="store_true", default=False,
+                    help="不使用tracemalloc跟踪内存分配（降低开销，但无法定位增长的代码行）")
+    group.addoption("--soak-strict", action="store_true", default=False,
+                    help="检测到疑似泄漏时以失败状态退出")
+
+
+def pytest_configure(config):
+    duration = config.getoption("--soak-duration")
+    if not duration or getattr(config, "workerinput", None) is not None:
+        return
+    if config.getoption("numprocesses", None):
+        raise pytest.UsageError("浸泡测试需要在单个进程内循环执行，不能与 -n 同时使用")
+    thresholds = dict(DEFAULT_LEAK_THRESHOLDS)
+    thresholds.update(ConfigManager().get("soak_leak_thresholds") or {})
+    config.stash[_monitor_key] = SoakMonitor(
+        duration=parse_duration(duration),
+        interval=parse_duration(config.getoption("--soak-interval")),
+        thresholds=thresholds,
+        trace_memory=not config.getoption("--soak-no-tracemalloc"),
+        root=config.rootpath,
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtestloop(session):
+    monitor = session.config.stash.get(_monitor_key, None)
+    if monitor is None or session.config.option.collectonly:
+        return None
+    if session.testsfailed and not session.config.option.continue_on_collection_errors:
+        raise session.Interrupted(f"{session.testsfailed} error{'s' if session.testsfailed != 1 else ''} during collection")
+
+    items = session.items
+    if not items:
+        return True
+    logger.info(f"开始浸泡测试: 时长 {monitor.duration:.0f}s, 用例数 {len(items)}, 采样间隔 {monitor.interval:.0f}s")
+    deadline = time.monotonic() + monitor.duration
+    monitor.start()
+    round_no = 0
+    try:
+        while True:
+            round_no += 1
+            monitor.begin_round(round_no)
+            failed_before = session.testsfailed
+            nextitem = None
+            for i, item in enumerate(items):
+                if round_no > 1:
+                    # 重新执行同一个用例前重建fixture请求（与pytest-rerunfailures相同）
+                    item._initrequest()
+                if i + 1 < len(items):
+                    nextitem = items[i + 1]
+                else:
+                    # 还要继续下一轮时，会话级和模块级fixture不做teardown
+                    nextitem = items[0] if time.monotonic() < deadline else None
+                item.config.hook.pytest_runtest_protocol(item=item, nextitem=nextitem)
+                if session.shouldfail:
+                    raise session.Failed(session.shouldfail)
+                if session.shouldstop:
+                    raise session.Interrupted(session.shouldstop)
+            monitor.end_round(session.testsfailed - failed_before)
+            logger.info(f"浸泡测试第{round_no}轮完成，累计失败: {session.testsfailed}")
+            if nextitem is None:
+                break
+    finally:
+        monitor.stop()
+        session.config.stash[_report_key] = monitor.build()
+    return True
+
+
+def pytest_sessionfinish(session, exitstatus):
+    data = session.config.stash.get(_report_key, None)
+    if data is None:
+        return
+    output = Path(session.config.getoption("--soak-report"))
+    try:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        logger.warning(f"写入浸泡测试报告失败: {output}, {str(e)}")
+    if data["suspected_leaks"]:
+        logger.warning(f"浸泡测试疑似泄漏: {data['suspected_leaks']}")
+        if session.config.getoption("--soak-strict") and session.exitstatus == pytest.ExitCode.OK:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    data = config.stash.get(_report_key, None)
+    if data is None:
+        return
+    terminalreporter.write_sep("=", "浸泡测试资源趋势")
+    for line in format_soak_report(data):
+        terminalreporter.write_line(line)
+    terminalreporter.write_line(f"浸泡测试报告已写入: {config.getoption('--soak-report')}")
+    if data["suspected_leaks"]:
+        terminalreporter.write_line(f"疑似泄漏: {', '.join(data['suspected_leaks'])}", red=True)
@@ -0,0 +1,156 @@
+"""
+软断言 - 对同一响应批量执行检查，汇总全部失败后只生成一个allure步骤、抛出一次断言错误
+
+    with SoftAssert(response, "创建合同响应校验") as soft:
+        soft.status_code(200)
+        soft.equal("code", "200")
+        soft.field_type("data.id", int)
+        soft.in_range("data.amount", 1, 10000000)
+        soft.column("data.items[*].status", allowed=["draft", "active"])
+"""
+import re
+from typing import Any, List, Optional, Tuple
+
+from common.allure_util import attach, get_allure
+from common.assert_util import check_column
+from common.logger import Logger
+from common.path_util import PathNotFound, extract_column, get_value
+
+logger = Logger().get_logger()
+
+_MISSING = object()
+
+
+class SoftAssert:
+    """软断言收集器
+
+    响应JSON只解析一次；每项检查的结果记录在内存中，退出 with 块时统一上报：
+    全部通过时写一个通过的allure步骤，有失败时写一个失败步骤（附检查明细）并抛出一条包含所有失败信息的 AssertionError。
+    with 块内抛出其他异常时，已记录的结果照常上报，原异常继续抛出。
+    """
+
+    def __init__(self, response=None, name: str = "软断言"):
+        self.response = response
+        self.name = name
+        self.results: List[Tuple[str, bool, str]] = []
+        self._json: Any = _MISSING
+
+    @property
+    def data(self) -> Any:
+        """解析后的响应JSON（只解析一次），也可直接传入已解析的数据"""
+        if self._json is _MISSING:
+            if self.response is None or isinstance(self.response, (dict, list)):
+                self._json = self.response
+            else:
+                self._json = self.response.json()
+        return self._json
+
+    @property
+    def failures(self) -> List[str]:
+        return [message for _, passed, message in self.results if not passed]
+
+    def check(self, condition: bool, description: str, message: Optional[str] = None) -> bool:
+        """记录一项检查，返回是否通过（便于后续检查依赖前面的结果）"""
+        passed = bool(condition)
+        self.results.append((description, passed, "" if passed else (message or description)))
+        return passed
+
+    def _value(self, path: str, description: str) -> Any:
+        try:
+            return get_value(self.data, path)
+        except PathNotFound as e:
+            self.check(False, description, str(e))
+            return _MISSING
+
+    def status_code(self, expected: int = 200) -> bool:
+        actual = self.response.status_code
+        return self.check(actual == expected, f"状态码为{expected}", f"期望状态码{expected}，实际状态码{actual}")
+
+    def equal(self, path: str, expected: Any) -> bool:
+        description = f"{path} == {expected!r}"
+        actual = self._value(path, description)
+        if actual is _MISSING:
+            return False
+        return self.check(actual == expected, description, f"字段{path}期望值为{expected!r}，实际值为{actual!r}")
+
+    def field_type(self, path: str, expected_type) -> bool:
+        description = f"{path} 类型为 {getattr(expected_type, '__name__', expected_type)}"
+        actual = self._value(path, description)
+        if actual is _MISSING:
+            return False
+        return self.check(isinstance(actual, expected_type), description,
+                          f"字段{path}期望类型{getattr(expected_type, '__name__', expected_type)}，"
+                          f"实际类型{type(actual).__name__}")
+
+    def in_range(self, path: str, min_value=None, max_value=None) -> bool:
+        description = f"{path} 在 [{min_value}, {max_value}] 范围内"
+        actual = self._value(path, description)
+        if actual is _MISSING:
+            return False
+        try:
+            passed = actual is not None and (min_value is None or actual >= min_value) and \
+                (max_value is None or actual <= max_value)
+        except TypeError:
+            passed = False
+        return self.check(passed, description, f"字段{path}值{actual!r}不在范围[{min_value}, {max_value}]内")
+
+    def contains(self, path: str, substring: str) -> bool:
+        description = f"{path} 包含 {substring!r}"
+        actual = self._value(path, description)
+        if actual is _MISSING:
+            return False
+        return self.check(substring in str(actual), description, f"字段{path}值{actual!r}不包含{substring!r}")
+
+    def regex(self, path: str, pattern: str) -> bool:
+        description = f"{path} 匹配 {pattern}"
+        actual = self._value(path, description)
+        if actual is _MISSING:
+            return False
+        return self.check(bool(re.match(pattern, str(actual))), description,
+                          f"字段{path}值{actual!r}不匹配正则{pattern!r}")
+
+    def exists(self, *paths: str) -> bool:
+        passed = True
+        for path in paths:
+            if self._value(path, f"{path} 存在") is _MISSING:
+                passed = False
+            else:
+                self.check(True, f"{path} 存在")
+        return passed
+
+    def column(self, path: str, not_empty: bool = False, **checks) -> bool:
+        """整列检查，参数同 AssertUtil.assert_column"""
+        description = f"{path} 整列检查 {checks}" if checks else f"{path} 整列检查"
+        try:
+            values = extract_column(self.data, path)
+        except PathNotFound as e:
+            return self.check(False, description, str(e))
+        errors = check_column(path, values, **checks)
+        if not_empty and not values:
+            errors.insert(0, f"{path} 为空列表")
+        return self.check(not errors, description, "; ".join(errors))
+
+    def summary(self) -> str:
+        lines = [f"{'通过' if passed else '失败'}  {description}" + ("" if passed else f"\n      {message}")
+                 for description, passed, message in self.results]
+        return "\n".join(lines)
+
+    def __enter__(self) -> "SoftAssert":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        failures = self.failures
+        passed = len(self.results) - len(failures)
+        title = f"{self.name}: {passed}/{len(self.results)} 项通过"
+        try:
+            with get_allure().step(title):
+                if self.results:
+                    attach(self.summary(), name=f"{self.name}明细", attachment_type="TEXT")
+                if failures and exc_type is None:
+                    raise AssertionError(f"{self.name}失败 {len(failures)} 项: " + "; ".join(failures))
+        finally:
+            if failures:
+                logger.error(f"{title}，失败项: {failures}")
+            else:
+                logger.info(title)
+        return False
@@ -0,0 +1,233 @@
+"""
+请求链路追踪 - 记录测试和请求各阶段的耗时span，导出OTLP JSON并生成火焰图摘要
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+def _new_id(size: int) -> str:
+    return os.urandom(size).hex()
+
+
+class Span:
+    """单个阶段的耗时记录"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "status")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.status = "OK"
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6 if self.end_ns else 0.0
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+
+class _NoopSpan:
+    """追踪关闭时使用的空span，避免调用方做判断"""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """轻量级追踪器
+
+    - span() 以上下文管理器记录一个阶段，嵌套的span自动成为子span（基于contextvars，线程安全）
+    - 没有父span时开启新的trace；未开启追踪时 span() 几乎无开销
+    - 内存中最多缓存 max_spans 个已结束的span：start_export() 后达到上限时将其他trace的span
+      批量追加写入导出文件，未开启导出时丢弃最早的trace，长时间运行（如浸泡测试）时内存占用固定
+    """
+
+    def __init__(self, service_name: str = "rpm_auto", max_spans: int = 65536):
+        self.service_name = service_name
+        self.enabled = False
+        self.max_spans = max_spans
+        self.dropped = 0
+        self._spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._output: Optional[Path] = None
+        self._exported = 0
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Any]:
+        if not self.enabled:
+            yield _NOOP_SPAN
+            return
+        parent = _current_span.get()
+        span = Span(name, parent.trace_id if parent else _new_id(16), parent.span_id if parent else None, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "ERROR"
+            span.attributes.setdefault("error", f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            _current_span.reset(token)
+            with self._lock:
+                self._spans.append(span)
+                if len(self._spans) >= self.max_spans:
+                    self._flush_locked(keep_trace=span.trace_id)
+
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        return _current_span.get()
+
+    def spans(self, trace_id: Optional[str] = None) -> List[Span]:
+        """已结束的span，可按trace过滤"""
+        with self._lock:
+            spans = list(self._spans)
+        return [span for span in spans if trace_id is None or span.trace_id == trace_id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+    def start_export(self, output_file: str) -> None:
+        """开始导出：清空文件，此后缓存达到 max_spans 时批量追加写出，结束时调用 flush() 写出剩余的span"""
+        path = Path(output_file)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("", encoding="utf-8")
+        with self._lock:
+            self._output = path
+            self._exported = 0
+
+    def flush(self) -> int:
+        """写出缓存中的全部span，返回本次导出累计写出的span数量"""
+        with self._lock:
+            self._flush_locked()
+            return self._exported
+
+    def _flush_locked(self, keep_trace: Optional[str] = None) -> None:
+        # 保留仍在进行中的trace（如当前用例），供火焰图摘要使用；单个trace超出上限时全部写出
+        batch = [span for span in self._spans if span.trace_id != keep_trace]
+        kept = [span for span in self._spans if span.trace_id == keep_trace]
+        if not batch or len(kept) >= self.max_spans:
+            batch, kept = self._spans, []
+        self._spans = kept
+        if not batch:
+            return
+        if self._output is None:
+            self.dropped += len(batch)
+            return
+        with open(self._output, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self._otlp_payload(batch), ensure_ascii=False) + "\n")
+        self._exported += len(batch)
+
+    def export_otlp_json(self, output_file: str) -> int:
+        """以OTLP/JSON格式（与OpenTelemetry Collector的文件导出一致）写出缓存中的所有span，返回span数量"""
+        spans = self.spans()
+        path = Path(output_file)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self._otlp_payload(spans), f, ensure_ascii=False)
+        return len(spans)
+
+    def _otlp_payload(self, spans: List[Span]) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "common.tracing"},
+                    "spans": [_otlp_span(span) for span in spans],
+                }],
+            }]
+        }
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    data = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [_otlp_attribute(key, value) for key, value in span.attributes.items()],
+        "status": {"code": 2 if span.status == "ERROR" else 1},
+    }
+    if span.parent_id:
+        data["parentSpanId"] = span.parent_id
+    return data
+
+
+def flame_summary(spans: List[Span], min_percent: float = 0.5) -> str:
+    """生成文本火焰图摘要：按调用路径聚合总耗时和自身耗时
+
+    同一路径（如 test > call > http.request > http.send）的多次调用合并为一行，
+    占比低于 min_percent% 的路径省略。
+    """
+    if not spans:
+        return "无追踪数据"
+    by_id = {span.span_id: span for span in spans}
+    child_time: Dict[str, int] = {}
+    for span in spans:
+        if span.parent_id in by_id:
+            child_time[span.parent_id] = child_time.get(span.parent_id, 0) + (span.end_ns - span.start_ns)
+
+    def path_of(span: Span) -> tuple:
+        names = []
+        while span is not None:
+            names.append(span.name)
+            span = by_id.get(span.parent_id)
+        return tuple(reversed(names))
+
+    stats: Dict[tuple, List[float]] = {}
+    for span in spans:
+        total = span.end_ns - span.start_ns
+        own = max(total - child_time.get(span.span_id, 0), 0)
+        entry = stats.setdefault(path_of(span), [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += total / 1e6
+        entry[2] += own / 1e6
+
+    root_total = sum(entry[1] for path, entry in stats.items() if len(path) == 1) or 1.0
+    lines = [f"{'路径':<60} {'次数':>6} {'总耗时ms':>10} {'自身ms':>10} {'占比':>7}"]
+    for path in sorted(stats):
+        count, total, own = stats[path]
+        percent = total / root_total * 100
+        if percent < min_percent and len(path) > 1:
+            continue
+        label = "  " * (len(path) - 1) + path[-1]
+        lines.append(f"{label:<60} {count:>6} {total:>10.2f} {own:>10.2f} {percent:>6.1f}%")
+    return "\n".join(lines)
+
+
+# 进程内共享的追踪器
+tracer = Tracer()
@@ -0,0 +1,124 @@
+"""
+链路追踪插件 - 为每个用例记录 setup/call/teardown 及请求各阶段的span
+
+开启方式：``pytest --trace-requests`` 或配置 ``tracing_enabled: true``。
+每个用例的火焰图摘要附加到allure报告，所有span以OTLP/JSON格式写入 ``--trace-output``
+（默认 logs/traces.json，每行一批，与OpenTelemetry Collector的文件导出一致），可导入Jaeger、Tempo等工具查看。
+内存中最多缓存 tracing_max_spans 个span，达到上限时批量写出，会话结束时写出剩余部分。
+pytest-xdist 并行时每个worker写入各自的文件（如 traces.gw0.json），主进程在会话结束时合并到 --trace-output。
+"""
+import os
+import shutil
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+
+from common.allure_util import attach
+from common.config_manager import ConfigManager
+from common.logger import Logger
+from common.tracing import flame_summary, tracer
+
+logger = Logger().get_logger()
+
+DEFAULT_TRACE_OUTPUT = "logs/traces.json"
+# 主进程：各worker的 (span文件, span数量)
+_worker_outputs: List[Tuple[str, int]] = []
+
+
+def worker_output_path(output: str, worker_id: str) -> str:
+    """worker各自的span文件，避免多个进程同时截断、追加同一文件"""
+    path = Path(output)
+    return str(path.with_name(f"{path.stem}.{worker_id}{path.suffix}"))
+
+
+def _output_path(config) -> str:
+    output = config.getoption("--trace-output")
+    workerinput = getattr(config, "workerinput", None)
+    return worker_output_path(output, workerinput["workerid"]) if workerinput else output
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("tracing", "请求链路追踪")
+    group.addoption("--trace-requests", action="store_true", default=False,
+                    help="记录用例及请求各阶段耗时span，并生成火焰图摘要")
+    group.addoption("--trace-output", action="store", default=DEFAULT_TRACE_OUTPUT,
+                    help=f"OTLP/JSON格式的span输出文件（默认: {DEFAULT_TRACE_OUTPUT}）")
+
+
+def pytest_configure(config):
+    settings = ConfigManager()
+    if config.getoption("--trace-requests") or settings.get("tracing_enabled", False):
+        tracer.enabled = True
+        tracer.max_spans = max(1, settings.get("tracing_max_spans", 65536))
+        tracer.start_export(_output_path(config))
+        logger.info("已开启请求链路追踪")
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    if not tracer.enabled:
+        yield
+        return
+    with tracer.span("test", nodeid=item.nodeid):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_setup(item):
+    with tracer.span("setup"):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    with tracer.span("call"):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_teardown(item, nextitem):
+    with tracer.span("teardown"):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    yield
+    if call.when != "call" or not tracer.enabled:
+        return
+    current = tracer.current_span()
+    if current is None:
+        return
+    summary = flame_summary(tracer.spans(current.trace_id))
+    attach(summary, name="耗时火焰图", attachment_type="TEXT")
+    logger.debug(f"用例耗时分布 {item.nodeid}:\n{summary}")
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not tracer.enabled:
+        return
+    count = tracer.flush()
+    workeroutput = getattr(session.config, "workeroutput", None)
+    if workeroutput is not None:
+        workeroutput["trace_output"] = (_output_path(session.config), count)
+        return
+    output = session.config.getoption("--trace-output")
+    with open(output, "a", encoding="utf-8") as target:
+        for path, spans in _worker_outputs:
+            try:
+                with open(path, encoding="utf-8") as source:
+                    shutil.copyfileobj(source, target)
+                os.remove(path)
+                count += spans
+            except OSError as e:
+                logger.warning(f"合并worker链路追踪数据失败: {path}, {str(e)}")
+    _worker_outputs.clear()
+    logger.info(f"链路追踪数据已导出: {output}, span数量: {count}")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    trace_output = getattr(node, "workeroutput", {}).get("trace_output")
+    if trace_output:
+        _worker_outputs.append(tuple(trace_output))
@@ -0,0 +1,197 @@
+"""
+传输层耗时 - 通过自定义urllib3连接记录 DNS、TCP连接、TLS握手、发送、首字节、下载各阶段耗时
+
+RequestUtil 使用挂载了 TimingHTTPAdapter 的 requests.Session 发送请求：
+连接池在同一会话内复用TCP/TLS连接，复用时 dns/connect/tls 为0，reused 为 True。
+"""
+import socket
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util import connection as urllib3_connection
+from urllib3.util.connection import allowed_gai_family
+
+PHASES = ("dns", "connect", "tls", "send", "ttfb", "download")
+
+_local = threading.local()
+
+
+class PhaseTimings:
+    """单次请求各阶段耗时（毫秒）"""
+
+    __slots__ = PHASES + ("reused", "headers_at")
+
+    def __init__(self):
+        for phase in PHASES:
+            setattr(self, phase, 0.0)
+        self.reused = True
+        self.headers_at = 0.0
+
+    @property
+    def total(self) -> float:
+        return sum(getattr(self, phase) for phase in PHASES)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {phase: round(getattr(self, phase), 2) for phase in PHASES}
+
+    def __str__(self) -> str:
+        phases = " ".join(f"{phase}={getattr(self, phase):.1f}ms" for phase in PHASES)
+        return f"{phases}{' (复用连接)' if self.reused else ''}"
+
+
+def start_recording() -> PhaseTimings:
+    """开始记录当前线程下一次请求的阶段耗时"""
+    timings = PhaseTimings()
+    _local.timings = timings
+    return timings
+
+
+def stop_recording() -> Optional[PhaseTimings]:
+    """结束记录，下载阶段计算到此刻为止（非流式响应在返回前已读取完响应体）"""
+    timings = getattr(_local, "timings", None)
+    _local.timings = None
+    if timings is not None and timings.headers_at:
+        timings.download += (time.perf_counter() - timings.headers_at) * 1000
+    return timings
+
+
+def _current() -> Optional[PhaseTimings]:
+    return getattr(_local, "timings", None)
+
+
+def _timed_create_connection(address, *args, **kwargs):
+    """包装 urllib3.util.connection.create_connection：解析耗时计入 dns，建立TCP连接的耗时计入 connect
+
+    单独解析域名以便计时，再按解析结果依次交给原函数连接（与原函数一样逐个尝试所有地址，
+    如双栈主机IPv6不通时回退到IPv4）；解析失败时交给原函数按原逻辑抛出。
+    只对记录中的计时连接（_TimingMixin._new_conn 内）计时，其他调用直接交给原函数。
+    """
+    timings = getattr(_local, "connecting", None)
+    if timings is None:
+        return _create_connection(address, *args, **kwargs)
+    host, port = address
+    start = time.perf_counter()
+    try:
+        addresses = socket.getaddrinfo(host.strip("[]"), port, allowed_gai_family(), socket.SOCK_STREAM)
+    except (OSError, UnicodeError):
+        addresses = []
+    resolved = time.perf_counter()
+    timings.dns += (resolved - start) * 1000
+    try:
+        if not addresses:
+            return _create_connection(address, *args, **kwargs)
+        error = None
+        for *_, sockaddr in addresses:
+            try:
+                return _create_connection((sockaddr[0], port), *args, **kwargs)
+            except OSError as e:
+                error = e
+        raise error
+    finally:
+        timings.connect += (time.perf_counter() - resolved) * 1000
+
+
+# urllib3.connection 在调用时才通过模块属性查找 create_connection
+_create_connection = getattr(urllib3_connection.create_connection, "__wrapped__", urllib3_connection.create_connection)
+_timed_create_connection.__wrapped__ = _create_connection
+urllib3_connection.create_connection = _timed_create_connection
+
+
+class _TimingMixin:
+    """为urllib3连接增加阶段计时，未在记录中（如其他代码复用连接池）时不做任何处理"""
+
+    def _new_conn(self):
+        timings = _current()
+        if timings is None:
+            return super()._new_conn()
+        timings.reused = False
+        # dns/connect 由 _timed_create_connection 计时，其余（异常转换、审计事件等）保持urllib3原逻辑
+        _local.connecting = timings
+        try:
+            return super()._new_conn()
+        finally:
+            _local.connecting = None
+
+    def connect(self):
+        timings = _current()
+        if timings is None:
+            return super().connect()
+        before = timings.dns + timings.connect
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            # connect() 中除DNS和TCP之外的时间即为TLS握手（及代理隧道）
+            timings.tls += max(elapsed - (timings.dns + timings.connect - before), 0.0)
+
+    def request(self, *args, **kwargs):
+        timings = _current()
+        if timings is None:
+            return super().request(*args, **kwargs)
+        # HTTP连接在首次发送时才建立，需扣除其中的连接耗时
+        before = timings.dns + timings.connect + timings.tls
+        start = time.perf_counter()
+        try:
+            return super().request(*args, **kwargs)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            timings.send += max(elapsed - (timings.dns + timings.connect + timings.tls - before), 0.0)
+
+    def getresponse(self, *args, **kwargs):
+        timings = _current()
+        if timings is None:
+            return super().getresponse(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return super().getresponse(*args, **kwargs)
+        finally:
+            timings.headers_at = time.perf_counter()
+            timings.ttfb += (timings.headers_at - start) * 1000
+
+
+class TimingHTTPConnection(_TimingMixin, HTTPConnection):
+    pass
+
+
+class TimingHTTPSConnection(_TimingMixin, HTTPSConnection):
+    pass
+
+
+class TimingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimingHTTPConnection
+
+
+class TimingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimingHTTPSConnection
+
+
+class TimingHTTPAdapter(HTTPAdapter):
+    """使用计时连接的HTTPAdapter"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimingHTTPConnectionPool,
+            "https": TimingHTTPSConnectionPool,
+        }
+
+
+def create_session(pool_connections: int = 10, pool_maxsize: int = 20):
+    """创建挂载计时适配器的会话
+
+    会话不保存服务端下发的Cookie，与每次调用 requests.request 的行为一致，
+    避免用例之间通过Cookie互相影响；单次请求传入的 cookies 参数不受影响。
+    """
+    session = requests.Session()
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    adapter = TimingHTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
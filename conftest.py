@@ -1,118 +1,146 @@
 import pytest
-import yaml
 import time
-import os
 from common.request_util import RequestUtil
+from common.config_manager import ConfigManager
+from common.data_loader import DataLoader
 from common.logger import Logger
+from common.log_context import bind_test
+from common.metrics import registry
+from common.resource_factory import ResourceFactory, worker_share
+from common.api_client import ApiClient
+from common.auth_manager import AuthManager
+from common.freeze_util import freeze
 
 logger = Logger().get_logger()
 
+pytest_plugins = ["common.scenario_plugin", "common.chain_plugin", "common.tracing_plugin",
+                  "common.metrics_plugin", "common.perf_report_plugin", "common.soak_plugin",
+                  "common.snapshot_plugin", "common.schema_plugin", "common.rerun_plugin"]
+
+# 框架开销基准（pytest benchmarks）和插件测试（pytest tests）单独执行，不随用例一起收集
+collect_ignore = ["benchmarks", "tests"]
+
 @pytest.fixture(scope="session")
 def config():
-    """加载配置文件，支持环境变量覆盖"""
-    # 支持通过环境变量指定配置文件
-    env = os.getenv("TEST_ENV", "default")
-    config_file = f"config/config_{env}.yaml" if env != "default" else "config/config.yaml"
-    
-    if not os.path.exists(config_file):
-        config_file = "config/config.yaml"  # 回退到默认配置
-    
-    logger.info(f"加载配置文件: {config_file}")
-    with open(config_file, encoding="utf-8") as f:
-        config_data = yaml.safe_load(f)
-    
-    # 环境变量覆盖配置
-    if os.getenv("BASE_URL"):
-        config_data["base_url"] = os.getenv("BASE_URL")
-    if os.getenv("USERNAME"):
-        config_data["username"] = os.getenv("USERNAME")
-    if os.getenv("PASSWORD"):
-        config_data["password"] = os.getenv("PASSWORD")
-    
-    logger.info(f"当前配置: base_url={config_data.get('base_url')}, username={config_data.get('username')}")
-    return config_data
+    """统一配置来源：返回ConfigManager，按键读取时始终使用最新的只读配置快照
+
+    支持TEST_ENV多环境、环境变量覆盖；配置 config_watch_interval > 0 时
+    后台监听配置文件变更，长时间运行无需重启即可生效。
+    """
+    config_manager = ConfigManager()
+    logger.info(f"当前配置: base_url={config_manager.get('base_url')}, username={config_manager.get('username')}")
+
+    watch_interval = config_manager.get("config_watch_interval", 0)
+    if watch_interval:
+        config_manager.start_watching(watch_interval)
+    yield config_manager
+    if watch_interval:
+        config_manager.stop_watching()
 
 @pytest.fixture(scope="session")
 def req(config):
-    """请求工具实例"""
-    return RequestUtil(config["base_url"])
+    """请求工具实例（response_cache_enabled 为 true 时开启会话内GET响应缓存）"""
+    request_util = RequestUtil(config["base_url"])
+    yield request_util
+    if request_util.response_cache is not None:
+        logger.info(f"响应缓存统计: {request_util.response_cache.stats()}")
+    if request_util.conditional_store is not None:
+        logger.info(f"条件请求统计: {request_util.conditional_store.stats()}")
+    for item in registry.compression_summary()[:10]:
+        logger.info(f"压缩统计: {item}")
+    request_util.close()
 
 @pytest.fixture(scope="session")
-def captcha_and_checkkey(req):
-    """自动获取验证码和checkKey，带重试机制"""
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            url = f"/rpm-api/auth/generateCaptcha?checkKey=&_t={int(time.time() * 1000)}"
-            headers = {
-                "accept": "application/json, text/plain, */*",
-                "appid": "app-7zpfoeqntj6",
-                "content-type": "application/json;charset=UTF-8",
-            }
-            response = req.send_request("GET", url, headers=headers)
-            assert response.status_code == 200
-            assert response.json()["code"] == "200"
-            data = response.json()["data"]
-            logger.info(f"成功获取验证码和checkKey，第{attempt + 1}次尝试")
-            return data["checkKey"]
-        except Exception as e:
-            logger.warning(f"获取验证码失败，第{attempt + 1}次尝试: {str(e)}")
-            if attempt == max_retries - 1:
-                logger.error("获取验证码达到最大重试次数，测试终止")
-                raise
-            time.sleep(2)  # 重试前等待2秒
+def auth(req, config):
+    """认证管理：获取验证码 -> 登录 整体重试（抖动退避），并发调用共享同一次登录"""
+    manager = AuthManager(
+        req, config["username"], config["password"], config["captcha"],
+        max_attempts=config.get("auth_max_attempts", 3),
+        backoff_base=config.get("auth_backoff_base", 1.0),
+        backoff_max=config.get("auth_backoff_max", 10.0)
+    )
+    yield manager
+    logger.info(f"认证统计: {manager.stats()}")
 
 @pytest.fixture(scope="session")
-def token(req, config, captcha_and_checkkey):
-    """通过登录接口获取token，动态获取checkKey，带重试机制"""
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            checkKey = captcha_and_checkkey
-            url = "/rpm-api/auth/login"
-            headers = {
-                "accept": "application/json, text/plain, */*",
-                "content-type": "application/json;charset=UTF-8",
-                "appid": "app-7zpfoeqntj6",
-            }
-            data = {
-                "username": config["username"],
-                "password": config["password"],
-                "checkKey": checkKey,
-                "captcha": config["captcha"]
-            }
-            logger.info(f"尝试登录，第{attempt + 1}次尝试")
-            response = req.send_request("POST", url, json=data, headers=headers)
-            assert response.status_code == 200
-            assert response.json()["code"] == "200"
-            token_value = response.json()["data"]["token"]
-            logger.info("登录成功，获取到token")
-            return token_value
-        except Exception as e:
-            logger.warning(f"登录失败，第{attempt + 1}次尝试: {str(e)}")
-            if attempt == max_retries - 1:
-                logger.error("登录达到最大重试次数，测试终止")
-                raise
-            time.sleep(2)  # 重试前等待2秒
+def token(auth):
+    """登录获取的token（会话内缓存）"""
+    return auth.token()
 
 @pytest.fixture(scope="session")
 def headers(token):
-    """自动生成带token的请求头"""
-    headers_dict = {"Authorization": f"Bearer {token}"}
+    """自动生成带token的请求头
+
+    返回只读字典：整个会话共用同一个对象，RequestUtil 与默认请求头合并一次后按对象缓存，
+    需要附加请求头时使用 {**headers, ...}。
+    """
+    headers_dict = freeze({"Authorization": f"Bearer {token}"})
     logger.info("生成请求头成功")
     return headers_dict
 
 @pytest.fixture(scope="session")
-def contract_data():
-    """加载合同测试数据"""
+def api_client(req):
+    """声明式API客户端（接口定义见 config/endpoints.yaml），整个会话共用"""
+    return ApiClient(req)
+
+@pytest.fixture(scope="session")
+def contract_api(api_client):
+    """合同管理API，整个会话复用同一实例"""
+    return api_client.contract
+
+@pytest.fixture(scope="session")
+def project_api(api_client):
+    """项目管理API，整个会话复用同一实例"""
+    return api_client.project
+
+@pytest.fixture(scope="session")
+def data_loader():
+    """测试数据加载器（解析结果按文件哈希缓存，并行worker共享）"""
+    return DataLoader()
+
+@pytest.fixture(scope="session")
+def contract_data(data_loader):
+    """加载合同测试数据（只读视图，需要修改时先调用 copy()）"""
     data_file = "data/contract_data.yaml"
     logger.info(f"加载测试数据文件: {data_file}")
-    with open(data_file, encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    return data_loader.load(data_file)
+
+@pytest.fixture(scope="session")
+def resource_pool(req, headers, config, data_loader):
+    """测试资源池：会话开始时并发创建合同、项目，会话结束时并发清理
+
+    resource_pool_size 为每类资源的总数，并行执行时按worker平分，每个worker只使用自己创建的资源。
+    """
+    templates = data_loader.load("data/resource_data.yaml")
+    factory = ResourceFactory(req, headers, max_workers=config.get("resource_pool_workers", 8))
+    factory.register_defaults(templates["contract"], templates["project"])
+    size = worker_share(config.get("resource_pool_size", 4))
+    start_time = time.time()
+    factory.provision({"contract": size, "project": size})
+    logger.info(f"测试资源池准备完成，耗时: {round(time.time() - start_time, 2)}s")
+    yield factory
+    factory.teardown()
+
+@pytest.fixture
+def pooled_contract_id(resource_pool):
+    """从资源池借出一个合同ID，用例结束后归还"""
+    with resource_pool.lease("contract") as contract_id:
+        yield contract_id
+
+@pytest.fixture
+def pooled_project_id(resource_pool):
+    """从资源池借出一个项目ID，用例结束后归还"""
+    with resource_pool.lease("project") as project_id:
+        yield project_id
 
 # pytest钩子函数
 def pytest_configure(config):
     """pytest配置钩子"""
+    config.addinivalue_line("markers", "critical: 核心业务用例")
+    # 日志格式：LOG_FORMAT 环境变量或配置项 log_format（text / json）
+    log_format = ConfigManager().get("log_format", "text")
+    if log_format != Logger.log_format:
+        Logger.configure(log_format=log_format)
     logger.info("=" * 80)
     logger.info("开始执行自动化测试")
     logger.info("=" * 80)
@@ -123,6 +151,12 @@ def pytest_unconfigure(config):
     logger.info("自动化测试执行完成")
     logger.info("=" * 80)
 
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """用例执行期间的日志都带有用例ID"""
+    with bind_test(item.nodeid):
+        yield
+
 def pytest_runtest_setup(item):
     """每个测试用例开始前的钩子"""
     logger.info(f"开始执行测试用例: {item.name}")
@@ -1,6 +1,5 @@
 import allure
 import pytest
-from common.contract_api import ContractAPI
 from common.assert_util import AssertUtil
 
 @allure.feature("合同管理")
@@ -8,28 +7,44 @@ class TestContract:
     
     @allure.story("创建合同")
     @allure.severity(allure.severity_level.CRITICAL)
-    def test_create_contract(self, req, headers, contract_data):
+    @pytest.mark.produces("contract.id")
+    def test_create_contract(self, contract_api, headers, contract_data, chain_store):
         """测试创建合同"""
         with allure.step("准备测试数据"):
             payload = contract_data["create_contract"]["valid_data"]
         
         with allure.step("发送创建合同请求"):
-            contract_api = ContractAPI(req)
             response = contract_api.create_contract(payload, headers)
         
         with allure.step("验证响应结果"):
             AssertUtil.assert_response_success(response)
             assert "data" in response.json()
+            chain_store.put("contract.id", response.json()["data"]["id"])
     
     @allure.story("查询合同")
     @allure.severity(allure.severity_level.NORMAL)
-    def test_get_contract(self, req, headers, contract_data):
+    @pytest.mark.consumes("contract.id", source="test_create_contract")
+    def test_get_created_contract(self, contract_api, headers, contract_data, chain_store):
+        """测试查询刚创建的合同详情"""
+        contract_id = chain_store.get("contract.id")
+        with allure.step(f"获取合同ID: {contract_id} 的详情"):
+            response = contract_api.get_contract_by_id(contract_id, headers)
+        
+        with allure.step("验证合同详情与创建时一致"):
+            AssertUtil.assert_response_success(response)
+            AssertUtil.assert_nested_field_value(response, "data.id", contract_id)
+            AssertUtil.assert_nested_field_value(
+                response, "data.name", contract_data["create_contract"]["valid_data"]["name"]
+            )
+    
+    @allure.story("查询合同")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_get_contract(self, contract_api, headers, contract_data):
         """测试查询合同"""
         with allure.step("准备查询参数"):
             params = contract_data["get_contract"]["valid_params"]
         
         with allure.step("发送查询合同请求"):
-            contract_api = ContractAPI(req)
             response = contract_api.get_contract(params, headers)
         
         with allure.step("验证响应结果"):
@@ -37,15 +52,14 @@ class TestContract:
     
     @allure.story("更新合同")
     @allure.severity(allure.severity_level.NORMAL)
-    @pytest.mark.parametrize("contract_id,update_data", [
-        (1, {"name": "更新合同名称", "amount": 20000}),
-        (2, {"status": "active"})
+    @pytest.mark.parametrize("update_data", [
+        {"name": "更新合同名称", "amount": 20000},
+        {"status": "active"}
     ])
-    def test_update_contract(self, req, headers, contract_id, update_data):
-        """测试更新合同"""
-        with allure.step(f"更新合同ID: {contract_id}"):
-            contract_api = ContractAPI(req)
-            response = contract_api.update_contract(contract_id, update_data, headers)
+    def test_update_contract(self, contract_api, headers, pooled_contract_id, update_data):
+        """测试更新合同（合同来自资源池）"""
+        with allure.step(f"更新合同ID: {pooled_contract_id}"):
+            response = contract_api.update_contract(pooled_contract_id, update_data, headers)
         
         with allure.step("验证更新结果"):
             AssertUtil.assert_response_success(response)
\ No newline at end of file
@@ -1,6 +1,5 @@
 import allure
 import pytest
-from common.project_api import ProjectAPI
 from common.assert_util import AssertUtil
 
 @allure.feature("项目管理")
@@ -8,7 +7,8 @@ class TestProject:
     
     @allure.story("创建项目")
     @allure.severity(allure.severity_level.CRITICAL)
-    def test_create_project(self, req, headers):
+    @pytest.mark.produces("project.id")
+    def test_create_project(self, project_api, headers, chain_store):
         """测试创建项目"""
         with allure.step("准备测试数据"):
             payload = {
@@ -19,16 +19,16 @@ class TestProject:
             }
         
         with allure.step("发送创建项目请求"):
-            project_api = ProjectAPI(req)
             response = project_api.create_project(payload, headers)
         
         with allure.step("验证响应结果"):
             AssertUtil.assert_response_success(response)
             AssertUtil.assert_response_contains_field(response, "data")
+            chain_store.put("project.id", response.json()["data"]["id"])
     
     @allure.story("查询项目列表")
     @allure.severity(allure.severity_level.NORMAL)
-    def test_get_project_list(self, req, headers):
+    def test_get_project_list(self, project_api, headers):
         """测试查询项目列表"""
         with allure.step("准备查询参数"):
             params = {
@@ -38,7 +38,6 @@ class TestProject:
             }
         
         with allure.step("发送查询项目列表请求"):
-            project_api = ProjectAPI(req)
             response = project_api.get_project_list(params, headers)
         
         with allure.step("验证响应结果"):
@@ -48,10 +47,9 @@ class TestProject:
     @allure.story("获取项目详情")
     @allure.severity(allure.severity_level.NORMAL)
     @pytest.mark.parametrize("project_id", [1, 2])
-    def test_get_project_detail(self, req, headers, project_id):
+    def test_get_project_detail(self, project_api, headers, project_id):
         """测试获取项目详情"""
         with allure.step(f"获取项目ID: {project_id} 的详情"):
-            project_api = ProjectAPI(req)
             response = project_api.get_project_by_id(project_id, headers)
         
         with allure.step("验证项目详情"):
@@ -60,11 +58,23 @@ class TestProject:
             required_fields = ["id", "name", "status", "created_time"]
             AssertUtil.assert_dict_contains_keys(project_data, required_fields)
     
+    @allure.story("获取项目详情")
+    @allure.severity(allure.severity_level.NORMAL)
+    @pytest.mark.snapshot
+    def test_project_detail_snapshot(self, project_api, headers, snapshot):
+        """项目详情与基线快照对比（忽略时间字段）"""
+        with allure.step("获取项目ID: 1 的详情"):
+            response = project_api.get_project_by_id(1, headers)
+        
+        with allure.step("与基线快照对比"):
+            AssertUtil.assert_response_success(response)
+            snapshot.assert_match(response, ignore=["**.*_time", "**.update*"])
+    
     @allure.story("更新项目状态")
     @allure.severity(allure.severity_level.NORMAL)
-    def test_update_project_status(self, req, headers):
-        """测试更新项目状态"""
-        project_id = 1
+    def test_update_project_status(self, project_api, headers, pooled_project_id):
+        """测试更新项目状态（项目来自资源池）"""
+        project_id = pooled_project_id
         
         with allure.step("准备更新数据"):
             update_data = {
@@ -73,7 +83,6 @@ class TestProject:
             }
         
         with allure.step(f"更新项目ID: {project_id} 的状态"):
-            project_api = ProjectAPI(req)
             response = project_api.update_project(project_id, update_data, headers)
         
         with allure.step("验证更新结果"):
@@ -81,22 +90,37 @@ class TestProject:
     
     @allure.story("删除项目")
     @allure.severity(allure.severity_level.CRITICAL)
-    def test_delete_project(self, req, headers):
+    def test_delete_project(self, project_api, headers):
         """测试删除项目"""
         project_id = 999  # 使用不存在的ID进行测试
         
         with allure.step(f"删除项目ID: {project_id}"):
-            project_api = ProjectAPI(req)
             response = project_api.delete_project(project_id, headers)
         
         with allure.step("验证删除结果"):
             # 预期删除不存在的项目会返回错误
             AssertUtil.assert_response_error(response, expected_message="项目不存在")
     
+    @allure.story("删除项目")
+    @allure.severity(allure.severity_level.NORMAL)
+    @pytest.mark.consumes("project.id", source="test_create_project")
+    def test_delete_created_project(self, project_api, headers, chain_store):
+        """测试删除刚创建的项目，删除后再查询应返回错误"""
+        project_id = chain_store.get("project.id")
+        with allure.step(f"删除项目ID: {project_id}"):
+            response = project_api.delete_project(project_id, headers)
+        
+        with allure.step("验证删除结果"):
+            AssertUtil.assert_response_success(response)
+        
+        with allure.step("验证项目已不存在"):
+            response = project_api.get_project_by_id(project_id, headers)
+            AssertUtil.assert_response_error(response, expected_message="项目不存在")
+    
     @allure.story("搜索项目")
     @allure.severity(allure.severity_level.NORMAL)
     @pytest.mark.parametrize("keyword", ["测试", "clinical", "auto"])
-    def test_search_projects(self, req, headers, keyword):
+    def test_search_projects(self, project_api, headers, keyword):
         """测试项目搜索功能"""
         with allure.step(f"搜索关键词: {keyword}"):
             params = {
@@ -105,7 +129,6 @@ class TestProject:
                 "size": 20
             }
             
-            project_api = ProjectAPI(req)
             response = project_api.search_projects(params, headers)
         
         with allure.step("验证搜索结果"):
@@ -0,0 +1,11 @@
+import allure
+import pytest
+from common.scenario_plugin import run_scenario
+
+@allure.feature("数据驱动场景")
+class TestScenarios:
+    
+    @pytest.mark.scenario
+    def test_scenario(self, req, headers, scenario):
+        """执行data/scenarios下YAML场景生成的用例"""
+        run_scenario(req, headers, scenario)
@@ -0,0 +1,7 @@
+"""
+框架插件测试 - 用 pytester 在临时目录中执行示例用例，验证插件行为，无需网络和测试环境
+
+用法:
+    pytest tests
+"""
+pytest_plugins = ["pytester"]
@@ -0,0 +1,148 @@
+"""
+失败重跑插件：偶发失败重跑、断言失败不重跑、隔离只掩盖偶发原因的失败、按历史进入和解除隔离
+"""
+import json
+
+import pytest
+
+from common.exceptions import NetworkError, TimeoutError
+from common.rerun_plugin import FlakyHistory, classify_failure
+
+FLAKY_TEST = """
+from common.exceptions import NetworkError
+
+calls = []
+
+def test_flaky():
+    calls.append(1)
+    if len(calls) == 1:
+        raise NetworkError("连接被拒绝", "http://127.0.0.1/rpm-api/project/list")
+"""
+
+NETWORK_FAILURE_TEST = """
+from common.exceptions import NetworkError
+
+def test_network():
+    raise NetworkError("连接被拒绝", "http://127.0.0.1/rpm-api/project/list")
+"""
+
+ASSERTION_TEST = """
+calls = []
+
+def test_assertion():
+    calls.append(1)
+    print(f"calls={len(calls)}")
+    assert len(calls) == 0
+"""
+
+
+@pytest.fixture
+def history_file(pytester):
+    return pytester.path / "flaky_history.json"
+
+
+def run(pytester, history_file, *args):
+    return pytester.runpytest("-p", "common.rerun_plugin", "--smart-reruns", "2", "--rerun-delay", "0",
+                              "--flaky-history", str(history_file), "-s", *args)
+
+
+def load_history(history_file):
+    with open(history_file, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def quarantine_all(history_file):
+    entries = load_history(history_file)
+    for entry in entries.values():
+        entry["quarantined"] = True
+    with open(history_file, "w", encoding="utf-8") as f:
+        json.dump(entries, f)
+
+
+def test_network_error_rerun_then_pass(pytester, history_file):
+    pytester.makepyfile(FLAKY_TEST)
+    result = run(pytester, history_file)
+    outcomes = result.parseoutcomes()
+    assert outcomes.get("passed") == 1
+    assert outcomes.get("rerun") == 1
+    assert "failed" not in outcomes
+    [entry] = load_history(history_file).values()
+    assert entry["recent"] == "R"
+    assert entry["last_category"] == "network"
+
+
+def test_assertion_failure_not_rerun(pytester, history_file):
+    pytester.makepyfile(ASSERTION_TEST)
+    result = run(pytester, history_file)
+    result.assert_outcomes(failed=1)
+    assert "rerun" not in result.parseoutcomes()
+    result.stdout.no_fnmatch_line("*calls=2*")
+    [entry] = load_history(history_file).values()
+    assert entry["recent"] == "F"
+    assert entry["last_category"] == "assertion"
+
+
+def test_quarantined_assertion_failure_still_fails(pytester, history_file):
+    pytester.makepyfile(ASSERTION_TEST)
+    run(pytester, history_file)
+    quarantine_all(history_file)
+    result = run(pytester, history_file)
+    result.assert_outcomes(failed=1)
+    assert result.ret == pytest.ExitCode.TESTS_FAILED
+
+
+def test_quarantined_network_error_is_xfail(pytester, history_file):
+    pytester.makepyfile(NETWORK_FAILURE_TEST)
+    run(pytester, history_file)
+    quarantine_all(history_file)
+    result = run(pytester, history_file)
+    # 隔离中的用例不重跑，偶发原因的失败记为 xfail，历史记为 R
+    result.assert_outcomes(xfailed=1)
+    assert "rerun" not in result.parseoutcomes()
+    assert result.ret == pytest.ExitCode.OK
+    [entry] = load_history(history_file).values()
+    assert entry["recent"] == "FR"
+
+
+def test_no_quarantine_reports_failure(pytester, history_file):
+    pytester.makepyfile(NETWORK_FAILURE_TEST)
+    run(pytester, history_file)
+    quarantine_all(history_file)
+    result = run(pytester, history_file, "--no-quarantine")
+    result.assert_outcomes(failed=1)
+    assert result.parseoutcomes().get("rerun") == 2
+
+
+def test_history_quarantine_threshold(tmp_path):
+    history = FlakyHistory(str(tmp_path / "history.json"), window=5, threshold=2)
+    nodeid = "testcases/test_project.py::TestProject::test_get_project_list"
+    history.record(nodeid, "R", "network")
+    history.record(nodeid, "P")
+    assert nodeid not in history.quarantined()
+
+    history.record(nodeid, "R", "timeout")
+    assert nodeid in history.quarantined()
+    assert history.quarantine_changes == {nodeid: True}
+
+    history.save()
+    reloaded = FlakyHistory(str(tmp_path / "history.json"), window=5, threshold=2).load()
+    assert reloaded.quarantined() == {nodeid}
+
+    # 最近5次中只剩1次 R 时解除隔离
+    for _ in range(3):
+        reloaded.record(nodeid, "P")
+    assert reloaded.entries[nodeid]["recent"] == "PRPPP"
+    assert reloaded.quarantined() == set()
+    assert reloaded.quarantine_changes == {nodeid: False}
+
+
+@pytest.mark.parametrize("exc, server_errors, expected", [
+    (NetworkError("连接被拒绝", "http://127.0.0.1"), 0, "network"),
+    (TimeoutError("请求超时", 30, "GET http://127.0.0.1"), 0, "timeout"),
+    (ConnectionResetError(), 0, "network"),
+    (AssertionError("状态码应为200"), 0, "assertion"),
+    (AssertionError("状态码应为200"), 1, "server"),
+    (ValueError("数据错误"), 0, "error"),
+])
+def test_classify_failure(exc, server_errors, expected):
+    assert classify_failure(exc, server_errors) == expected